@@ -0,0 +1,78 @@
+from datetime import timedelta
+from typing import Optional, Union
+
+import numpy as np
+
+from src.backtesting.clock import SimulatedClock
+from src.classification.trading_classifier import TradingClassifier
+from src.containers.candle import instantiate_1970_candle
+from src.containers.portfolio import Portfolio
+from src.containers.stock_data import StockData
+from src.containers.trade_helper import generate_trading_signal_from_prediction
+from src.market_maker.market_maker import NoopMarketMaker, TestMarketMaker, MarketMaker
+
+SAMPLING_PERIOD = timedelta(minutes=1)
+
+
+def find_registered_candles(close_times: np.ndarray, waiting_threshold: timedelta,
+                            previous_close_time: int) -> np.ndarray:
+    """Indices of the candles the runner acts on: those closing more than waiting_threshold after the last
+    candle it acted on."""
+    threshold = int(waiting_threshold.total_seconds() * 1000)
+    differences = np.diff(close_times, prepend=previous_close_time)
+    if np.all(differences > threshold):
+        return np.arange(len(close_times))
+    registered = []
+    for index, close_time in enumerate(close_times.tolist()):
+        if close_time - previous_close_time > threshold:
+            registered.append(index)
+            previous_close_time = close_time
+    return np.array(registered, dtype=np.int64)
+
+
+class BacktestEngine(object):
+    """Replays historical candles through the classifier and portfolio the way Runner does in mock mode.
+
+    The candles the runner would act on are found up front from the close times, and the clock of the
+    simulation jumps from one close time to the next, so the loop only does the work that decides the
+    outcome: updating the classifier, predicting, passing signals to the portfolio and market maker, and marking
+    the portfolio to the close price.
+    """
+
+    def __init__(self, classifier: TradingClassifier, portfolio: Portfolio,
+                 market_maker: Optional[Union[NoopMarketMaker, TestMarketMaker, MarketMaker]] = None,
+                 waiting_threshold: timedelta = SAMPLING_PERIOD - timedelta(seconds=15)):
+        self._classifier = classifier
+        self._portfolio = portfolio
+        self._market_maker = market_maker
+        self._waiting_threshold = waiting_threshold
+        self._clock = SimulatedClock()
+
+    @property
+    def clock(self) -> SimulatedClock:
+        return self._clock
+
+    @property
+    def portfolio(self) -> Portfolio:
+        return self._portfolio
+
+    def run(self, stock_data: StockData) -> Portfolio:
+        candles = stock_data.candles
+        previous_close_time = instantiate_1970_candle().get_time().close_time.as_epoch_time()
+        registered = find_registered_candles(candles.close_time, self._waiting_threshold, previous_close_time)
+        close_times = candles.close_time[registered].tolist()
+        for index, close_time in zip(registered.tolist(), close_times):
+            self._clock.advance_to(close_time)
+            candle = candles[index]
+            self._classifier.append_new_candle(candle)
+            try:
+                prediction = self._classifier.predict_one(candle)
+            except ValueError:
+                prediction = None
+            if prediction:
+                signal = generate_trading_signal_from_prediction(prediction[0], candle)
+                self._portfolio.update(signal)
+                if self._market_maker is not None:
+                    self._market_maker.insert_signal(signal)
+            self._portfolio.mark_to_market(candle.get_close_price())
+        return self._portfolio
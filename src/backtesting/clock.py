@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from src.containers.time import MilliSeconds
+
+
+class SimulatedClock(object):
+    """Clock of a simulation, which only moves when it is told to, in epoch milliseconds."""
+
+    def __init__(self, now: int = 0):
+        self._now = now
+
+    @property
+    def now(self) -> int:
+        return self._now
+
+    def as_milliseconds(self) -> MilliSeconds:
+        return MilliSeconds(self._now)
+
+    def as_datetime(self) -> datetime:
+        return MilliSeconds(self._now).as_datetime()
+
+    def advance_to(self, now: int):
+        if now < self._now:
+            raise ValueError("A simulated clock cannot go back in time ({} < {})".format(now, self._now))
+        self._now = now
@@ -0,0 +1,195 @@
+import heapq
+from typing import List, Optional, Tuple
+
+from src.containers.order import Order, OrderID, OrderState, Side, Price, Size
+from src.containers.order_book import OrderBook
+from src.containers.time import MilliSeconds
+
+
+class Fill(object):
+    """`size` of `order` traded at `price` at `timestamp` (epoch milliseconds)."""
+
+    def __init__(self, order: Order, price: Price, size: Size, timestamp: int):
+        self._order = order
+        self._price = price
+        self._size = size
+        self._timestamp = timestamp
+
+    @property
+    def order(self) -> Order:
+        return self._order
+
+    @property
+    def price(self) -> Price:
+        return self._price
+
+    @property
+    def size(self) -> Size:
+        return self._size
+
+    @property
+    def timestamp(self) -> int:
+        return self._timestamp
+
+    def __repr__(self):
+        return "Fill(order_id={}, side={}, price={}, size={}, timestamp={})".format(
+            self._order.id, self._order.side, self._price, self._size, self._timestamp)
+
+
+class _RestingOrder(object):
+    def __init__(self, order: Order, remaining: Size, sequence: int):
+        self.order = order
+        self.remaining = remaining
+        self.sequence = sequence
+
+
+class MatchingEngine(object):
+    """Limit order book of one trading pair, matching with price-time priority.
+
+    Resting orders sit in one heap per side, keyed by (price, arrival sequence), with the bid prices negated.
+    Cancelled and modified orders are not searched for in the heaps: their entries are left behind and
+    dropped when they surface (lazy deletion), so placing, modifying and cancelling are O(log n). A modified
+    order loses its time priority, as on an exchange.
+
+    An incoming order first trades with the resting orders it crosses, at their price. Resting orders also
+    trade with the market, replayed from candles (match_candle) or order book snapshots (match_order_book),
+    at their own limit price and up to the liquidity available, so they can be partially filled.
+    """
+
+    def __init__(self):
+        self._bids = []
+        self._asks = []
+        self._resting = {}
+        self._sequence = 0
+
+    def __len__(self):
+        return len(self._resting)
+
+    def __contains__(self, order_id: OrderID) -> bool:
+        return order_id in self._resting
+
+    @property
+    def open_orders(self) -> List[Order]:
+        """Resting orders, in order of arrival."""
+        return [resting.order for resting in sorted(self._resting.values(), key=lambda resting: resting.sequence)]
+
+    def remaining(self, order_id: OrderID) -> Optional[Size]:
+        resting = self._resting.get(order_id)
+        return None if resting is None else resting.remaining
+
+    def best_bid(self) -> Optional[Price]:
+        resting = self._peek(self._bids)
+        return None if resting is None else resting.order.price
+
+    def best_ask(self) -> Optional[Price]:
+        resting = self._peek(self._asks)
+        return None if resting is None else resting.order.price
+
+    def submit(self, order: Order, timestamp: int) -> List[Fill]:
+        """Match the order against the book, and rest whatever is left of it."""
+        if order.filled is None:
+            order.filled = 0.0
+        order.state = OrderState.open
+        return self._match_incoming(order, order.size - order.filled, timestamp)
+
+    def modify(self, order_id: OrderID, price: Price, size: Size, timestamp: int) -> Tuple[bool, List[Fill]]:
+        """Change the price and the total size of a resting order, which goes to the back of its new level."""
+        resting = self._resting.pop(order_id, None)
+        if resting is None:
+            return False, []
+        resting.order.price = price
+        resting.order.size = size
+        return True, self._match_incoming(resting.order, size - resting.order.filled, timestamp)
+
+    def cancel(self, order_id: OrderID) -> Optional[Order]:
+        resting = self._resting.pop(order_id, None)
+        if resting is None:
+            return None
+        resting.order.state = OrderState.cancelled
+        return resting.order
+
+    def match_candle(self, low_price: Price, high_price: Price, volume: Optional[Size], timestamp: int) -> List[Fill]:
+        """Fill the bids priced at or above the low of the candle and the asks priced at or below its high,
+        best price first, each side up to the volume traded (unlimited if None)."""
+        return self._match_market(self._bids, lambda price: price >= low_price, volume, timestamp) + \
+               self._match_market(self._asks, lambda price: price <= high_price, volume, timestamp)
+
+    def match_order_book(self, order_book: OrderBook, timestamp: int) -> List[Fill]:
+        """Fill the resting orders that cross the levels of an order book snapshot, consuming their size."""
+        fills = []
+        for levels, heap, crosses in ((order_book.asks, self._bids, lambda level, price: level <= price),
+                                      (order_book.bids, self._asks, lambda level, price: level >= price)):
+            for level in levels:
+                resting = self._peek(heap)
+                if resting is None or not crosses(level.price, resting.order.price):
+                    break
+                fills += self._match_market(heap, lambda price: crosses(level.price, price), level.size, timestamp)
+        return fills
+
+    def _peek(self, heap: List) -> Optional[_RestingOrder]:
+        while heap:
+            _, sequence, order_id = heap[0]
+            resting = self._resting.get(order_id)
+            if resting is not None and resting.sequence == sequence:
+                return resting
+            heapq.heappop(heap)
+        return None
+
+    def _rest(self, order: Order, remaining: Size):
+        self._sequence += 1
+        self._resting[order.id] = _RestingOrder(order, remaining, self._sequence)
+        if order.side is Side.bid:
+            heapq.heappush(self._bids, (-order.price, self._sequence, order.id))
+        else:
+            heapq.heappush(self._asks, (order.price, self._sequence, order.id))
+
+    def _match_incoming(self, order: Order, remaining: Size, timestamp: int) -> List[Fill]:
+        fills = []
+        if order.side is Side.bid:
+            heap, crosses = self._asks, lambda price: price <= order.price
+        else:
+            heap, crosses = self._bids, lambda price: price >= order.price
+        resting = self._peek(heap)
+        while remaining > 0.0 and resting is not None and crosses(resting.order.price):
+            size = min(remaining, resting.remaining)
+            remaining -= size
+            fills.append(self._fill(order, resting.order.price, size, remaining, timestamp))
+            fills.append(self._fill_resting(heap, resting, size, timestamp))
+            resting = self._peek(heap)
+        if remaining > 0.0:
+            self._rest(order, remaining)
+        elif not fills:  # modified down to what had already been filled
+            order.state = OrderState.filled
+            order.completed_at = MilliSeconds(timestamp)
+        return fills
+
+    def _match_market(self, heap: List, crosses, liquidity: Optional[Size], timestamp: int) -> List[Fill]:
+        fills = []
+        resting = self._peek(heap)
+        while resting is not None and crosses(resting.order.price) and (liquidity is None or liquidity > 0.0):
+            size = resting.remaining if liquidity is None else min(resting.remaining, liquidity)
+            if liquidity is not None:
+                liquidity -= size
+            fills.append(self._fill_resting(heap, resting, size, timestamp))
+            resting = self._peek(heap)
+        return fills
+
+    def _fill_resting(self, heap: List, resting: _RestingOrder, size: Size, timestamp: int) -> Fill:
+        resting.remaining -= size
+        if resting.remaining <= 0.0:
+            heapq.heappop(heap)
+            del self._resting[resting.order.id]
+        return self._fill(resting.order, resting.order.price, size, resting.remaining, timestamp)
+
+    @staticmethod
+    def _fill(order: Order, price: Price, size: Size, remaining: Size, timestamp: int) -> Fill:
+        filled = order.filled + size
+        order.equivalent_price = price if order.filled == 0.0 else \
+            (order.equivalent_price * order.filled + price * size) / filled
+        order.filled = filled
+        if remaining <= 0.0:
+            order.state = OrderState.filled
+            order.completed_at = MilliSeconds(timestamp)
+        else:
+            order.state = OrderState.partially_filled
+        return Fill(order, price, size, timestamp)
@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from itertools import islice
+from typing import List, Optional
+
+from src.backtesting.clock import SimulatedClock
+from src.backtesting.matching_engine import MatchingEngine, Fill
+from src.containers.candle import Candle
+from src.containers.order import Order, OrderID, OrderState, Price, Size, Side
+from src.containers.order_book import OrderBook, Bid, Ask
+from src.containers.trading import Trading
+from src.containers.trading_pair import TradingPair
+
+
+class SimulatedExchange(Trading):
+    """Local exchange behind the Trading interface, for one trading pair.
+
+    Orders go into a MatchingEngine and are filled by replaying candles (replay_candle) or order book
+    snapshots (replay_order_book), so a market maker can be run deterministically against historical data:
+    time is the one of the SimulatedClock, which the replay methods move forward, and order ids are
+    sequence numbers. `initial_orders` (filled orders) seed the order history.
+    """
+
+    def __init__(self, trading_pair: TradingPair, clock: Optional[SimulatedClock] = None,
+                 initial_orders: Optional[List[Order]] = None):
+        super().__init__(client=None)
+        self._trading_pair = trading_pair
+        self._clock = SimulatedClock() if clock is None else clock
+        self._engine = MatchingEngine()
+        self._orders = OrderedDict()  # every order placed, oldest first
+        self._last_filled_order = None
+        self._fills = []
+        for order in initial_orders or []:
+            self._orders[order.id] = order
+            if order.state is OrderState.filled:
+                self._last_filled_order = order
+
+    @property
+    def clock(self) -> SimulatedClock:
+        return self._clock
+
+    @property
+    def engine(self) -> MatchingEngine:
+        return self._engine
+
+    @property
+    def fills(self) -> List[Fill]:
+        return self._fills
+
+    def replay_candle(self, candle: Candle) -> List[Fill]:
+        self._clock.advance_to(candle.get_time().close_time.as_epoch_time())
+        price = candle.get_price()
+        return self._record(self._engine.match_candle(low_price=price.low_price, high_price=price.high_price,
+                                                      volume=candle.get_volume(),
+                                                      timestamp=self._clock.now))
+
+    def replay_order_book(self, order_book: OrderBook, timestamp: int) -> List[Fill]:
+        self._clock.advance_to(timestamp)
+        return self._record(self._engine.match_order_book(order_book, self._clock.now))
+
+    def _record(self, fills: List[Fill]) -> List[Fill]:
+        for fill in fills:
+            if fill.order.state is OrderState.filled:
+                self._last_filled_order = fill.order
+        self._fills += fills
+        return fills
+
+    def place_order(self, order: Order) -> Order:
+        order.id = OrderID(len(self._orders) + 1)
+        order.timestamp = self._clock.as_milliseconds()
+        self._orders[order.id] = order
+        self._record(self._engine.submit(order, self._clock.now))
+        return order
+
+    def modify_order(self, order: Order, price: Price, size: Size) -> bool:
+        order = self._orders.get(order.id)
+        if order is None:
+            return False
+        is_modified, fills = self._engine.modify(order.id, price, size, self._clock.now)
+        if is_modified:
+            order.timestamp = self._clock.as_milliseconds()
+        self._record(fills)
+        return is_modified
+
+    def get_open_orders(self, order_id: Optional[OrderID] = None) -> List[Optional[Order]]:
+        if order_id is None:
+            return self._engine.open_orders
+        return [self._orders[order_id]] if order_id in self._engine else []
+
+    def cancel_order(self, order_id: OrderID) -> bool:
+        return self._engine.cancel(order_id) is not None
+
+    def get_last_n_orders(self, trading_pair: TradingPair, n: int) -> List[Order]:
+        """The last n orders placed, newest first."""
+        return list(islice(reversed(self._orders.values()), n))
+
+    def get_last_filled_order(self, trading_pair: TradingPair) -> Order:
+        return self._last_filled_order
+
+    def get_order_history(self, trading_pair: TradingPair) -> List[Order]:
+        return list(reversed(self._orders.values()))
+
+    def get_orderbook(self, trading_pair: TradingPair) -> OrderBook:
+        """Price levels of the resting orders, best first."""
+        levels = {Side.bid: OrderedDict(), Side.ask: OrderedDict()}
+        for order in self._engine.open_orders:
+            count, size = levels[order.side].get(order.price, (0, 0.0))
+            levels[order.side][order.price] = (count + 1, size + self._engine.remaining(order.id))
+        return OrderBook(trading_pair=self._trading_pair,
+                         bids=[Bid(price, count, size)
+                               for price, (count, size) in sorted(levels[Side.bid].items(), reverse=True)],
+                         asks=[Ask(price, count, size) for price, (count, size) in sorted(levels[Side.ask].items())])
+
+    def get_orders_trades(self, order_id: OrderID):
+        return [fill for fill in self._fills if fill.order.id == order_id]
+
+    def get_trades(self) -> List[Fill]:
+        return list(self._fills)
@@ -0,0 +1,131 @@
+import logging
+import time
+from typing import Dict
+
+import numpy as np
+
+from src.backtesting.backtest_engine import BacktestEngine
+from src.classification.classifier_helpers import replace_repeating_signals_with_holds
+from src.classification.trading_classifier import TradingClassifier, fudge_factor
+from src.containers.order import Order
+from src.containers.portfolio import FEES, Portfolio
+from src.containers.signal_array import SignalArray, HOLD
+from src.containers.stock_data import StockData
+from src.feature_extraction.indicator_graph import IndicatorGraph
+
+TRADE_SIZE = 1.0  # size of the orders made by Order.from_signal
+
+
+class VectorizedBacktestResult(object):
+    """Per candle arrays of a vectorized backtest.
+
+    `signals` holds the signal codes after repeats have been replaced with holds (holds as well where there
+    is no prediction), `fills` the signed amounts bought (positive) or sold (negative) at the close price,
+    `positions` the amount held after each candle, `fees` the fees paid on each fill, and `cash` and
+    `equity` the remaining capital and its sum with the value of the position at the close price.
+    """
+
+    def __init__(self, close_time: np.ndarray, price: np.ndarray, signals: np.ndarray, fills: np.ndarray,
+                 positions: np.ndarray, fees: np.ndarray, cash: np.ndarray, equity: np.ndarray):
+        self._close_time = close_time
+        self._price = price
+        self._signals = signals
+        self._fills = fills
+        self._positions = positions
+        self._fees = fees
+        self._cash = cash
+        self._equity = equity
+
+    @property
+    def close_time(self) -> np.ndarray:
+        return self._close_time
+
+    @property
+    def price(self) -> np.ndarray:
+        return self._price
+
+    @property
+    def signals(self) -> np.ndarray:
+        return self._signals
+
+    @property
+    def fills(self) -> np.ndarray:
+        return self._fills
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self._positions
+
+    @property
+    def fees(self) -> np.ndarray:
+        return self._fees
+
+    @property
+    def cash(self) -> np.ndarray:
+        return self._cash
+
+    @property
+    def equity(self) -> np.ndarray:
+        return self._equity
+
+    @property
+    def trades(self) -> SignalArray:
+        return SignalArray(self._signals, self._close_time, self._price).trades()
+
+
+def predict_all_candles(classifier: TradingClassifier, stock_data: StockData) -> np.ndarray:
+    """Prediction for every candle (nan until all indicators have a result), with the indicators starting from
+    scratch, which is what predict_one() gives after classifier.reset_indicators()."""
+    indicator_graph = IndicatorGraph(classifier.list_of_technical_indicators)
+    features = np.column_stack(list(indicator_graph.compute_series(stock_data.candles).values()))
+    is_ready = ~np.isnan(features).any(axis=1)
+    predictions = np.full(len(features), np.nan)
+    if np.any(is_ready):
+        predictions[is_ready] = classifier.model.predict(features[is_ready] * fudge_factor)
+    return predictions
+
+
+def run_vectorized_backtest(classifier: TradingClassifier, stock_data: StockData, initial_capital: float,
+                            fees: float = FEES, trade_size: float = TRADE_SIZE) -> VectorizedBacktestResult:
+    """Backtest a classifier whose predictions only depend on the indicators, in one pass of array operations."""
+    candles = stock_data.candles
+    price = candles.close_price
+    predictions = predict_all_candles(classifier, stock_data)
+    is_predicted = ~np.isnan(predictions)
+    signals = np.full(len(candles), HOLD, dtype=np.int8)
+    signals[is_predicted] = SignalArray(predictions[is_predicted], candles.close_time[is_predicted],
+                                        price[is_predicted]).replace_repeats_with_holds().signals
+    # a buy signal (-1) buys, a sell signal (1) sells
+    fills = -signals * trade_size
+    traded_value = fills * price
+    fees_paid = np.abs(traded_value) * fees
+    positions = np.cumsum(fills)
+    cash = initial_capital - np.cumsum(traded_value) - np.cumsum(fees_paid)
+    return VectorizedBacktestResult(close_time=candles.close_time, price=price, signals=signals, fills=fills,
+                                    positions=positions, fees=fees_paid, cash=cash, equity=cash + positions * price)
+
+
+def compare_with_event_driven_backtest(classifier: TradingClassifier, stock_data: StockData,
+                                       initial_capital: float, trade_amount: float) -> Dict[str, float]:
+    """Time the vectorized backtest against the event-driven one (BacktestEngine, followed by the signal to
+    order conversion of generate_all_signals_at_once), both starting from fresh indicators."""
+    event_driven_classifier = classifier.copy_for_prediction()
+    event_driven_classifier.reset_indicators()
+    start = time.perf_counter()
+    engine = BacktestEngine(event_driven_classifier, Portfolio(initial_capital, trade_amount))
+    signals = engine.run(stock_data).signals
+    portfolio = Portfolio(initial_capital, trade_amount)
+    for signal in replace_repeating_signals_with_holds(signals):
+        portfolio.update(Order.from_signal(signal))
+    portfolio.compute_performance()
+    event_driven_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    run_vectorized_backtest(classifier, stock_data, initial_capital)
+    vectorized_time = time.perf_counter() - start
+
+    report = {"event_driven_time": event_driven_time, "vectorized_time": vectorized_time,
+              "speedup": event_driven_time / vectorized_time}
+    logging.info("Vectorized backtest of {} candles took {:.3f} s instead of {:.3f} s ({:.1f}x faster)".format(
+        len(stock_data), vectorized_time, event_driven_time, report["speedup"]))
+    return report
@@ -1,17 +1,19 @@
 import hashlib
 import os
-from datetime import datetime
-from typing import Set, List, Union
+from datetime import datetime, timedelta
+from typing import Set, List, Union, Optional
 
 from src.analysis_tools.analyze_batch_run import analyze_batch_run
 from src.connection.helpers import clear_downloaded_stock_data
 from src.datetime_helpers import datetime_to_nth_day, nth_day_to_datetime
 from src.helpers import generate_hash
 from src.classification.trading_classifier import TradingClassifier
-from src.classification.train_classifier import train_classifier, run_trained_classifier
+from src.classification.train_classifier import train_classifiers_in_parallel, run_saved_classifiers_in_parallel
+from src.connection.load_stock_data import load_stock_data
 from src.containers.candle import Candle
 from src.containers.time_windows import TimeWindow
 from src.definitions import DATA_DIR
+from src.feature_extraction.feature_cache import FeatureCache
 from src.feature_extraction.technical_indicator import TechnicalIndicator, PPOTechnicalIndicator, \
     AutoCorrelationTechnicalIndicator
 from src.type_aliases import Hash, Path, BinanceClient
@@ -79,19 +81,24 @@ def batch_train(training_time_windows: List[TimeWindow],
                 client: Union[BinanceClient],
                 number_of_training_runs: int,
                 technical_indicators: List[TechnicalIndicator],
+                max_workers: Optional[int] = None,
+                seed: int = 1234,
                 ) -> Set[Hash]:
     hashes = []
+    training_jobs = []
     for training_time_window in training_time_windows:
+        # download in this process, once per time window, rather than from each worker
+        stock_data_training_set = load_stock_data(training_time_window, trading_pair, timedelta(minutes=1), client)
         for i in range(0, number_of_training_runs):
             training_session_hash = generate_hash(training_time_window, trading_pair, i)
             path_to_classifier = os.path.join(DATA_DIR, "classifier_{}.dill".format(training_session_hash))
-            train_classifier(trading_pair=trading_pair,
-                             training_time_window=training_time_window,
-                             technical_indicators=technical_indicators,
-                             path_to_classifier=path_to_classifier,
-                             client=client
-                             )
+            training_jobs.append((stock_data_training_set, training_time_window, path_to_classifier, seed + i))
             hashes.append(training_session_hash)
+    train_classifiers_in_parallel(trading_pair=trading_pair,
+                                  training_jobs=training_jobs,
+                                  technical_indicators=technical_indicators,
+                                  max_workers=max_workers,
+                                  feature_cache=FeatureCache())
     return set(hashes)
 
 
@@ -100,25 +107,31 @@ def batch_test(testing_time_windows: List[TimeWindow],
                trade_amount: float,
                number_of_testing_runs: int,
                client: Union[BinanceClient],
-               classifier: TradingClassifier) -> Set[Hash]:
-    training_time_window = classifier.training_time_window
+               paths_to_classifiers: List[Path],
+               max_workers: Optional[int] = None) -> Set[Hash]:
+    """Test every saved classifier on the testing time windows it was not trained on, all in one pool."""
     hashes = []
+    testing_jobs = []
+    for path_to_classifier in paths_to_classifiers:
+        training_time_window = TradingClassifier.load_from_disk(path_to_classifier).training_time_window
+        for testing_time_window in testing_time_windows:
+            if not training_time_window.__is_overlap__(testing_time_window):
+                for i in range(0, number_of_testing_runs):
+                    testing_session_hash = generate_hash(training_time_window, testing_time_window,
+                                                         trading_pair, i)
+                    path_to_portfolio = os.path.join(DATA_DIR, "portfolio_{}.dill".format(testing_session_hash))
+                    testing_jobs.append((path_to_classifier, testing_time_window, path_to_portfolio))
+                    hashes.append(testing_session_hash)
     for testing_time_window in testing_time_windows:
-        if not training_time_window.__is_overlap__(testing_time_window):
-            for i in range(0, number_of_testing_runs):
-                testing_session_hash = generate_hash(training_time_window, testing_time_window, trading_pair, i)
-                path_to_portfolio = os.path.join(DATA_DIR, "portfolio_{}.dill".format(testing_session_hash))
-                logging.info("Saving portfolio to {}".format(path_to_portfolio))
-                run_trained_classifier(trading_pair=trading_pair,
-                                       trade_amount=trade_amount,
-                                       testing_data=testing_time_window,
-                                       classifier=classifier,
-                                       path_to_portfolio=path_to_portfolio,
-                                       client=client
-
-                                       # TODO: define saveload mixin for portfolio class
-                                       )
-                hashes.append(testing_session_hash)
+        if any(job[1] is testing_time_window for job in testing_jobs):
+            # fill the candle cache, which the workers then read from
+            load_stock_data(testing_time_window, trading_pair, timedelta(minutes=1), client)
+    for path_to_portfolio in run_saved_classifiers_in_parallel(trading_pair=trading_pair,
+                                                               trade_amount=trade_amount,
+                                                               testing_jobs=testing_jobs,
+                                                               max_workers=max_workers,
+                                                               feature_cache=FeatureCache()):
+        logging.info("Saved portfolio to {}".format(path_to_portfolio))
     return set(hashes)
 
 
@@ -175,21 +188,15 @@ def run_batch():
             PPOTechnicalIndicator(Candle.get_volume, 20, 10),
             PPOTechnicalIndicator(Candle.get_volume, 30, 10),
         ])
-    testing_hashes = []
-    for training_hash in training_hashes:
-        path_to_classifier = os.path.join(DATA_DIR, "classifier_{}.dill".format(training_hash))
-        print(path_to_classifier)
-        classifier = TradingClassifier.load_from_disk(path_to_classifier)
-        print(type(classifier))
-        testing_hashes += batch_test(
-            testing_time_windows=testing_time_windows,
-            trading_pair=trading_pair,
-            trade_amount=trade_amount,
-            number_of_testing_runs=1,
-            classifier=classifier,
-            client=client
-
-        )
+    testing_hashes = batch_test(
+        testing_time_windows=testing_time_windows,
+        trading_pair=trading_pair,
+        trade_amount=trade_amount,
+        number_of_testing_runs=1,
+        paths_to_classifiers=[os.path.join(DATA_DIR, "classifier_{}.dill".format(training_hash))
+                              for training_hash in training_hashes],
+        client=client
+    )
 
     return training_hashes, testing_hashes
 
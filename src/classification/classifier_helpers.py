@@ -1,14 +1,16 @@
-from typing import List, Union, Tuple
+from typing import List, Union, Tuple, Optional
 import numpy as np
 import pandas as pd
 from sklearn.metrics import confusion_matrix
 
 from src.containers.order import Order
 from src.containers.signal import SignalBuy, SignalSell, SignalHold
+from src.containers.signal_array import SignalArray
 from src.classification.helpers import get_training_labels
 from src.classification.trading_classifier import TradingClassifier
 from src.containers.portfolio import Portfolio
 from src.containers.stock_data import StockData, load_from_disk
+from src.feature_extraction.feature_cache import FeatureCache
 from src.containers.trade_helper import generate_trading_signal_from_prediction, generate_trading_signals_from_array
 from src.type_aliases import Path
 
@@ -62,7 +64,10 @@ def generate_signals_from_classifier(stock_data: Union[Path, StockData],
     return predicted_signals
 
 
-def replace_repeating_signals_with_holds(signals: List[Union[SignalBuy, SignalSell]]) -> List[Union[SignalBuy, SignalSell, SignalHold]]:
+def replace_repeating_signals_with_holds(signals: Union[SignalArray, List[Union[SignalBuy, SignalSell]]]) \
+        -> Union[SignalArray, List[Union[SignalBuy, SignalSell, SignalHold]]]:
+    if isinstance(signals, SignalArray):
+        return signals.replace_repeats_with_holds()
     cleaned_up_signals = []
     previous_signal = None
     for signal in signals:
@@ -75,11 +80,13 @@ def replace_repeating_signals_with_holds(signals: List[Union[SignalBuy, SignalSe
     return cleaned_up_signals
 
 
-def generate_all_signals_at_once(stock_data_testing_set, classifier, predicted_portfolio) -> Tuple[
-    TradingClassifier, Portfolio, List[Union[SignalBuy, SignalSell, SignalHold]]]:
-    predictions = classifier.predict(stock_data_testing_set)
-    signals = generate_trading_signals_from_array(predictions[:], stock_data_testing_set)
-    cleaned_up_signals = replace_repeating_signals_with_holds(signals[:])
-    for signal in cleaned_up_signals:
+def generate_all_signals_at_once(stock_data_testing_set, classifier, predicted_portfolio,
+                                 feature_cache: Optional[FeatureCache] = None) -> Tuple[
+    TradingClassifier, Portfolio, SignalArray]:
+    predictions = classifier.predict(stock_data_testing_set, feature_cache)
+    signals = generate_trading_signals_from_array(predictions, stock_data_testing_set)
+    cleaned_up_signals = replace_repeating_signals_with_holds(signals)
+    # holds do not result in orders
+    for signal in cleaned_up_signals.trades():
         predicted_portfolio.update(Order.from_signal(signal))
     return classifier, predicted_portfolio, cleaned_up_signals
@@ -0,0 +1,135 @@
+import numpy as np
+import sklearn
+from sklearn.ensemble import RandomForestClassifier
+
+from src.type_aliases import Path
+
+# Up to scikit-learn 1.3 the leaves of a classification tree hold weighted class counts, which predict_proba
+# normalizes; from 1.4 on they hold the class fractions directly.
+_ARE_LEAF_VALUES_NORMALIZED = tuple(int(part) for part in sklearn.__version__.split(".")[:2]) >= (1, 4)
+
+ROWS_PER_CHUNK = 256
+
+
+def _leaf_probabilities(value: np.ndarray) -> np.ndarray:
+    if _ARE_LEAF_VALUES_NORMALIZED:
+        return value.copy()
+    normalizer = value.sum(axis=1)[:, np.newaxis]
+    normalizer[normalizer == 0.0] = 1.0
+    return value / normalizer
+
+
+class FlatForest(object):
+    """Random forest classifier flattened into contiguous node arrays.
+
+    The nodes of all trees are concatenated; children indices are global and leaves point to themselves,
+    so evaluation walks every (row, tree) pair one level per step with a few numpy gathers. Class
+    probabilities are summed in tree order and averaged exactly as RandomForestClassifier.predict_proba
+    does (on float32 inputs), so predictions are identical to the sklearn model it was exported from.
+    """
+
+    def __init__(self, roots: np.ndarray, children_left: np.ndarray, children_right: np.ndarray,
+                 feature: np.ndarray, threshold: np.ndarray, missing_go_to_left: np.ndarray,
+                 leaf_probabilities: np.ndarray, classes: np.ndarray, max_depth: int,
+                 feature_importances: np.ndarray):
+        self._roots = roots
+        self._children_left = children_left
+        self._children_right = children_right
+        self._feature = feature
+        self._threshold = threshold
+        self._missing_go_to_left = missing_go_to_left
+        self._leaf_probabilities = leaf_probabilities
+        self._classes = classes
+        self._max_depth = max_depth
+        self._feature_importances = feature_importances
+        # children of node i at 2 * i (right) and 2 * i + 1 (left), so that one gather moves every walk a level down
+        self._children = np.stack([children_right, children_left], axis=1).ravel()
+
+    @staticmethod
+    def from_sklearn(forest: RandomForestClassifier):
+        if not hasattr(forest, "estimators_"):
+            raise TypeError("Only fitted random forests can be flattened")
+        if forest.n_outputs_ != 1:
+            raise ValueError("Only single output forests are supported")
+        roots, children_left, children_right, feature, threshold, missing_go_to_left, leaf_probabilities = \
+            [], [], [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            node_indices = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            roots.append(offset)
+            children_left.append(np.where(is_leaf, node_indices, tree.children_left) + offset)
+            children_right.append(np.where(is_leaf, node_indices, tree.children_right) + offset)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            missing_go_to_left.append(getattr(tree, "missing_go_to_left", np.zeros(tree.node_count)))
+            leaf_probabilities.append(_leaf_probabilities(tree.value[:, 0, :forest.n_classes_]))
+            offset += tree.node_count
+        return FlatForest(roots=np.array(roots, dtype=np.int32),
+                          children_left=np.concatenate(children_left).astype(np.int32),
+                          children_right=np.concatenate(children_right).astype(np.int32),
+                          feature=np.concatenate(feature).astype(np.int32),
+                          threshold=np.concatenate(threshold).astype(np.float64),
+                          missing_go_to_left=np.concatenate(missing_go_to_left).astype(bool),
+                          leaf_probabilities=np.concatenate(leaf_probabilities).astype(np.float64),
+                          classes=np.array(forest.classes_),
+                          max_depth=max(estimator.tree_.max_depth for estimator in forest.estimators_),
+                          feature_importances=np.array(forest.feature_importances_))
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return self._classes
+
+    @property
+    def feature_importances_(self) -> np.ndarray:
+        return self._feature_importances
+
+    @property
+    def n_estimators(self) -> int:
+        return len(self._roots)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Return the index of the leaf reached in every tree, shape (number of rows, number of trees)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        samples_of_rows = X.ravel()
+        row_offsets = (np.arange(len(X)) * X.shape[1])[:, np.newaxis]
+        has_missing_values = np.isnan(samples_of_rows).any()
+        nodes = np.broadcast_to(self._roots, (len(X), len(self._roots)))
+        for _ in range(self._max_depth):
+            samples = samples_of_rows.take(row_offsets + self._feature.take(nodes))
+            go_left = samples <= self._threshold.take(nodes)
+            if has_missing_values:
+                go_left |= np.isnan(samples) & self._missing_go_to_left.take(nodes)
+            nodes = self._children.take(2 * nodes + go_left)
+        return nodes
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        probabilities = np.empty((len(X), len(self._classes)))
+        for start in range(0, len(X), ROWS_PER_CHUNK):
+            leaf_probabilities = self._leaf_probabilities[self.apply(X[start:start + ROWS_PER_CHUNK])]
+            # accumulate tree by tree, in the same order as sklearn, rather than with a pairwise sum
+            probabilities[start:start + ROWS_PER_CHUNK] = np.add.accumulate(leaf_probabilities, axis=1)[:, -1]
+        probabilities /= len(self._roots)
+        return probabilities
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self._classes.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    def save_to_disk(self, path_to_file: Path):
+        np.savez_compressed(path_to_file, roots=self._roots, children_left=self._children_left,
+                            children_right=self._children_right, feature=self._feature, threshold=self._threshold,
+                            missing_go_to_left=self._missing_go_to_left,
+                            leaf_probabilities=self._leaf_probabilities, classes=self._classes,
+                            max_depth=self._max_depth, feature_importances=self._feature_importances)
+
+    @staticmethod
+    def load_from_disk(path_to_file: Path):
+        with np.load(path_to_file) as arrays:
+            return FlatForest(roots=arrays["roots"], children_left=arrays["children_left"],
+                              children_right=arrays["children_right"], feature=arrays["feature"],
+                              threshold=arrays["threshold"], missing_go_to_left=arrays["missing_go_to_left"],
+                              leaf_probabilities=arrays["leaf_probabilities"], classes=arrays["classes"],
+                              max_depth=int(arrays["max_depth"]),
+                              feature_importances=arrays["feature_importances"])
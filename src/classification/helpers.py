@@ -1,16 +1,17 @@
 import logging
 import warnings
-from collections import defaultdict
-from typing import DefaultDict, List
+from collections import defaultdict, OrderedDict
+from typing import DefaultDict, List, Union
 
 import numpy as np
 import pandas as pd
 
-from src.containers.signal import SignalBuy, SignalSell
 from src.containers.candle import Candle
-from src.containers.data_point import PricePoint
+from src.containers.signal_array import SignalArray
 from src.containers.stock_data import StockData
-from src.feature_extraction.technical_indicator import TechnicalIndicator
+from src.feature_extraction.indicator_graph import IndicatorGraph
+from src.feature_extraction.technical_indicator import TechnicalIndicator, \
+    NoUniqueNameforCompoundTechnicalIndicatorWarning
 
 
 def extract_indicators_from_stock_data(stock_data, list_of_technical_indicators):
@@ -21,9 +22,24 @@ def extract_indicators_from_stock_data(stock_data, list_of_technical_indicators)
     return training_data
 
 
-def convert_to_pandas(predictors: defaultdict(list), labels: list = None):
+def compute_indicators_from_stock_data(stock_data: StockData,
+                                       list_of_technical_indicators: Union[List[TechnicalIndicator], IndicatorGraph],
+                                       advance_state: bool = True):
+    """Vectorized counterpart of extract_indicators_from_stock_data(), one column per indicator."""
+    if isinstance(list_of_technical_indicators, IndicatorGraph):
+        return list_of_technical_indicators.compute_series(stock_data.candles, advance_state=advance_state)
+    training_data = OrderedDict()
+    for indicator in list_of_technical_indicators:
+        if indicator.technical_indicator_name is None:
+            warnings.warn("You must explicitly specify a unique name for the technical indicator "
+                          "(property technical_indicator_name)", NoUniqueNameforCompoundTechnicalIndicatorWarning)
+        training_data[str(indicator)] = indicator.compute_series(stock_data.candles, advance_state=advance_state)
+    return training_data
+
+
+def convert_to_pandas(predictors: defaultdict(list), labels: SignalArray = None):
     if labels is not None:
-        lst = [np.nan] + [trading_signal.signal for trading_signal in labels]
+        lst = np.concatenate([[np.nan], labels.signals])
     else:
         lst = [0] * len(list(predictors.values())[0])
     predictors['labels'] = lst
@@ -31,21 +47,18 @@ def convert_to_pandas(predictors: defaultdict(list), labels: list = None):
     return df[[col for col in df.columns if col != 'labels']], df['labels']
 
 
-def get_training_labels(stock_data: StockData):
-    training_labels = []
-    for current_candle, next_candle in list(zip(stock_data.candles[0:], stock_data.candles[1:])):
-
-        if next_candle.get_close_price() > current_candle.get_close_price():
-            training_labels.append(SignalBuy(-1, PricePoint(value=current_candle.get_close_price(),
-                                                            date_time=current_candle.get_close_time_as_datetime())))
-        else:
-            training_labels.append(SignalSell(1, PricePoint(value=current_candle.get_close_price(),
-                                                            date_time=current_candle.get_close_time_as_datetime())))
-    return training_labels
+def get_training_labels(stock_data: StockData) -> SignalArray:
+    return SignalArray.from_price_moves(stock_data)
 
 
 def update_indicators(candle: Candle, training_data: DefaultDict,
-                      list_of_technical_indicators: List[TechnicalIndicator]):
+                      list_of_technical_indicators: Union[List[TechnicalIndicator], IndicatorGraph]):
+    if isinstance(list_of_technical_indicators, IndicatorGraph):
+        list_of_technical_indicators.update(candle)
+        for indicator_key, result in zip(list_of_technical_indicators.technical_indicator_names,
+                                         list_of_technical_indicators.results):
+            training_data[indicator_key].append(result)
+        return training_data
     for indicator in list_of_technical_indicators:
         if indicator.technical_indicator_name is None:
             warnings.warn("You must explicitly specify a unique name for the technical indicator "
@@ -69,7 +82,3 @@ def timeshift_predictions(labels: pd.Series) -> pd.Series:
     ser = pd.Series(np.roll(labels, -1))
     ser.index += 1
     return ser
-
-
-class NoUniqueNameforCompoundTechnicalIndicatorWarning(UserWarning):
-    pass
\ No newline at end of file
@@ -1,14 +1,18 @@
-from typing import List
+import copy
+import time
+from typing import List, Optional
 
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 
+from src.classification.flat_forest import FlatForest
 from src.classification.helpers import extract_indicators_from_stock_data, convert_to_pandas, \
-    get_training_labels, \
-    extract_indicator_from_candle, timeshift_predictions
+    get_training_labels, timeshift_predictions, compute_indicators_from_stock_data
 from src.containers.candle import Candle
 from src.containers.stock_data import StockData
 from src.containers.time_windows import TimeWindow
+from src.feature_extraction.feature_cache import FeatureCache
+from src.feature_extraction.indicator_graph import IndicatorGraph
 from src.feature_extraction.technical_indicator import TechnicalIndicator
 from src.mixins.save_load_mixin import DillSaveLoadMixin, JsonSaveMixin
 from src.type_aliases import Path
@@ -25,13 +29,17 @@ class TradingClassifier:
                  training_ratio: float):
         self._stock_data_live = StockData(candles=[], trading_pair=trading_pair)
         self._list_of_technical_indicators = list_of_technical_indicators
+        self._indicator_graph = IndicatorGraph(list_of_technical_indicators)
         self._maximum_lag = max([ti.lags for ti in list_of_technical_indicators])
         self._is_candles_requirement_satisfied = False
         self._sklearn_classifier = sklearn_classifier
+        self._flat_forest = None
         self._training_ratio = training_ratio
         self._training_time_window = training_time_window
         self._predictors = np.ndarray
         self._labels = np.ndarray
+        self._feature_vector = None
+        self._prediction_latency = None
         self._dill_save_load = DillSaveLoadMixin()
         self._json_save = JsonSaveMixin()
 
@@ -39,44 +47,105 @@ class TradingClassifier:
     def sklearn_classifier(self):
         return self._sklearn_classifier
 
+    @property
+    def model(self):
+        """The model used for predictions: the compiled forest if there is one, else the sklearn classifier."""
+        flat_forest = getattr(self, "_flat_forest", None)
+        return self._sklearn_classifier if flat_forest is None else flat_forest
+
+    def compile_forest(self, keep_sklearn_classifier: bool = True):
+        """Flatten the trained random forest into a FlatForest, which then serves all predictions.
+
+        Dropping the sklearn classifier shrinks the classifier file considerably."""
+        self._flat_forest = FlatForest.from_sklearn(self._sklearn_classifier)
+        if not keep_sklearn_classifier:
+            self._sklearn_classifier = None
+
+    def copy_for_prediction(self):
+        """Copy sharing the trained model, with its own indicator state, so that predictions made with the
+        copy and with the original do not affect each other."""
+        classifier = copy.copy(self)
+        classifier._indicator_graph = copy.deepcopy(self.indicator_graph)
+        classifier._stock_data_live = copy.deepcopy(self._stock_data_live)
+        classifier._feature_vector = None
+        return classifier
+
+    def reset_indicators(self):
+        """Forget every candle seen so far, including the training set, so that the next predictions start
+        from indicators that have not been updated yet."""
+        self._indicator_graph = IndicatorGraph(self._list_of_technical_indicators)
+        self._stock_data_live = StockData(candles=[], trading_pair=self._stock_data_live.trading_pair)
+        self._feature_vector = None
+
     def erase_classifier_from_memory(self):
         delattr(self, "_sklearn_classifier")
+        if hasattr(self, "_flat_forest"):
+            delattr(self, "_flat_forest")
+
+    @property
+    def indicator_graph(self) -> IndicatorGraph:
+        # classifiers pickled before the indicator graph was introduced keep their state in the indicators
+        if getattr(self, "_indicator_graph", None) is None:
+            self._indicator_graph = IndicatorGraph(self._list_of_technical_indicators)
+        return self._indicator_graph
+
+    @property
+    def list_of_technical_indicators(self) -> List[TechnicalIndicator]:
+        return self._list_of_technical_indicators
+
+    @property
+    def prediction_latency(self):
+        """Wall clock time in seconds taken by the last call to predict_one()."""
+        return getattr(self, "_prediction_latency", None)
 
     @property
     def training_time_window(self):
         return self._training_time_window
 
-    def _precondition(self, stock_data_training: StockData):
-        training_data = extract_indicators_from_stock_data(stock_data_training,
-            self._list_of_technical_indicators)
+    def _precondition(self, stock_data_training: StockData, feature_cache: Optional[FeatureCache] = None):
+        # the indicators are left in the same state as if they had been updated candle by candle
+        def compute():
+            return compute_indicators_from_stock_data(stock_data_training, self.indicator_graph, advance_state=True)
+
+        training_data = compute() if feature_cache is None else \
+            feature_cache.load(stock_data_training, self.indicator_graph, compute)
         self._predictors, self._labels = convert_to_pandas(predictors=training_data,
             labels=get_training_labels(stock_data_training))
 
         self._labels = timeshift_predictions(self._labels)
 
-    def train(self, stock_data_training: StockData):
-        self._precondition(stock_data_training)
+    def train(self, stock_data_training: StockData, feature_cache: Optional[FeatureCache] = None):
+        self._precondition(stock_data_training, feature_cache)
         self._sklearn_classifier.fit(
             X=self._predictors.values * fudge_factor,
             y=self._labels.values)
 
-    def predict(self, stock_data: StockData):
+    def predict(self, stock_data: StockData, feature_cache: Optional[FeatureCache] = None):
         '''Return Buy/Sell/Hold prediction for a stock dataset.
         stock_data.candles must be of length at least self._maximum_lag'''
-        testing_data = extract_indicators_from_stock_data(stock_data,
-            self._list_of_technical_indicators)
+        def compute():
+            return extract_indicators_from_stock_data(stock_data, self.indicator_graph)
+
+        testing_data = compute() if feature_cache is None else \
+            feature_cache.load(stock_data, self.indicator_graph, compute)
         predictors, _ = convert_to_pandas(predictors=testing_data, labels=None)
         predictors *= fudge_factor
         # TODO: Implement trading based on probabilities
-        predicted_values = self.sklearn_classifier.predict(predictors)
+        predicted_values = self.model.predict(predictors.values)
         return predicted_values
 
     def predict_one(self, candle: Candle):
-        # if self._is_candles_requirement_satisfied:
-        testing_data = extract_indicator_from_candle(candle, self._list_of_technical_indicators)
-        predictors, _ = convert_to_pandas(predictors=testing_data, labels=None)
-        predictors *= fudge_factor
-        predicted_values = self._sklearn_classifier.predict(predictors)
+        start = time.perf_counter()
+        indicator_graph = self.indicator_graph
+        indicator_graph.update(candle)
+        if getattr(self, "_feature_vector", None) is None:
+            self._feature_vector = np.empty((1, len(indicator_graph.technical_indicator_names)))
+        indicator_graph.write_results(self._feature_vector[0])
+        if np.isnan(self._feature_vector).any():
+            raise ValueError("Not enough candles yet to compute all technical indicators")
+        self._feature_vector *= fudge_factor
+        predicted_values = self.model.predict(self._feature_vector)
+        self._prediction_latency = time.perf_counter() - start
         return predicted_values
 
     def append_new_candle(self, candle: Candle):
@@ -2,9 +2,9 @@ import copy
 import hashlib
 import logging
 import os
-import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import timedelta, datetime
-from typing import List, Union
+from typing import List, Union, Optional, Tuple, Iterator
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -17,12 +17,14 @@ from src.containers.signal import SignalBuy, SignalSell
 from src.classification.classifier_helpers import compute_confusion_matrix, \
     generate_reference_portfolio, generate_all_signals_at_once
 from src.classification.trading_classifier import TradingClassifier
+from src.connection.candle_cache import CandleCache
 from src.connection.load_stock_data import load_stock_data
 from src.containers.candle import Candle
 from src.containers.portfolio import Portfolio
 from src.containers.stock_data import StockData, load_from_disk
 from src.containers.time_windows import TimeWindow
 from src.definitions import DATA_DIR, TEST_DATA_DIR
+from src.feature_extraction.feature_cache import FeatureCache
 from src.feature_extraction.technical_indicator import AutoCorrelationTechnicalIndicator, \
     PPOTechnicalIndicator, TechnicalIndicator
 from src.live_logic.parameters import LiveParameters
@@ -32,7 +34,8 @@ from src.containers.trading_pair import TradingPair
 
 
 def generate_predicted_portfolio(initial_capital: int, parameters: LiveParameters,
-                                 stock_data_testing_set: StockData, classifier: TradingClassifier):
+                                 stock_data_testing_set: StockData, classifier: TradingClassifier,
+                                 feature_cache: Optional[FeatureCache] = None):
     my_classifier = copy.copy(classifier)
     my_classifier.erase_classifier_from_memory()
     predicted_portfolio = Portfolio(initial_capital=initial_capital,
@@ -41,7 +44,8 @@ def generate_predicted_portfolio(initial_capital: int, parameters: LiveParameter
 
     classifier, predicted_portfolio, predicted_signals = generate_all_signals_at_once(stock_data_testing_set,
                                                                                       classifier,
-                                                                                      predicted_portfolio)
+                                                                                      predicted_portfolio,
+                                                                                      feature_cache)
     for signal in predicted_signals:
         predicted_portfolio.update(signal)
 
@@ -58,34 +62,92 @@ def generate_reference_to_prediction_portfolio(initial_capital, parameters, stoc
     return predicted_portfolio, predicted_signals, reference_portfolio, training_signals
 
 
-def train_classifier(trading_pair: TradingPair,
-                     client: Union[BinanceClient],
-                     training_time_window: TimeWindow,
-                     technical_indicators: List[TechnicalIndicator],
-                     path_to_classifier: Path,
-                     ):
-    stock_data_training_set = load_stock_data(training_time_window, trading_pair, timedelta(minutes=1), client)
+def fit_classifier(trading_pair: TradingPair,
+                   stock_data_training_set: StockData,
+                   training_time_window: TimeWindow,
+                   technical_indicators: List[TechnicalIndicator],
+                   n_jobs: Optional[int] = -1,
+                   seed: int = 1234,
+                   n_estimators: int = 5000,
+                   feature_cache: Optional[FeatureCache] = None,
+                   ) -> TradingClassifier:
+    """Train a random forest classifier on n_jobs cores (-1 for all of them).
 
+    The trees only depend on the seed, so the result is the same whatever the number of jobs."""
     sklearn_classifier = RandomForestClassifier(max_depth=5,
-                                                n_estimators=5000,
+                                                n_estimators=n_estimators,
                                                 # criterion="gini",
                                                 class_weight="balanced",
-                                                random_state=random.seed(1234))
+                                                n_jobs=n_jobs,
+                                                random_state=seed)
 
     # sklearn_classifier = SVC(gamma="auto")
     training_ratio = 0.5  # this is not enabled
     my_classifier = TradingClassifier(trading_pair, technical_indicators,
                                       sklearn_classifier, training_time_window, training_ratio)
-    my_classifier.train(stock_data_training_set)
+    my_classifier.train(stock_data_training_set, feature_cache)
+    # predictions are one candle at a time, where dispatching to a pool of workers only adds overhead
+    sklearn_classifier.set_params(n_jobs=None)
+    return my_classifier
+
+
+def fit_and_save_classifier(trading_pair: TradingPair,
+                            stock_data_training_set: StockData,
+                            training_time_window: TimeWindow,
+                            technical_indicators: List[TechnicalIndicator],
+                            path_to_classifier: Path,
+                            n_jobs: Optional[int] = -1,
+                            seed: int = 1234,
+                            n_estimators: int = 5000,
+                            feature_cache: Optional[FeatureCache] = None,
+                            ):
+    my_classifier = fit_classifier(trading_pair, stock_data_training_set, training_time_window,
+                                   technical_indicators, n_jobs, seed, n_estimators, feature_cache)
+    my_classifier.compile_forest(keep_sklearn_classifier=False)
     my_classifier.save_to_disk(path_to_classifier)
 
 
+def train_classifier(trading_pair: TradingPair,
+                     client: Union[BinanceClient],
+                     training_time_window: TimeWindow,
+                     technical_indicators: List[TechnicalIndicator],
+                     path_to_classifier: Path,
+                     n_jobs: Optional[int] = -1,
+                     seed: int = 1234,
+                     feature_cache: Optional[FeatureCache] = None,
+                     ):
+    stock_data_training_set = load_stock_data(training_time_window, trading_pair, timedelta(minutes=1), client)
+    fit_and_save_classifier(trading_pair, stock_data_training_set, training_time_window, technical_indicators,
+                            path_to_classifier, n_jobs, seed, feature_cache=feature_cache)
+
+
+def train_classifiers_in_parallel(trading_pair: TradingPair,
+                                  training_jobs: List[Tuple[StockData, TimeWindow, Path, int]],
+                                  technical_indicators: List[TechnicalIndicator],
+                                  max_workers: Optional[int] = None,
+                                  n_estimators: int = 5000,
+                                  feature_cache: Optional[FeatureCache] = None,
+                                  ):
+    """Train and save one classifier per (training set, training time window, path, seed) job.
+
+    The jobs run in a pool of max_workers processes (one per core by default), each fitting its
+    forest on a single core, so the training data must already have been loaded by the caller."""
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fit_and_save_classifier, trading_pair, stock_data_training_set,
+                                   training_time_window, technical_indicators, path_to_classifier, 1, seed,
+                                   n_estimators, feature_cache)
+                   for stock_data_training_set, training_time_window, path_to_classifier, seed in training_jobs]
+        for future in futures:
+            future.result()
+
+
 def run_trained_classifier(trading_pair: TradingPair,
                            client: Union[BinanceClient],
                            trade_amount: float,
                            testing_data: Union[TimeWindow, StockData, Path],
                            classifier: Union[Path, TradingClassifier],
-                           path_to_portfolio: Path, ):
+                           path_to_portfolio: Path,
+                           feature_cache: Optional[FeatureCache] = None):
     stock_data_testing_set = None
     if isinstance(testing_data, TimeWindow):
         stock_data_testing_set = load_stock_data(testing_data, trading_pair,
@@ -110,17 +172,101 @@ def run_trained_classifier(trading_pair: TradingPair,
     initial_capital = 5
 
     predicted_portfolio, predicted_signals = generate_predicted_portfolio(
-        initial_capital, parameters, stock_data_testing_set, my_classifier)
+        initial_capital, parameters, stock_data_testing_set, my_classifier, feature_cache)
     predicted_portfolio.save_to_disk(path_to_portfolio)
 
 
+_worker_classifier = None
+_worker_path_to_classifier = None
+
+
+def _initialize_testing_worker(classifier: TradingClassifier):
+    global _worker_classifier
+    _worker_classifier = classifier
+
+
+def _test_on_cached_time_window(classifier: TradingClassifier, trading_pair: TradingPair, trade_amount: float,
+                                testing_time_window: TimeWindow, path_to_portfolio: Path, cache_dir: str,
+                                feature_cache: Optional[FeatureCache]) -> Path:
+    stock_data_testing_set = CandleCache(trading_pair, timedelta(minutes=1), cache_dir).load_cached(
+        testing_time_window)
+    run_trained_classifier(trading_pair=trading_pair,
+                           client=None,
+                           trade_amount=trade_amount,
+                           testing_data=stock_data_testing_set,
+                           classifier=classifier.copy_for_prediction(),
+                           path_to_portfolio=path_to_portfolio,
+                           feature_cache=feature_cache)
+    return path_to_portfolio
+
+
+def _run_testing_job(trading_pair: TradingPair, trade_amount: float, testing_time_window: TimeWindow,
+                     path_to_portfolio: Path, cache_dir: str, feature_cache: Optional[FeatureCache]) -> Path:
+    return _test_on_cached_time_window(_worker_classifier, trading_pair, trade_amount, testing_time_window,
+                                       path_to_portfolio, cache_dir, feature_cache)
+
+
+def _run_saved_classifier_testing_job(trading_pair: TradingPair, trade_amount: float, path_to_classifier: Path,
+                                      testing_time_window: TimeWindow, path_to_portfolio: Path, cache_dir: str,
+                                      feature_cache: Optional[FeatureCache]) -> Path:
+    global _worker_classifier, _worker_path_to_classifier
+    # only the last classifier is kept; the jobs of a classifier are submitted one after the other
+    if path_to_classifier != _worker_path_to_classifier:
+        _worker_classifier = TradingClassifier.load_from_disk(path_to_classifier)
+        _worker_path_to_classifier = path_to_classifier
+    return _test_on_cached_time_window(_worker_classifier, trading_pair, trade_amount, testing_time_window,
+                                       path_to_portfolio, cache_dir, feature_cache)
+
+
+def run_trained_classifier_in_parallel(trading_pair: TradingPair,
+                                       trade_amount: float,
+                                       classifier: TradingClassifier,
+                                       testing_jobs: List[Tuple[TimeWindow, Path]],
+                                       max_workers: Optional[int] = None,
+                                       cache_dir: str = DATA_DIR,
+                                       feature_cache: Optional[FeatureCache] = None,
+                                       ) -> Iterator[Path]:
+    """Run the classifier on every (testing time window, path to portfolio) job in a pool of processes,
+    yielding the path of each portfolio as soon as it has been saved.
+
+    The classifier is sent to each worker once. The testing data is read from the candle cache, which the
+    workers memory-map, so it must already hold every testing time window (see load_stock_data). Every job
+    starts from the indicator state the classifier was given in, whichever worker runs it."""
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_initialize_testing_worker,
+                             initargs=(classifier,)) as executor:
+        futures = [executor.submit(_run_testing_job, trading_pair, trade_amount, testing_time_window,
+                                   path_to_portfolio, cache_dir, feature_cache)
+                   for testing_time_window, path_to_portfolio in testing_jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def run_saved_classifiers_in_parallel(trading_pair: TradingPair,
+                                      trade_amount: float,
+                                      testing_jobs: List[Tuple[Path, TimeWindow, Path]],
+                                      max_workers: Optional[int] = None,
+                                      cache_dir: str = DATA_DIR,
+                                      feature_cache: Optional[FeatureCache] = None,
+                                      ) -> Iterator[Path]:
+    """Like run_trained_classifier_in_parallel, for (path to classifier, testing time window, path to
+    portfolio) jobs of any number of saved classifiers, which all share one pool of processes. Each worker
+    loads a classifier from disk when it gets its first job of it, so jobs should be grouped by classifier."""
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_run_saved_classifier_testing_job, trading_pair, trade_amount,
+                                   path_to_classifier, testing_time_window, path_to_portfolio, cache_dir,
+                                   feature_cache)
+                   for path_to_classifier, testing_time_window, path_to_portfolio in testing_jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
 def plot_portfolios(my_classifier: TradingClassifier,
                     predicted_portfolio: Portfolio, reference_portfolio: Portfolio,
                     reference_signals: List[Union[SignalBuy, SignalSell]],
                     predicted_signals: List[Union[SignalBuy, SignalSell]]):
     custom_plot(portfolio=predicted_portfolio, strategy=None, title='Prediction portfolio_df')
     custom_plot(portfolio=reference_portfolio, strategy=None, title='Reference portfolio_df')
-    print(my_classifier.sklearn_classifier.feature_importances_)
+    print(my_classifier.model.feature_importances_)
     conf_matrix = compute_confusion_matrix(reference_signals, predicted_signals)
     accuracy = np.sum(np.diag(conf_matrix)) / np.sum(conf_matrix)
     print(conf_matrix)
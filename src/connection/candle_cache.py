@@ -0,0 +1,157 @@
+import fcntl
+import logging
+import os
+from datetime import timedelta, datetime
+from typing import Callable, List, Tuple
+
+import numpy as np
+import simplejson as json
+
+from src import definitions
+from src.containers.candle_array import CandleArray
+from src.containers.candle_file import save_to_candle_file, load_from_candle_file, CANDLE_FILE_EXTENSION
+from src.containers.stock_data import StockData
+from src.containers.time import MilliSeconds
+from src.containers.time_windows import TimeWindow
+from src.containers.trading_pair import TradingPair
+
+Segment = Tuple[int, int]  # half open [start, end) range of candle close times, in epoch milliseconds
+
+
+def _to_epoch_time(date_time: datetime) -> int:
+    return MilliSeconds.from_datetime(date_time).as_epoch_time()
+
+
+def merge_segments(segments: List[Segment]) -> List[Segment]:
+    merged = []
+    for start, end in sorted(segments):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def find_gaps(segments: List[Segment], start: int, end: int) -> List[Segment]:
+    gaps = []
+    for segment_start, segment_end in merge_segments(segments):
+        if segment_end <= start:
+            continue
+        if segment_start >= end:
+            break
+        if segment_start > start:
+            gaps.append((start, segment_start))
+        start = max(start, segment_end)
+    if start < end:
+        gaps.append((start, end))
+    return gaps
+
+
+def merge_candles(a: CandleArray, b: CandleArray) -> CandleArray:
+    """Merge two candle arrays into one sorted by close time; candles in b win over duplicates in a."""
+    candles = CandleArray.concatenate([b, a])
+    # a stable sort keeps the candles of b ahead of their duplicates in a
+    candles = candles[np.argsort(candles.close_time, kind="stable")]
+    is_first_occurrence = np.ones(len(candles), dtype=bool)
+    is_first_occurrence[1:] = candles.close_time[1:] != candles.close_time[:-1]
+    return candles[is_first_occurrence]
+
+
+class CandleCacheMissError(Exception):
+    pass
+
+
+class CandleCache(object):
+    """On-disk candle store with one file per trading pair and sampling period.
+
+    Candles are kept sorted by close time in a memory-mapped candle file, next to a JSON index of the
+    close time segments already downloaded. A request for a time window is answered from disk and only
+    the gaps in the index are downloaded and merged in. A lock file serialises writers across processes.
+    """
+
+    def __init__(self, trading_pair: TradingPair, sampling_period: timedelta, cache_dir: str = definitions.DATA_DIR):
+        file_name = "candles_{}_{}s".format(trading_pair.as_string_for_binance(),
+                                            int(sampling_period.total_seconds()))
+        self._trading_pair = trading_pair
+        self._sampling_period = sampling_period
+        self._path_to_candle_file = os.path.join(cache_dir, file_name + CANDLE_FILE_EXTENSION)
+        self._path_to_index_file = os.path.join(cache_dir, file_name + ".json")
+        self._path_to_lock_file = os.path.join(cache_dir, file_name + ".lock")
+
+    @property
+    def path_to_candle_file(self) -> str:
+        return self._path_to_candle_file
+
+    @property
+    def segments(self) -> List[Segment]:
+        if not os.path.isfile(self._path_to_index_file):
+            return []
+        with open(self._path_to_index_file, "r") as infile:
+            return [tuple(segment) for segment in json.load(infile)["segments"]]
+
+    def _save_segments(self, segments: List[Segment]):
+        temporary_file = self._path_to_index_file + ".tmp"
+        with open(temporary_file, "w") as outfile:
+            json.dump({"segments": [list(segment) for segment in merge_segments(segments)]}, outfile)
+        os.replace(temporary_file, self._path_to_index_file)
+
+    def _load_candles(self) -> CandleArray:
+        if not os.path.isfile(self._path_to_candle_file):
+            return CandleArray.empty()
+        return load_from_candle_file(self._path_to_candle_file).candles
+
+    def missing_time_windows(self, time_window: TimeWindow) -> List[TimeWindow]:
+        return [TimeWindow(start_time=MilliSeconds(start).as_datetime(), end_time=MilliSeconds(end).as_datetime())
+                for start, end in find_gaps(self.segments, _to_epoch_time(time_window.start_datetime),
+                                            _to_epoch_time(time_window.end_datetime))]
+
+    def load(self, time_window: TimeWindow, download: Callable[[TimeWindow], CandleArray]) -> StockData:
+        start = _to_epoch_time(time_window.start_datetime)
+        end = _to_epoch_time(time_window.end_datetime)
+        os.makedirs(os.path.dirname(self._path_to_candle_file), exist_ok=True)
+        with open(self._path_to_lock_file, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                segments = self.segments
+                gaps = find_gaps(segments, start, end)
+                if len(gaps) > 0:
+                    candles = self._load_candles()
+                    now = _to_epoch_time(datetime.now())
+                    for gap_start, gap_end in gaps:
+                        logging.info("Downloading stock data for {} from {} to {}".format(
+                            self._trading_pair, MilliSeconds(gap_start), MilliSeconds(gap_end)))
+                        downloaded = download(TimeWindow(start_time=MilliSeconds(gap_start).as_datetime(),
+                                                         end_time=MilliSeconds(gap_end).as_datetime()))
+                        candles = merge_candles(candles, downloaded)
+                        # candles that have not closed yet may still be published, so leave them uncovered
+                        if gap_start < now:
+                            segments.append((gap_start, min(gap_end, now)))
+                    save_to_candle_file(StockData(candles, self._trading_pair), self._sampling_period,
+                                        self._path_to_candle_file)
+                    self._save_segments(segments)
+                candles = self._load_candles()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return self._select(candles, start, end)
+
+    def load_cached(self, time_window: TimeWindow) -> StockData:
+        """Load a time window that is already cached, without downloading anything.
+
+        Only a shared lock is taken, so any number of processes can read the candle file at once."""
+        start = _to_epoch_time(time_window.start_datetime)
+        end = _to_epoch_time(time_window.end_datetime)
+        with open(self._path_to_lock_file, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH)
+            try:
+                if len(find_gaps(self.segments, start, end)) > 0:
+                    raise CandleCacheMissError("{} is not fully cached in {}".format(time_window,
+                                                                                     self._path_to_candle_file))
+                candles = self._load_candles()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return self._select(candles, start, end)
+
+    def _select(self, candles: CandleArray, start: int, end: int) -> StockData:
+        close_times = candles.close_time
+        return StockData(candles[np.searchsorted(close_times, start, side="left"):
+                                 np.searchsorted(close_times, end, side="left")], self._trading_pair)
@@ -0,0 +1,140 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import List, Tuple, Optional
+
+import requests
+
+from src import definitions
+from src.connection.constants import binance_sampling_rate_mappings
+from src.connection.helpers import DownloadingError, finetune_time_window
+from src.containers.candle_array import CandleArray
+from src.containers.candle_file import save_to_candle_file, load_from_candle_file, CANDLE_FILE_EXTENSION
+from src.containers.stock_data import StockData
+from src.containers.time import MilliSeconds
+from src.containers.time_windows import TimeWindow
+from src.containers.trading_pair import TradingPair
+from src.type_aliases import BinanceClient
+
+BINANCE_API_URL = "https://api.binance.com"
+BINANCE_KLINES_ENDPOINT = "/api/v3/klines"
+BINANCE_KLINES_LIMIT = 1000
+STALE_CHUNK_AGE = timedelta(days=1)  # age after which chunks of abandoned downloads are removed
+
+Chunk = Tuple[int, int]  # inclusive [start, end] range of candle open times, in epoch milliseconds
+
+
+class RateLimiter(object):
+    """Token bucket shared by the download threads."""
+
+    def __init__(self, requests_per_second: float, burst: int = 1):
+        self._requests_per_second = requests_per_second
+        self._burst = burst
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._burst, self._tokens + (now - self._last_refill) * self._requests_per_second)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._requests_per_second
+            time.sleep(wait)
+
+
+def split_into_chunks(start: int, end: int, sampling_period: timedelta,
+                      limit: int = BINANCE_KLINES_LIMIT) -> List[Chunk]:
+    chunk_length = int(sampling_period.total_seconds() * 1000) * limit
+    return [(chunk_start, min(chunk_start + chunk_length - 1, end)) for chunk_start in range(start, end + 1, chunk_length)]
+
+
+class ChunkedDownloader(object):
+    """Downloads a time window of klines as page sized chunks fetched concurrently.
+
+    Chunks are fetched with the get_klines method of `client` if one is given, and otherwise straight from
+    the public klines endpoint at `base_url`. Every completed chunk is written to the chunk directory, so that
+    calling download() again after a failure only fetches the chunks that are still missing. The chunk files
+    are removed once the whole window has been reassembled, and those left by downloads that were never
+    retried are removed by the next download once they are older than `stale_chunk_age`.
+    """
+
+    def __init__(self, base_url: str = BINANCE_API_URL, max_workers: int = 4, requests_per_second: float = 10,
+                 chunk_directory: Optional[str] = None, limit: int = BINANCE_KLINES_LIMIT, timeout: float = 10,
+                 client: Optional[BinanceClient] = None, stale_chunk_age: timedelta = STALE_CHUNK_AGE):
+        self._base_url = base_url
+        self._client = client
+        self._stale_chunk_age = stale_chunk_age
+        self._max_workers = max_workers
+        self._rate_limiter = RateLimiter(requests_per_second, burst=max_workers)
+        self._chunk_directory = os.path.join(definitions.DATA_DIR, "chunks") if chunk_directory is None \
+            else chunk_directory
+        self._limit = limit
+        self._timeout = timeout
+
+    def _path_to_chunk_file(self, trading_pair: TradingPair, sampling_period: timedelta, chunk: Chunk) -> str:
+        return os.path.join(self._chunk_directory, "{}_{}_{}_{}{}".format(
+            trading_pair.as_string_for_binance(), binance_sampling_rate_mappings[sampling_period.total_seconds()],
+            chunk[0], chunk[1], CANDLE_FILE_EXTENSION))
+
+    def _fetch_chunk(self, trading_pair: TradingPair, sampling_period: timedelta, chunk: Chunk) -> CandleArray:
+        path_to_chunk_file = self._path_to_chunk_file(trading_pair, sampling_period, chunk)
+        if os.path.isfile(path_to_chunk_file):
+            return load_from_candle_file(path_to_chunk_file).candles
+        self._rate_limiter.acquire()
+        parameters = {"symbol": trading_pair.as_string_for_binance(),
+                      "interval": binance_sampling_rate_mappings[sampling_period.total_seconds()],
+                      "startTime": chunk[0],
+                      "endTime": chunk[1],
+                      "limit": self._limit}
+        if self._client is not None:
+            candles = CandleArray.from_binance_klines(self._client.get_klines(**parameters))
+        else:
+            response = requests.get(self._base_url + BINANCE_KLINES_ENDPOINT, params=parameters,
+                                    timeout=self._timeout)
+            response.raise_for_status()
+            candles = CandleArray.from_binance_json(response.content)
+        save_to_candle_file(StockData(candles, trading_pair), sampling_period, path_to_chunk_file)
+        return candles
+
+    def download(self, time_window: TimeWindow, trading_pair: TradingPair,
+                 sampling_period: timedelta) -> CandleArray:
+        period = int(sampling_period.total_seconds() * 1000)
+        # a candle belongs to the window if it closes within it; it closes one millisecond before the next opens
+        start = MilliSeconds.from_datetime(time_window.start_datetime).as_epoch_time() - period + 1
+        end = MilliSeconds.from_datetime(time_window.end_datetime).as_epoch_time() - period
+        chunks = split_into_chunks(start, end, sampling_period, self._limit)
+        if len(chunks) == 0:
+            return CandleArray.empty()
+        os.makedirs(self._chunk_directory, exist_ok=True)
+        self._remove_stale_chunks()
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            futures = [executor.submit(self._fetch_chunk, trading_pair, sampling_period, chunk) for chunk in chunks]
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        if len(errors) > 0:
+            logging.debug("{} of {} chunks failed to download".format(len(errors), len(chunks)))
+            raise DownloadingError("Failed to download {} of {} chunks".format(len(errors), len(chunks))) \
+                from errors[0]
+        candles = finetune_time_window(CandleArray.concatenate([future.result() for future in futures]), time_window)
+        for chunk in chunks:
+            os.remove(self._path_to_chunk_file(trading_pair, sampling_period, chunk))
+        return candles
+
+    def _remove_stale_chunks(self):
+        oldest_modification_time = time.time() - self._stale_chunk_age.total_seconds()
+        for file_name in os.listdir(self._chunk_directory):
+            path_to_chunk_file = os.path.join(self._chunk_directory, file_name)
+            try:
+                if file_name.endswith(CANDLE_FILE_EXTENSION) and \
+                        os.path.getmtime(path_to_chunk_file) < oldest_modification_time:
+                    os.remove(path_to_chunk_file)
+            except FileNotFoundError:
+                # removed by another download in the meantime
+                pass
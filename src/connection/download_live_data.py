@@ -6,6 +6,8 @@ from src.connection.connection_handling import retry_on_network_error
 from src.connection.constants import binance_sampling_rate_mappings, cobinhood_sampling_rate_mappings
 from src.connection.helpers import DownloadingError
 from src.containers.candle import Candle
+from src.containers.candle_array import CandleArray
+from src.containers.time import MilliSeconds
 from src.containers.trading_pair import TradingPair
 from src.type_aliases import Exchange, BinanceClient
 
@@ -16,7 +18,7 @@ def _download_live_data_from_binance(trading_pair: TradingPair, sampling_period:
                                           binance_sampling_rate_mappings[
                                               sampling_period.total_seconds()],
                                           "30 minutes ago GMT")
-    return Candle.from_list_of_klines(klines, Exchange.BINANCE)[-1]
+    return CandleArray.from_list_of_klines(klines, Exchange.BINANCE)[-1].materialize()
 
 
 
@@ -37,4 +39,17 @@ def download_live_data(client: Union[BinanceClient], trading_pair: TradingPair,
 
     if isinstance(candle, list):
         raise DownloadingError("Only one candle is needed for the live run downloader")
-    return candle
\ No newline at end of file
+    return candle
+
+
+@retry_on_network_error
+def download_last_closed_candle(client: BinanceClient, trading_pair: TradingPair,
+                                sampling_period: timedelta) -> Candle:
+    klines = client.get_klines(symbol=trading_pair.as_string_for_binance(),
+                               interval=binance_sampling_rate_mappings[sampling_period.total_seconds()],
+                               limit=2)
+    candles = CandleArray.from_list_of_klines(klines, Exchange.BINANCE)
+    candles = candles[candles.close_time < MilliSeconds.from_datetime(datetime.now()).as_epoch_time()]
+    if len(candles) == 0:
+        raise DownloadingError("No closed candle available yet")
+    return candles[-1].materialize()
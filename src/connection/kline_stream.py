@@ -0,0 +1,104 @@
+import logging
+import queue
+import threading
+import time
+from datetime import timedelta
+from typing import Callable, Optional
+
+import simplejson as json
+import websocket
+
+from src.connection.constants import binance_sampling_rate_mappings
+from src.containers.candle import Candle
+from src.containers.trading_pair import TradingPair
+
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443"
+
+
+class KlineStream(object):
+    """Push based feed of closed candles from the binance kline websocket stream.
+
+    A background thread keeps the websocket connected and queues every candle whose kline is marked as
+    closed. The exchange pushes a kline update every few seconds, so if the stream stays silent for longer
+    than `stale_after` the feed falls back to polling `rest_fallback` until the stream recovers. Candles are
+    delivered in close time order and each close time only once, whichever source provided it.
+    """
+
+    def __init__(self, trading_pair: TradingPair, sampling_period: timedelta,
+                 rest_fallback: Callable[[], Candle], url: str = BINANCE_STREAM_URL,
+                 stale_after: timedelta = timedelta(seconds=30), reconnect_delay: float = 1):
+        self._url = "{}/ws/{}@kline_{}".format(url, trading_pair.as_string_for_binance().lower(),
+                                               binance_sampling_rate_mappings[sampling_period.total_seconds()])
+        self._rest_fallback = rest_fallback
+        self._stale_after = stale_after.total_seconds()
+        self._reconnect_delay = reconnect_delay
+        self._candles = queue.Queue()
+        self._last_message_time = time.monotonic()
+        self._last_close_time = None
+        self._is_running = threading.Event()
+        self._thread = None
+        self._connection = None
+
+    @property
+    def url(self) -> str:
+        return self._url
+
+    def start(self):
+        self._is_running.set()
+        self._last_message_time = time.monotonic()
+        self._thread = threading.Thread(target=self._listen, name="kline-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._is_running.clear()
+        if self._connection is not None:
+            self._connection.close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _listen(self):
+        while self._is_running.is_set():
+            try:
+                self._connection = websocket.create_connection(self._url, timeout=self._stale_after)
+                while self._is_running.is_set():
+                    message = json.loads(self._connection.recv())
+                    self._last_message_time = time.monotonic()
+                    if message.get("e") == "kline" and message["k"]["x"]:
+                        self._candles.put(Candle.from_binance_stream_kline(message["k"]))
+            except Exception as e:
+                if self._is_running.is_set():
+                    logging.debug("Kline stream error: {}. Reconnecting".format(e))
+                    time.sleep(self._reconnect_delay)
+            finally:
+                if self._connection is not None:
+                    self._connection.close()
+
+    def _is_new(self, candle: Candle) -> bool:
+        close_time = candle.get_time().close_time.as_epoch_time()
+        if self._last_close_time is not None and close_time <= self._last_close_time:
+            return False
+        self._last_close_time = close_time
+        return True
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._last_message_time > self._stale_after
+
+    def next_candle(self, timeout: Optional[float] = None) -> Optional[Candle]:
+        """Block until the next closed candle arrives, or return None after `timeout` seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._stale_after if deadline is None else min(self._stale_after, deadline - time.monotonic())
+            try:
+                candle = self._candles.get(timeout=max(wait, 0))
+                if self._is_new(candle):
+                    return candle
+                continue
+            except queue.Empty:
+                pass
+            if self._is_stale():
+                logging.debug("Kline stream is stale, polling for the latest candle")
+                candle = self._rest_fallback()
+                if self._is_new(candle):
+                    return candle
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
@@ -130,6 +130,28 @@ class Candle(object):
 
         )
 
+    @staticmethod
+    def from_binance_stream_kline(kline: dict):
+        return Candle(
+            price=Price(
+                open_price=float(kline["o"]),
+                high_price=float(kline["h"]),
+                low_price=float(kline["l"]),
+                close_price=float(kline["c"]),
+            ),
+            volume=Volume(
+                volume=float(kline["v"]),
+                taker_buy_base_asset_volume=float(kline["V"]),
+                taker_buy_quote_asset_volume=float(kline["Q"]),
+                quote_asset_volume=float(kline["q"]),
+                number_of_trades=int(kline["n"]),
+            ),
+            time=Time(
+                open_time=MilliSeconds(int(kline["t"])),
+                close_time=MilliSeconds(int(kline["T"])),
+            )
+        )
+
     @staticmethod
     def from_cobinhood_kline(kline: dict):
         return Candle(
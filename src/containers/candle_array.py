@@ -0,0 +1,262 @@
+from collections import OrderedDict
+from typing import List, Optional, Dict, Union, Iterator
+
+import numpy as np
+
+from src.containers.candle import Candle, Price, Volume
+from src.containers.time import Time, MilliSeconds
+from src.type_aliases import Exchange
+
+MISSING_TIME = np.iinfo(np.int64).min  # stands in for MilliSeconds(None), e.g. open times of cobinhood klines
+
+# Columns are kept in the same order as the fields of a binance kline
+COLUMNS = OrderedDict([
+    ("open_time", np.int64),
+    ("open_price", np.float64),
+    ("high_price", np.float64),
+    ("low_price", np.float64),
+    ("close_price", np.float64),
+    ("volume", np.float64),
+    ("close_time", np.int64),
+    ("quote_asset_volume", np.float64),
+    ("number_of_trades", np.float64),  # float so that missing (nan) trade counts survive the round trip
+    ("taker_buy_base_asset_volume", np.float64),
+    ("taker_buy_quote_asset_volume", np.float64),
+])
+
+BINANCE_KLINE_LENGTH = 12  # the trailing field of a binance kline is unused ("ignore")
+
+
+def _empty_columns(capacity: int) -> Dict[str, np.ndarray]:
+    return OrderedDict((name, np.empty(capacity, dtype=dtype)) for name, dtype in COLUMNS.items())
+
+
+def _to_epoch_time(time: MilliSeconds) -> int:
+    epoch_time = time.as_epoch_time()
+    return MISSING_TIME if epoch_time is None else epoch_time
+
+
+def _to_milliseconds(epoch_time: int) -> MilliSeconds:
+    return MilliSeconds(None if epoch_time == MISSING_TIME else int(epoch_time))
+
+
+class CandleArray(object):
+    """Struct-of-arrays container of candles.
+
+    Every field of a candle lives in its own contiguous numpy column, so that whole-series passes
+    (feature extraction, labelling, windowing) can operate on arrays instead of chasing the
+    attributes of one Candle object per bar. Indexing with an integer returns a lazy CandleView,
+    which behaves like a Candle for existing per-candle callers.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], size: Optional[int] = None):
+        self._columns = OrderedDict((name, columns[name]) for name in COLUMNS)
+        self._size = len(self._columns["close_time"]) if size is None else size
+
+    @staticmethod
+    def empty(capacity: int = 0):
+        return CandleArray(_empty_columns(capacity), size=0)
+
+    @staticmethod
+    def from_candles(candles: List[Candle]):
+        array = CandleArray.empty(len(candles))
+        for candle in candles:
+            array.append(candle)
+        return array
+
+    @staticmethod
+    def from_binance_klines(klines: List[List]):
+        """Parse the kline lists returned by the binance client in one pass per column."""
+        if len(klines) == 0:
+            return CandleArray.empty()
+        table = np.array(klines, dtype=str).reshape(-1, BINANCE_KLINE_LENGTH)
+        return CandleArray(OrderedDict((name, table[:, i].astype(dtype)) for i, (name, dtype) in
+                                       enumerate(COLUMNS.items())))
+
+    @staticmethod
+    def from_binance_json(raw: bytes):
+        """Parse the raw JSON body of a binance /klines response without building intermediate lists."""
+        fields = raw.translate(None, b'[]" \n\r\t').split(b",")
+        if fields == [b""]:
+            return CandleArray.empty()
+        table = np.array(fields).astype(np.float64).reshape(-1, BINANCE_KLINE_LENGTH)
+        return CandleArray(OrderedDict((name, table[:, i].astype(dtype)) for i, (name, dtype) in
+                                       enumerate(COLUMNS.items())))
+
+    @staticmethod
+    def from_list_of_klines(klines: List, source: Exchange):
+        if source.name == "BINANCE":
+            return CandleArray.from_binance_klines(klines)
+        elif source.name == "COBINHOOD":
+            return CandleArray.from_candles(Candle.from_list_of_klines(klines, source))
+        else:
+            raise ValueError("You need to specify the source (Exchange) from which to download the data.")
+
+    @staticmethod
+    def concatenate(arrays: List["CandleArray"]):
+        return CandleArray(OrderedDict((name, np.concatenate([array.column(name) for array in arrays]))
+                                       for name in COLUMNS))
+
+    def to_candles(self) -> List[Candle]:
+        return [view.materialize() for view in self]
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name][:self._size]
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        return OrderedDict((name, self.column(name)) for name in COLUMNS)
+
+    @property
+    def open_time(self) -> np.ndarray:
+        return self.column("open_time")
+
+    @property
+    def open_price(self) -> np.ndarray:
+        return self.column("open_price")
+
+    @property
+    def high_price(self) -> np.ndarray:
+        return self.column("high_price")
+
+    @property
+    def low_price(self) -> np.ndarray:
+        return self.column("low_price")
+
+    @property
+    def close_price(self) -> np.ndarray:
+        return self.column("close_price")
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.column("volume")
+
+    @property
+    def close_time(self) -> np.ndarray:
+        return self.column("close_time")
+
+    @property
+    def quote_asset_volume(self) -> np.ndarray:
+        return self.column("quote_asset_volume")
+
+    @property
+    def number_of_trades(self) -> np.ndarray:
+        return self.column("number_of_trades")
+
+    @property
+    def taker_buy_base_asset_volume(self) -> np.ndarray:
+        return self.column("taker_buy_base_asset_volume")
+
+    @property
+    def taker_buy_quote_asset_volume(self) -> np.ndarray:
+        return self.column("taker_buy_quote_asset_volume")
+
+    def append(self, candle: Candle):
+        if self._size == len(self._columns["close_time"]):
+            self._grow()
+        i = self._size
+        price = candle.get_price()
+        volume = candle._volume
+        time = candle.get_time()
+        self._columns["open_time"][i] = _to_epoch_time(time.open_time)
+        self._columns["close_time"][i] = _to_epoch_time(time.close_time)
+        self._columns["open_price"][i] = np.nan if price is None else price.open_price
+        self._columns["high_price"][i] = np.nan if price is None else price.high_price
+        self._columns["low_price"][i] = np.nan if price is None else price.low_price
+        self._columns["close_price"][i] = np.nan if price is None else price.close_price
+        self._columns["volume"][i] = np.nan if volume is None else volume.volume
+        self._columns["quote_asset_volume"][i] = np.nan if volume is None else volume.quote_asset_volume
+        self._columns["number_of_trades"][i] = np.nan if volume is None else volume.number_of_trades
+        self._columns["taker_buy_base_asset_volume"][i] = \
+            np.nan if volume is None else volume.taker_buy_base_asset_volume
+        self._columns["taker_buy_quote_asset_volume"][i] = \
+            np.nan if volume is None else volume.taker_buy_quote_asset_volume
+        self._size += 1
+
+    def _grow(self):
+        capacity = max(16, 2 * len(self._columns["close_time"]))
+        columns = _empty_columns(capacity)
+        for name, column in columns.items():
+            column[:self._size] = self._columns[name][:self._size]
+        self._columns = columns
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self) -> Iterator["CandleView"]:
+        for i in range(self._size):
+            yield CandleView(self, i)
+
+    def __getitem__(self, item: Union[int, slice, np.ndarray]):
+        if isinstance(item, (int, np.integer)):
+            if item < 0:
+                item += self._size
+            if not 0 <= item < self._size:
+                raise IndexError("CandleArray index out of range")
+            return CandleView(self, int(item))
+        return CandleArray(OrderedDict((name, self.column(name)[item]) for name in COLUMNS))
+
+    def __getstate__(self):
+        return {"_columns": self.columns, "_size": self._size}
+
+    def __setstate__(self, state):
+        self._columns = state["_columns"]
+        self._size = state["_size"]
+
+    def __repr__(self):
+        return "CandleArray(length={})".format(self._size)
+
+
+class CandleView(Candle):
+    """Lazy, read-only Candle backed by one row of a CandleArray."""
+
+    def __init__(self, array: CandleArray, index: int):
+        self._array = array
+        self._index = index
+
+    def _value(self, name: str):
+        return self._array._columns[name][self._index]
+
+    @property
+    def _price(self) -> Price:
+        return Price(open_price=float(self._value("open_price")),
+                     high_price=float(self._value("high_price")),
+                     low_price=float(self._value("low_price")),
+                     close_price=float(self._value("close_price")))
+
+    @property
+    def _volume(self) -> Volume:
+        number_of_trades = self._value("number_of_trades")
+        return Volume(volume=float(self._value("volume")),
+                      taker_buy_base_asset_volume=float(self._value("taker_buy_base_asset_volume")),
+                      taker_buy_quote_asset_volume=float(self._value("taker_buy_quote_asset_volume")),
+                      quote_asset_volume=float(self._value("quote_asset_volume")),
+                      number_of_trades=int(number_of_trades) if number_of_trades == number_of_trades else np.nan)
+
+    @property
+    def _time(self) -> Time:
+        return Time(open_time=_to_milliseconds(self._value("open_time")),
+                    close_time=_to_milliseconds(self._value("close_time")))
+
+    def get_close_price(self):
+        return float(self._value("close_price"))
+
+    def get_open_price(self):
+        return float(self._value("open_price"))
+
+    def get_number_of_trades(self):
+        number_of_trades = self._value("number_of_trades")
+        return int(number_of_trades) if number_of_trades == number_of_trades else np.nan
+
+    def get_volume(self):
+        return float(self._value("volume"))
+
+    def get_close_time_as_datetime(self):
+        return _to_milliseconds(self._value("close_time")).as_datetime()
+
+    def materialize(self) -> Candle:
+        return Candle(price=self._price, volume=self._volume, time=self._time)
+
+    def __reduce__(self):
+        # pickle as a standalone Candle rather than dragging the whole array along
+        return Candle, (self._price, self._volume, self._time)
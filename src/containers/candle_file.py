@@ -0,0 +1,98 @@
+import os
+import struct
+from collections import OrderedDict
+from datetime import timedelta
+
+import numpy as np
+
+from src.containers.candle_array import CandleArray, COLUMNS
+from src.containers.stock_data import StockData
+from src.containers.trading_pair import TradingPair
+
+# Layout of a candle file:
+#   header (HEADER_SIZE bytes, little endian): magic, version, number of columns, number of rows,
+#   sampling period in milliseconds, trading pair (as "FROM-TO")
+#   followed by one contiguous little endian block of number-of-rows values per column, in COLUMNS order
+MAGIC = b"CANDLES\x00"
+VERSION = 1
+HEADER_FORMAT = "<8sIIqq32s"
+HEADER_SIZE = 64
+CANDLE_FILE_EXTENSION = ".candles"
+
+
+class CandleFileError(RuntimeError):
+    pass
+
+
+class CandleFileHeader(object):
+    def __init__(self, number_of_rows: int, sampling_period: timedelta, trading_pair: TradingPair):
+        self._number_of_rows = number_of_rows
+        self._sampling_period = sampling_period
+        self._trading_pair = trading_pair
+
+    @property
+    def number_of_rows(self) -> int:
+        return self._number_of_rows
+
+    @property
+    def sampling_period(self) -> timedelta:
+        return self._sampling_period
+
+    @property
+    def trading_pair(self) -> TradingPair:
+        return self._trading_pair
+
+    def to_bytes(self) -> bytes:
+        header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, len(COLUMNS), self._number_of_rows,
+                             int(self._sampling_period.total_seconds() * 1000),
+                             self._trading_pair.as_string_for_cobinhood().encode())
+        return header.ljust(HEADER_SIZE, b"\x00")
+
+    @staticmethod
+    def from_bytes(raw: bytes):
+        if len(raw) < HEADER_SIZE:
+            raise CandleFileError("Truncated candle file header")
+        magic, version, number_of_columns, number_of_rows, sampling_period, trading_pair = \
+            struct.unpack_from(HEADER_FORMAT, raw)
+        if magic != MAGIC:
+            raise CandleFileError("Not a candle file")
+        if version != VERSION or number_of_columns != len(COLUMNS):
+            raise CandleFileError("Unsupported candle file version {} with {} columns".format(version,
+                                                                                              number_of_columns))
+        return CandleFileHeader(number_of_rows=number_of_rows,
+                                sampling_period=timedelta(milliseconds=sampling_period),
+                                trading_pair=TradingPair.from_cobinhood(trading_pair.rstrip(b"\x00").decode()))
+
+
+def read_candle_file_header(path_to_file: str) -> CandleFileHeader:
+    with open(path_to_file, "rb") as infile:
+        return CandleFileHeader.from_bytes(infile.read(HEADER_SIZE))
+
+
+def save_to_candle_file(stock_data: StockData, sampling_period: timedelta, path_to_file: str):
+    header = CandleFileHeader(len(stock_data), sampling_period, stock_data.trading_pair)
+    temporary_file = path_to_file + ".tmp"
+    with open(temporary_file, "wb") as outfile:
+        outfile.write(header.to_bytes())
+        for name, dtype in COLUMNS.items():
+            stock_data.candles.column(name).astype(np.dtype(dtype).newbyteorder("<"), copy=False).tofile(outfile)
+    # readers never observe a half written file
+    os.replace(temporary_file, path_to_file)
+
+
+def load_from_candle_file(path_to_file: str) -> StockData:
+    """Map the columns of a candle file read-only; rows are paged in from disk only when touched."""
+    header = read_candle_file_header(path_to_file)
+    number_of_rows = header.number_of_rows
+    columns = OrderedDict()
+    offset = HEADER_SIZE
+    for name, dtype in COLUMNS.items():
+        dtype = np.dtype(dtype).newbyteorder("<")
+        if number_of_rows == 0:
+            columns[name] = np.empty(0, dtype=dtype)
+        else:
+            columns[name] = np.memmap(path_to_file, dtype=dtype, mode="r", offset=offset, shape=(number_of_rows,))
+        offset += number_of_rows * dtype.itemsize
+    if os.path.getsize(path_to_file) < offset:
+        raise CandleFileError("Truncated candle file {}".format(path_to_file))
+    return StockData(CandleArray(columns), header.trading_pair)
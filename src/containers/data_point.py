@@ -30,3 +30,7 @@ class PricePoint(object):
     def as_dict(self):
         return {"price": self._value,
                 "timestamp": self._date_time.timestamp()}
+
+    @staticmethod
+    def from_dict(price_point: dict):
+        return PricePoint(value=price_point["price"], date_time=datetime.fromtimestamp(price_point["timestamp"]))
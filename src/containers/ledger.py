@@ -0,0 +1,218 @@
+from collections import OrderedDict
+from typing import Dict, List, Any
+
+import numpy as np
+import pandas as pd
+
+HISTORY_COLUMNS = OrderedDict([
+    ("amount_traded", np.float64),
+    ("actual_price", np.float64),
+    ("order_expenditure", np.float64),
+    ("cumulative_order_expenditure", np.float64),
+    ("fees", np.float64),
+    ("cash", np.float64),
+    ("position", np.float64),
+    ("realized_pnl", np.float64),
+    ("unrealized_pnl", np.float64),
+    ("equity", np.float64),
+    ("drawdown", np.float64),
+])
+
+
+def _empty_history(capacity: int) -> Dict[str, np.ndarray]:
+    return OrderedDict((name, np.empty(capacity, dtype=dtype)) for name, dtype in HISTORY_COLUMNS.items())
+
+
+class Ledger(object):
+    """Running account of the fills of a portfolio.
+
+    Every fill updates cash, position, fees, realized and unrealized profit and loss (on the average cost of
+    the position) and drawdown in constant time, and appends one row to a columnar history, which only
+    becomes a DataFrame in to_dataframe(). `order_expenditure` and `cumulative_order_expenditure` exclude
+    fees, as in Portfolio.compute_performance; `cash` and `equity` include them. The position is marked
+    to market at the price of the last fill, or at the price passed to mark().
+    """
+
+    def __init__(self, initial_capital: float, fees: float = 0.0):
+        self._initial_capital = initial_capital
+        self._fee_rate = fees
+        self._cumulative_order_expenditure = 0.0
+        self._fees = 0.0
+        self._position = 0.0
+        self._average_price = 0.0
+        self._realized_pnl = 0.0
+        self._first_price = None
+        self._last_price = None
+        self._peak_equity = initial_capital
+        self._max_drawdown = 0.0
+        self._trade_times = []
+        self._history = _empty_history(0)
+        self._size = 0
+
+    @property
+    def initial_capital(self) -> float:
+        return self._initial_capital
+
+    @property
+    def cash(self) -> float:
+        return self._initial_capital - self._cumulative_order_expenditure - self._fees
+
+    @property
+    def remaining_capital(self) -> float:
+        return self._initial_capital - self._cumulative_order_expenditure
+
+    @property
+    def position(self) -> float:
+        return self._position
+
+    @property
+    def average_price(self) -> float:
+        return self._average_price
+
+    @property
+    def fees(self) -> float:
+        return self._fees
+
+    @property
+    def realized_pnl(self) -> float:
+        return self._realized_pnl
+
+    @property
+    def unrealized_pnl(self) -> float:
+        if self._last_price is None:
+            return 0.0
+        return self._position * (self._last_price - self._average_price)
+
+    @property
+    def equity(self) -> float:
+        if self._last_price is None:
+            return self.cash
+        return self.cash + self._position * self._last_price
+
+    @property
+    def drawdown(self) -> float:
+        return self._peak_equity - self.equity
+
+    @property
+    def max_drawdown(self) -> float:
+        return self._max_drawdown
+
+    @property
+    def first_price(self) -> float:
+        return self._first_price
+
+    @property
+    def last_price(self) -> float:
+        return self._last_price
+
+    @property
+    def trade_times(self) -> List[Any]:
+        return self._trade_times
+
+    def record_fill(self, trade_time, amount: float, price: float):
+        """Account for `amount` bought (positive) or sold (negative) at `price`."""
+        order_expenditure = amount * price
+        self._cumulative_order_expenditure += order_expenditure
+        self._fees += abs(order_expenditure) * self._fee_rate
+        self._update_position(amount, price)
+        if self._first_price is None:
+            self._first_price = price
+        self.mark(price)
+        self._append_to_history(trade_time, amount, price, order_expenditure)
+
+    def mark(self, price: float):
+        """Mark the position to market at `price`, without a fill."""
+        self._last_price = price
+        equity = self.equity
+        if equity > self._peak_equity:
+            self._peak_equity = equity
+        self._max_drawdown = max(self._max_drawdown, self._peak_equity - equity)
+
+    def _update_position(self, amount: float, price: float):
+        position = self._position
+        if position == 0.0 or (position > 0.0) == (amount > 0.0):
+            if position + amount != 0.0:
+                self._average_price = (self._average_price * position + price * amount) / (position + amount)
+        else:
+            closed = min(abs(amount), abs(position))
+            self._realized_pnl += closed * (price - self._average_price) * (1.0 if position > 0.0 else -1.0)
+            if abs(amount) > abs(position):
+                # the position flips side, the remainder is opened at this price
+                self._average_price = price
+        self._position = position + amount
+        if self._position == 0.0:
+            self._average_price = 0.0
+
+    def _append_to_history(self, trade_time, amount: float, price: float, order_expenditure: float):
+        if self._size == len(self._history["cash"]):
+            self._grow()
+        i = self._size
+        self._history["amount_traded"][i] = amount
+        self._history["actual_price"][i] = price
+        self._history["order_expenditure"][i] = order_expenditure
+        self._history["cumulative_order_expenditure"][i] = self._cumulative_order_expenditure
+        self._history["fees"][i] = self._fees
+        self._history["cash"][i] = self.cash
+        self._history["position"][i] = self._position
+        self._history["realized_pnl"][i] = self._realized_pnl
+        self._history["unrealized_pnl"][i] = self.unrealized_pnl
+        self._history["equity"][i] = self.equity
+        self._history["drawdown"][i] = self.drawdown
+        self._trade_times.append(trade_time)
+        self._size += 1
+
+    def _grow(self):
+        capacity = max(16, 2 * len(self._history["cash"]))
+        history = _empty_history(capacity)
+        for name, column in history.items():
+            column[:self._size] = self._history[name][:self._size]
+        self._history = history
+
+    def column(self, name: str) -> np.ndarray:
+        return self._history[name][:self._size]
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"cash": self.cash,
+                "remaining_capital": self.remaining_capital,
+                "position": self._position,
+                "average_price": self._average_price,
+                "last_price": self._last_price,
+                "fees": self._fees,
+                "realized_pnl": self._realized_pnl,
+                "unrealized_pnl": self.unrealized_pnl,
+                "equity": self.equity,
+                "drawdown": self.drawdown,
+                "max_drawdown": self._max_drawdown,
+                "number_of_fills": self._size}
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """The history, one row per fill, indexed by trade time."""
+        data_frame = pd.DataFrame(index=self._trade_times)
+        for name in HISTORY_COLUMNS:
+            data_frame[name] = self.column(name).copy()
+        return data_frame
+
+    def as_dict(self) -> dict:
+        """The whole state of the ledger, history included, as plain lists and numbers; see from_dict()."""
+        state = {name: value for name, value in self.__dict__.items() if name not in ("_history", "_size")}
+        state["_trade_times"] = list(self._trade_times)
+        state["_history"] = OrderedDict((name, self.column(name).tolist()) for name in HISTORY_COLUMNS)
+        return state
+
+    @staticmethod
+    def from_dict(state: dict):
+        ledger = Ledger(state["_initial_capital"], fees=state["_fee_rate"])
+        ledger.__dict__.update({name: value for name, value in state.items() if name != "_history"})
+        ledger._trade_times = list(state["_trade_times"])
+        ledger._history = OrderedDict((name, np.array(state["_history"][name], dtype=dtype))
+                                      for name, dtype in HISTORY_COLUMNS.items())
+        ledger._size = len(ledger._trade_times)
+        return ledger
+
+    def __len__(self):
+        return self._size
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_history"] = OrderedDict((name, self.column(name)) for name in HISTORY_COLUMNS)
+        return state
@@ -34,6 +34,9 @@ class OrderState(Enum):
     triggered = "triggered"
 
 
+CLOSED_ORDER_STATES = (OrderState.filled, OrderState.cancelled, OrderState.rejected)
+
+
 class OrderType(Enum):
     market = "market"
     limit = "limit"
@@ -121,6 +124,46 @@ class Order(object):
             "size": "{}".format(self.size),
         }
 
+    def as_dict(self) -> dict:
+        """JSON serializable fields of the order, see from_dict()."""
+        return {
+            "trading_pair_id": None if self.trading_pair_id is None else
+            self.trading_pair_id.as_string_for_cobinhood(),
+            "price": self.price,
+            "type": None if self.type is None else self.type.value,
+            "side": self.side.value,
+            "size": self.size,
+            "stop_price": self.stop_price,
+            "source": self.source,
+            "equivalent_price": self.equivalent_price,
+            "completed_at": None if self.completed_at is None else self.completed_at.as_epoch_time(),
+            "timestamp": None if self.timestamp is None else self.timestamp.as_epoch_time(),
+            "state": None if self.state is None else self.state.value,
+            "trailing_distance": self.trailing_distance,
+            "id": self.id,
+            "filled": self.filled,
+        }
+
+    @staticmethod
+    def from_dict(order: dict):
+        return Order(
+            trading_pair_id=None if order["trading_pair_id"] is None else TradingPair.from_cobinhood(
+                order["trading_pair_id"]),
+            price=order["price"],
+            type=None if order["type"] is None else OrderType(order["type"]),
+            side=Side(order["side"]),
+            size=order["size"],
+            stop_price=order["stop_price"],
+            source=order["source"],
+            equivalent_price=order["equivalent_price"],
+            completed_at=None if order["completed_at"] is None else MilliSeconds(order["completed_at"]),
+            timestamp=None if order["timestamp"] is None else MilliSeconds(order["timestamp"]),
+            state=None if order["state"] is None else OrderState(order["state"]),
+            trailing_distance=order["trailing_distance"],
+            id=order["id"],
+            filled=order["filled"],
+        )
+
     def __repr__(self):
         return "{}(completed_at={}, " \
                "equivalent_price={}, " \
@@ -1,6 +1,8 @@
-from typing import List
+from typing import List, Optional
 
-from src.containers.order import Price, Size
+import numpy as np
+
+from src.containers.order import Price, Size, Side
 from src.containers.trading_pair import TradingPair
 
 
@@ -21,21 +23,168 @@ class Ask(Ord):
         return "Ask({},{},{})".format(self.price, self.count, self.size)
 
 
+class _PriceLevels(object):
+    """One side of an order book as sorted arrays of price levels, best first.
+
+    Levels are sorted by key, the price for asks and minus the price for bids, so that searchsorted finds a
+    level in O(log n). Cumulative sizes and notionals, for the depth and VWAP queries, are computed when first
+    needed after a change.
+    """
+
+    def __init__(self, sign: int, prices: np.ndarray, counts: np.ndarray, sizes: np.ndarray):
+        order = np.argsort(sign * prices, kind="stable")
+        self._sign = sign
+        self._keys = (sign * prices)[order]
+        self._counts = counts[order]
+        self._sizes = sizes[order]
+        self._cumulative_sizes = None
+        self._cumulative_notionals = None
+
+    @property
+    def prices(self) -> np.ndarray:
+        return self._sign * self._keys
+
+    @property
+    def counts(self) -> np.ndarray:
+        return self._counts
+
+    @property
+    def sizes(self) -> np.ndarray:
+        return self._sizes
+
+    def __len__(self):
+        return len(self._keys)
+
+    def update(self, price: Price, count: int, size: Size):
+        """Set the level at `price`, which is removed if its size is 0."""
+        key = self._sign * price
+        index = np.searchsorted(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            if size > 0.0:
+                self._counts[index] = count
+                self._sizes[index] = size
+            else:
+                self._keys = np.delete(self._keys, index)
+                self._counts = np.delete(self._counts, index)
+                self._sizes = np.delete(self._sizes, index)
+        elif size > 0.0:
+            self._keys = np.insert(self._keys, index, key)
+            self._counts = np.insert(self._counts, index, count)
+            self._sizes = np.insert(self._sizes, index, size)
+        self._cumulative_sizes = None
+        self._cumulative_notionals = None
+
+    def _cumulative(self):
+        if self._cumulative_sizes is None:
+            self._cumulative_sizes = np.cumsum(self._sizes)
+            self._cumulative_notionals = np.cumsum(self._sizes * self.prices)
+        return self._cumulative_sizes, self._cumulative_notionals
+
+    def depth(self, price: Price) -> Size:
+        """Total size of the levels priced at `price` or better."""
+        index = np.searchsorted(self._keys, self._sign * price, side="right")
+        return 0.0 if index == 0 else float(self._cumulative()[0][index - 1])
+
+    def level_to_fill(self, size: Size) -> Optional[int]:
+        """Index of the level at which `size` is filled, walking from the best one, or None."""
+        index = int(np.searchsorted(self._cumulative()[0], size))
+        return None if index == len(self._keys) else index
+
+    def vwap(self, size: Size) -> Optional[Price]:
+        index = self.level_to_fill(size)
+        if index is None:
+            return None
+        cumulative_sizes, cumulative_notionals = self._cumulative()
+        filled_before = 0.0 if index == 0 else cumulative_sizes[index - 1]
+        notional_before = 0.0 if index == 0 else cumulative_notionals[index - 1]
+        return float((notional_before + (size - filled_before) * self._sign * self._keys[index]) / size)
+
+
 class OrderBook:
+    """Order book of a trading pair, kept as sorted price level arrays (see _PriceLevels).
+
+    Snapshots are loaded with from_response and can then be kept up to date with apply_diff. Best prices are
+    O(1), depth and VWAP queries O(log n); the `bids` and `asks` lists of Bid/Ask objects, best first, are
+    only built when asked for.
+    """
+
     def __init__(self,
                  trading_pair: TradingPair,
                  bids: List[Bid],
                  asks: List[Ask]):
         self.trading_pair = trading_pair
-        self.bids = bids
-        self.asks = asks
+        self._levels = {Side.bid: self._to_price_levels(-1, [[bid.price, bid.count, bid.size] for bid in bids]),
+                        Side.ask: self._to_price_levels(1, [[ask.price, ask.count, ask.size] for ask in asks])}
+        self._bids = None
+        self._asks = None
+
+    @staticmethod
+    def _to_price_levels(sign: int, levels) -> _PriceLevels:
+        levels = np.asarray(levels, dtype=np.float64).reshape(-1, 3)
+        return _PriceLevels(sign, levels[:, 0], levels[:, 1].astype(np.int64), levels[:, 2])
 
     @staticmethod
     def from_response(trading_pair: TradingPair, response: dict):
-        return OrderBook(
-            trading_pair=trading_pair,
-            bids=[Bid(Price(bid[0]), int(bid[1]), Size(bid[2]))
-                  for bid in response["bids"]],
-            asks=[Ask(Price(ask[0]), int(ask[1]), Size(ask[2]))
-                  for ask in response["asks"]],
-        )
+        order_book = OrderBook(trading_pair=trading_pair, bids=[], asks=[])
+        order_book._levels = {Side.bid: OrderBook._to_price_levels(-1, response["bids"]),
+                              Side.ask: OrderBook._to_price_levels(1, response["asks"])}
+        return order_book
+
+    @property
+    def bids(self) -> List[Bid]:
+        if self._bids is None:
+            levels = self._levels[Side.bid]
+            self._bids = [Bid(price, count, size) for price, count, size in
+                          zip(levels.prices.tolist(), levels.counts.tolist(), levels.sizes.tolist())]
+        return self._bids
+
+    @property
+    def asks(self) -> List[Ask]:
+        if self._asks is None:
+            levels = self._levels[Side.ask]
+            self._asks = [Ask(price, count, size) for price, count, size in
+                          zip(levels.prices.tolist(), levels.counts.tolist(), levels.sizes.tolist())]
+        return self._asks
+
+    def apply_diff(self, side: Side, price: Price, count: int, size: Size):
+        """Update the level at `price` of the bids or asks, removing it if `size` is 0."""
+        self._levels[side].update(price, count, size)
+        if side is Side.bid:
+            self._bids = None
+        else:
+            self._asks = None
+
+    def best_bid(self) -> Optional[Bid]:
+        return self._best(Side.bid, Bid)
+
+    def best_ask(self) -> Optional[Ask]:
+        return self._best(Side.ask, Ask)
+
+    def _best(self, side: Side, cls):
+        levels = self._levels[side]
+        if len(levels) == 0:
+            return None
+        return cls(levels.prices[0].item(), levels.counts[0].item(), levels.sizes[0].item())
+
+    def depth(self, side: Side, price: Price) -> Size:
+        """Size available on one side at `price` or better (at or above it for bids, at or below for asks)."""
+        return self._levels[side].depth(price)
+
+    def price_to_fill(self, side: Side, size: Size) -> Optional[Price]:
+        """Worst price reached when taking `size` from one side, None if it is not deep enough."""
+        levels = self._levels[side]
+        index = levels.level_to_fill(size)
+        return None if index is None else levels.prices[index].item()
+
+    def vwap(self, side: Side, size: Size) -> Optional[Price]:
+        """Volume weighted average price of taking `size` from one side, None if it is not deep enough."""
+        return self._levels[side].vwap(size)
+
+    def first_level_with_size(self, side: Side, size: Size) -> Optional[Ord]:
+        """Best level of one side holding at least `size` on its own."""
+        levels = self._levels[side]
+        index = np.flatnonzero(levels.sizes >= size)
+        if len(index) == 0:
+            return None
+        cls = Bid if side is Side.bid else Ask
+        return cls(levels.prices[index[0]].item(), levels.counts[index[0]].item(), levels.sizes[index[0]].item())
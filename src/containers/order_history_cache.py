@@ -0,0 +1,159 @@
+import bisect
+import os
+import tempfile
+from typing import Callable, Dict, Iterator, List, Optional
+
+import simplejson as json
+
+from src.containers.order import CLOSED_ORDER_STATES, Order, OrderID, OrderState
+from src.mixins.save_load_mixin import convert_to_absolute_path
+from src.type_aliases import Path
+from src.logger import logger
+
+HISTORY_PAGE_SIZE = 100
+
+
+class OrderHistoryCache(object):
+    """Local copy of the order history of a trading pair, kept up to date from the newest orders down.
+
+    `sync` fetches pages of the history, newest orders first, until it reaches the high-water mark: the
+    timestamp of the newest order of the last complete sync, or of the oldest order then still open (or
+    otherwise not filled, cancelled or rejected) if that is older, since it may have changed since. Once the
+    history is cached a sync is one request, however long the history is. The orders are kept sorted by
+    timestamp as they come in, and the orders that are not closed yet are tracked on their own, so that
+    neither a sync nor reading the history goes over the whole cache.
+
+    With a path, every new or changed order and every change of the high-water mark is appended as a line
+    of JSON to the file. The file is read back on start and rewritten with one line per order.
+    """
+
+    def __init__(self, path_to_cache: Optional[Path] = None, page_size: int = HISTORY_PAGE_SIZE):
+        self._path_to_cache = None if path_to_cache is None else convert_to_absolute_path(path_to_cache)
+        self._page_size = page_size
+        self._orders = {}  # type: Dict[OrderID, Order]
+        self._sort_keys = []  # (timestamp, insertion number) of the orders, ascending
+        self._sorted_orders = []
+        self._insertion_numbers = {}
+        self._number_of_insertions = 0
+        self._non_closed_orders = {}  # type: Dict[OrderID, int]
+        self._high_water_mark = None
+        if self._path_to_cache is not None and os.path.isfile(self._path_to_cache):
+            self._load()
+            self._compact()
+
+    @property
+    def high_water_mark(self) -> Optional[int]:
+        """Timestamp in milliseconds down to which the next sync fetches, None before the first sync."""
+        return self._high_water_mark
+
+    def __len__(self):
+        return len(self._orders)
+
+    def orders(self) -> List[Order]:
+        """The cached orders, newest first."""
+        return self._sorted_orders[::-1]
+
+    def newest_first(self) -> Iterator[Order]:
+        """The cached orders, newest first, without copying them."""
+        return reversed(self._sorted_orders)
+
+    def last_filled(self) -> Optional[Order]:
+        for order in self.newest_first():
+            if order.state is OrderState.filled:
+                return order
+        return None
+
+    def sync(self, fetch_page: Callable[[int, int], List[Order]]) -> int:
+        """Fetch the orders newer than the high-water mark with `fetch_page(page, page_size)`, which returns
+        the orders of a page of the history, newest first. Returns the number of pages fetched."""
+        page = 0
+        while True:
+            orders = fetch_page(page, self._page_size)
+            for order in orders:
+                if self._upsert(order):
+                    self._append({"order": order.as_dict()})
+            page += 1
+            if len(orders) < self._page_size:
+                break
+            if self._high_water_mark is not None and \
+                    orders[-1].timestamp.as_epoch_time() < self._high_water_mark:
+                break
+        high_water_mark = self._compute_high_water_mark()
+        if high_water_mark != self._high_water_mark:
+            self._high_water_mark = high_water_mark
+            self._append({"high_water_mark": high_water_mark})
+        return page
+
+    def _compute_high_water_mark(self) -> Optional[int]:
+        if not self._sort_keys:
+            return None
+        newest_timestamp = self._sort_keys[-1][0]
+        return min(newest_timestamp, min(self._non_closed_orders.values(), default=newest_timestamp))
+
+    def _upsert(self, order: Order) -> bool:
+        """Add or replace an order, returning whether the cache changed."""
+        cached_order = self._orders.get(order.id)
+        if cached_order is not None:
+            if cached_order.as_dict() == order.as_dict():
+                return False
+            self._remove(cached_order)
+        self._insert(order)
+        return True
+
+    def _insert(self, order: Order):
+        timestamp = order.timestamp.as_epoch_time()
+        self._number_of_insertions += 1
+        sort_key = (timestamp, self._number_of_insertions)
+        # new orders are the newest ones, so this is an append most of the time
+        index = bisect.bisect_right(self._sort_keys, sort_key)
+        self._sort_keys.insert(index, sort_key)
+        self._sorted_orders.insert(index, order)
+        self._insertion_numbers[order.id] = self._number_of_insertions
+        self._orders[order.id] = order
+        if order.state not in CLOSED_ORDER_STATES:
+            self._non_closed_orders[order.id] = timestamp
+
+    def _remove(self, order: Order):
+        index = bisect.bisect_left(self._sort_keys,
+                                   (order.timestamp.as_epoch_time(), self._insertion_numbers.pop(order.id)))
+        del self._sort_keys[index]
+        del self._sorted_orders[index]
+        del self._orders[order.id]
+        self._non_closed_orders.pop(order.id, None)
+
+    def _append(self, record: dict):
+        if self._path_to_cache is None:
+            return
+        with open(self._path_to_cache, "a") as outfile:
+            outfile.write(json.dumps(record) + "\n")
+
+    def _load(self):
+        with open(self._path_to_cache, "r") as infile:
+            lines = infile.readlines()
+        for line_number, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                if line_number == len(lines) - 1:
+                    # cut short by a crash, it is dropped when the file is rewritten
+                    logger.info("Dropping incomplete last line of order history {}".format(self._path_to_cache))
+                    continue
+                raise
+            if "order" in record:
+                self._upsert(Order.from_dict(record["order"]))
+            else:
+                self._high_water_mark = record["high_water_mark"]
+
+    def _compact(self):
+        """Rewrite the file with the last version of every order, oldest first, and the high-water mark."""
+        file_descriptor, temporary_file = tempfile.mkstemp(dir=os.path.dirname(self._path_to_cache),
+                                                           suffix=".jsonl")
+        try:
+            with os.fdopen(file_descriptor, "w") as outfile:
+                for order in self._sorted_orders:
+                    outfile.write(json.dumps({"order": order.as_dict()}) + "\n")
+                outfile.write(json.dumps({"high_water_mark": self._high_water_mark}) + "\n")
+            os.replace(temporary_file, self._path_to_cache)
+        except BaseException:
+            os.remove(temporary_file)
+            raise
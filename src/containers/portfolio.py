@@ -1,6 +1,6 @@
 import os
-from collections import defaultdict
-from typing import Union, Optional
+from collections import deque, OrderedDict
+from typing import Union, Optional, Dict, List
 
 import logging
 import pandas as pd
@@ -10,6 +10,9 @@ from src.containers.signal import SignalBuy, SignalSell, SignalHold
 from src.containers.order import Order, OrderBuy, OrderSell
 from src.classification.trading_classifier import TradingClassifier
 from src.containers.data_point import PricePoint
+from src.containers.ledger import Ledger
+from src.containers.portfolio_journal import PortfolioJournal, PORTFOLIO_EVENT, LEDGER_EVENT, MARK_EVENT, \
+    FINISHED_EVENT
 from src.mixins.save_load_mixin import DillSaveLoadMixin, JsonSaveMixin
 from src.type_aliases import Path
 
@@ -17,20 +20,33 @@ from src.logger import logger
 
 percentage = float
 
+FEES = 0.001  # 0.1% on binance
+MAX_RECENT_EVENTS = 10000  # signals, orders and order ids kept by a portfolio
+
 
 class Portfolio:
+    """Fills of a trading run, accounted for in a Ledger.
+
+    Only the last `max_recent_events` signals and orders, and ids of orders, are kept (all of them with None);
+    the ledger holds everything needed to account for the run.
+    """
+
     def __init__(self, initial_capital: float, trade_amount: Union[int, float],
-                 classifier: Optional[TradingClassifier] = None):
-        self._fees = 0.001  # 0.1% on binance
+                 classifier: Optional[TradingClassifier] = None,
+                 max_recent_events: Optional[int] = MAX_RECENT_EVENTS):
+        self._fees = FEES
         self._trade_amount = trade_amount
         self._classifier = classifier
-        self._signals = []
-        self._orders = []
+        self._max_recent_events = max_recent_events
+        self._signals = deque(maxlen=max_recent_events)
+        self._orders = deque(maxlen=max_recent_events)
         self._capital = []
         self._initial_capital = initial_capital
         self._positions_df = pd.DataFrame(columns=['intended_trade_time',
                                                    'amount_traded', 'actual_price', 'intended_price'])
-        self._positions = defaultdict(list)
+        self._ledger = Ledger(initial_capital, fees=self._fees)
+        self._order_keys = OrderedDict()  # keys of the recent orders, oldest first
+        self._journal = None
         self._portfolio_df = pd.DataFrame(columns=['order_expenditure', 'cumulative_order_expenditure',
                                                    'remaining_capital'])
         self._point_stats = {}
@@ -49,17 +65,23 @@ class Portfolio:
     def positions_df(self):
         return self._positions_df
 
+    @property
+    def ledger(self) -> Ledger:
+        return self._ledger
+
     @property
     def trade_amount(self):
         return self._trade_amount
 
     @property
-    def signals(self):
-        return self._signals
+    def signals(self) -> List[Union[SignalBuy, SignalSell, SignalHold]]:
+        """The most recent signals, oldest first."""
+        return list(self._signals)
 
     @property
-    def orders(self):
-        return self._orders
+    def orders(self) -> List[Order]:
+        """The most recent orders, oldest first."""
+        return list(self._orders)
 
     def update(self, data: Union[Union[SignalBuy, SignalSell, SignalHold], Union[OrderSell, OrderBuy]]):
         if isinstance(data, SignalBuy) or isinstance(data, SignalSell) or isinstance(data, SignalHold):
@@ -69,52 +91,92 @@ class Portfolio:
         elif isinstance(data, OrderSell) or isinstance(data, OrderBuy):
             self._append_order(data)
             self._orders.append(data)
+            self._remember_order_key(self._order_key(data))
             logger.debug("Appended order: {}".format(data))
+        else:
+            return
+        if self._journal is not None:
+            self._journal.append(data)
 
-    def compute_performance(self):
-
-        self._portfolio_df = pd.DataFrame(index=self._positions['actual_trade_time'])
-        self._positions_df = pd.DataFrame(index=self._positions['actual_trade_time'])
-        self._positions_df['amount_traded'] = self._positions['amount_traded']
-        self._positions_df['actual_price'] = self._positions['actual_price']
-
-        self._portfolio_df['order_expenditure'] = self._compute_order_expenditure(fees=self._fees,
-                                                                                  positions=self._positions_df[
-                                                                                      'amount_traded'],
-                                                                                  prices=self._positions_df[
-                                                                                      'actual_price'])
-
-        self._portfolio_df['cumulative_order_expenditure'] = self._compute_cumulative_order_expenditure(
-            self._portfolio_df['order_expenditure'])
-
-        self._portfolio_df['remaining_capital'] = self._compute_remaining_capital(
-            initial_capital=self._initial_capital,
-            cumulative_order_expenditure=self._portfolio_df['cumulative_order_expenditure']
-        )
-
-        self._point_stats['base_index_pct_change'] = (self._positions_df['actual_price'][-1] -
-                                                      self._positions_df['actual_price'][0]) / \
-                                                     self._positions_df['actual_price'][0]
-        self._point_stats['total_pct_change'] = (self._portfolio_df['remaining_capital'][-1] -
-                                                 self._initial_capital) / self._initial_capital
+    @property
+    def journal(self) -> Optional[PortfolioJournal]:
+        return self._journal
 
-    def _append_to_positions(self, trade_time, amount, price):
-        self._positions['actual_trade_time'].append(trade_time)
-        self._positions['amount_traded'].append(amount)
-        self._positions['actual_price'].append(price)
+    def start_journal(self, journal: PortfolioJournal):
+        """Record the ledger of this portfolio, and from now on every signal and order it is updated with, in
+        the journal. The signals and orders so far are not recorded, only the ids of the recent orders."""
+        journal.start(initial_capital=self._initial_capital, trade_amount=self._trade_amount)
+        journal.append_ledger(self._ledger, order_ids=[key[1] for key in self._order_keys if key[0] == "id"])
+        self._journal = journal
 
     @staticmethod
-    def _compute_remaining_capital(initial_capital: float, cumulative_order_expenditure: pd.Series) -> pd.Series:
-        return initial_capital - cumulative_order_expenditure
+    def from_journal(journal: PortfolioJournal):
+        """Rebuild a portfolio from its journal, which it keeps appending to, including the last mark to market."""
+        records = journal.read()
+        header = next(records)
+        if header["event"] != PORTFOLIO_EVENT:
+            raise ValueError("Journal {} does not start with the portfolio parameters".format(
+                journal.path_to_journal))
+        portfolio = Portfolio(initial_capital=header["initial_capital"], trade_amount=header["trade_amount"])
+        for record in records:
+            if record["event"] == LEDGER_EVENT:
+                portfolio._ledger = PortfolioJournal.decode_ledger(record)
+                for order_id in record["order_ids"]:
+                    portfolio._remember_order_key(("id", order_id))
+            elif record["event"] == MARK_EVENT:
+                portfolio.mark_to_market(record["price"])
+            elif record["event"] != FINISHED_EVENT:
+                portfolio.update(PortfolioJournal.decode(record))
+        portfolio._journal = journal
+        return portfolio
+
+    def has_order(self, order: Order) -> bool:
+        """Whether the order (the one with the same id, if it has one) has been added to the portfolio."""
+        return self._order_key(order) in self._order_keys
 
     @staticmethod
-    def _compute_order_expenditure(fees: float, positions: pd.Series,
-                                   prices: pd.Series) -> pd.Series:
-        return positions.multiply(prices)
+    def _order_key(order: Order):
+        return ("id", order.id) if order.id is not None else ("object", id(order))
+
+    def _remember_order_key(self, key):
+        self._order_keys[key] = None
+        self._order_keys.move_to_end(key)
+        if self._max_recent_events is not None and len(self._order_keys) > self._max_recent_events:
+            self._order_keys.popitem(last=False)
+
+    def mark_to_market(self, price: float):
+        if price == self._ledger.last_price:
+            return
+        self._ledger.mark(price)
+        if self._journal is not None:
+            self._journal.append_mark(price)
+
+    def performance_snapshot(self) -> Dict[str, float]:
+        """Current cash, position, fees, profit and loss and drawdown, without building any DataFrame."""
+        return self._ledger.snapshot()
 
-    @staticmethod
-    def _compute_cumulative_order_expenditure(order_expenditures: pd.Series) -> pd.Series:
-        return order_expenditures.cumsum()
+    def compute_performance(self):
+        """Materialize the ledger history into portfolio_df and positions_df."""
+        trade_times = self._ledger.trade_times
+        self._portfolio_df = pd.DataFrame(index=trade_times)
+        self._positions_df = pd.DataFrame(index=trade_times)
+        self._positions_df['amount_traded'] = self._ledger.column('amount_traded').copy()
+        self._positions_df['actual_price'] = self._ledger.column('actual_price').copy()
+
+        self._portfolio_df['order_expenditure'] = self._ledger.column('order_expenditure').copy()
+        self._portfolio_df['cumulative_order_expenditure'] = \
+            self._ledger.column('cumulative_order_expenditure').copy()
+        self._portfolio_df['remaining_capital'] = \
+            self._initial_capital - self._ledger.column('cumulative_order_expenditure')
+
+        self._point_stats['base_index_pct_change'] = (self._positions_df['actual_price'].iloc[-1] -
+                                                      self._positions_df['actual_price'].iloc[0]) / \
+                                                     self._positions_df['actual_price'].iloc[0]
+        self._point_stats['total_pct_change'] = (self._portfolio_df['remaining_capital'].iloc[-1] -
+                                                 self._initial_capital) / self._initial_capital
+
+    def _append_to_positions(self, trade_time, amount, price):
+        self._ledger.record_fill(trade_time, amount, price)
 
     def _append_signal(self, signal: Union[SignalBuy, SignalSell, SignalHold],
                        quantity: int, price_point: PricePoint):
@@ -141,6 +203,25 @@ class Portfolio:
         return "Trade Amount: {}, \n" \
                "Initial Capital: {}".format(self._trade_amount, self._initial_capital)
 
+    def __setstate__(self, state):
+        # portfolios pickled before the ledger was introduced hold their fills in lists
+        if "_ledger" not in state:
+            positions = state.pop("_positions")
+            state["_ledger"] = Ledger(state["_initial_capital"], fees=state["_fees"])
+            for trade_time, amount, price in zip(positions['actual_trade_time'], positions['amount_traded'],
+                                                 positions['actual_price']):
+                state["_ledger"].record_fill(trade_time, amount, price)
+        # portfolios pickled before the number of recent events was bounded keep all of theirs
+        state.setdefault("_max_recent_events", None)
+        state["_signals"] = deque(state["_signals"], maxlen=state["_max_recent_events"])
+        state["_orders"] = deque(state["_orders"], maxlen=state["_max_recent_events"])
+        state.setdefault("_journal", None)
+        self.__dict__.update(state)
+        # orders without an id are keyed by identity, which does not survive pickling
+        self._order_keys = OrderedDict()
+        for order in self._orders:
+            self._remember_order_key(self._order_key(order))
+
     def save_to_disk(self, path_to_file: Path):
 
         self._dill_save_load.save_to_disk(self, path_to_file)
@@ -0,0 +1,139 @@
+import os
+from typing import Iterator, Union, Optional, List
+
+import simplejson as json
+
+from src.containers.ledger import Ledger
+from src.containers.order import Order, OrderBuy, OrderSell, OrderID
+from src.containers.signal import SignalBuy, SignalSell, SignalHold, generate_trading_signal
+from src.containers.time import MilliSeconds
+from src.mixins.save_load_mixin import convert_to_absolute_path
+from src.type_aliases import Path
+from src.logger import logger
+
+PORTFOLIO_EVENT = "portfolio"
+SIGNAL_EVENT = "signal"
+ORDER_EVENT = "order"
+LEDGER_EVENT = "ledger"
+MARK_EVENT = "mark"
+FINISHED_EVENT = "finished"
+FINISHED_LINE = json.dumps({"event": FINISHED_EVENT}) + "\n"
+
+
+class PortfolioJournal(object):
+    """Append-only journal of the signals and orders added to a portfolio.
+
+    Each event is one line of JSON, written and flushed as it happens (and fsynced with `fsync=True`), so
+    persisting costs one small write per event instead of pickling the whole portfolio. The first line
+    holds the parameters of the portfolio and the second the state of its ledger when the journal was
+    started; Portfolio.from_journal() replays the rest. A last line cut
+    short by a crash is dropped from the file on reading. finish() marks the end of a run, so that only the
+    journal of an interrupted run is resumed.
+    """
+
+    def __init__(self, path_to_journal: Path, fsync: bool = False):
+        self._path_to_journal = convert_to_absolute_path(path_to_journal)
+        self._fsync = fsync
+        self._file = None
+
+    @property
+    def path_to_journal(self) -> Path:
+        return self._path_to_journal
+
+    def exists(self) -> bool:
+        return os.path.isfile(self._path_to_journal) and os.path.getsize(self._path_to_journal) > 0
+
+    def is_finished(self) -> bool:
+        """Whether the journal ends with the record written by finish()."""
+        if not self.exists() or os.path.getsize(self._path_to_journal) < len(FINISHED_LINE):
+            return False
+        with open(self._path_to_journal, "r") as infile:
+            infile.seek(os.path.getsize(self._path_to_journal) - len(FINISHED_LINE))
+            return infile.read() == FINISHED_LINE
+
+    def start(self, initial_capital: float, trade_amount: Union[int, float]):
+        """Start a new journal, replacing any existing one."""
+        self.close()
+        with open(self._path_to_journal, "w"):
+            pass
+        self._append({"event": PORTFOLIO_EVENT, "initial_capital": initial_capital, "trade_amount": trade_amount})
+
+    def append(self, data: Union[Union[SignalBuy, SignalSell, SignalHold], Union[OrderSell, OrderBuy]]):
+        if isinstance(data, Order):
+            self._append({"event": ORDER_EVENT, "order": data.as_dict()})
+        else:
+            self._append({"event": SIGNAL_EVENT, "signal": data.as_dict()})
+
+    def append_mark(self, price: float):
+        self._append({"event": MARK_EVENT, "price": price})
+
+    def finish(self):
+        """Record that the run ended cleanly, and close the journal."""
+        self._append({"event": FINISHED_EVENT})
+        self.close()
+
+    def append_ledger(self, ledger: Ledger, order_ids: List[OrderID]):
+        state = ledger.as_dict()
+        state["_trade_times"] = [None if trade_time is None else trade_time.as_epoch_time()
+                                 for trade_time in state["_trade_times"]]
+        self._append({"event": LEDGER_EVENT, "ledger": state, "order_ids": order_ids})
+
+    def _append(self, record: dict):
+        if self._file is None:
+            self._file = open(self._path_to_journal, "a")
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        if self._fsync:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def read(self) -> Iterator[dict]:
+        with open(self._path_to_journal, "r") as infile:
+            lines = infile.readlines()
+        for line_number, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                if line_number == len(lines) - 1:
+                    # cut short by a crash; drop it so that the next event is not appended to it
+                    logger.info("Dropping incomplete last event of journal {}".format(self._path_to_journal))
+                    self._truncate(sum(len(previous_line) for previous_line in lines[:-1]))
+                    continue
+                raise
+            if not line.endswith("\n"):
+                # the event was written but not the end of its line
+                self._append_newline()
+            yield record
+
+    def _truncate(self, length: int):
+        self.close()
+        with open(self._path_to_journal, "r+") as outfile:
+            outfile.truncate(length)
+
+    def _append_newline(self):
+        self.close()
+        with open(self._path_to_journal, "a") as outfile:
+            outfile.write("\n")
+
+    @staticmethod
+    def decode(record: dict) -> Optional[Union[Union[SignalBuy, SignalSell, SignalHold], Union[OrderSell, OrderBuy]]]:
+        if record["event"] == ORDER_EVENT:
+            return Order.from_dict(record["order"])
+        elif record["event"] == SIGNAL_EVENT:
+            return generate_trading_signal().from_dict(record["signal"])
+
+    @staticmethod
+    def decode_ledger(record: dict) -> Ledger:
+        state = dict(record["ledger"])
+        state["_trade_times"] = [None if trade_time is None else MilliSeconds(trade_time)
+                                 for trade_time in state["_trade_times"]]
+        return Ledger.from_dict(state)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_file"] = None
+        return state
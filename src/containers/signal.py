@@ -36,6 +36,12 @@ class _TradingSignal(object):
                 "price_point": self.price_point.as_dict()
                 }
 
+    @staticmethod
+    def from_dict(signal: dict):
+        """Inverse of as_dict()."""
+        cls = {cls.__name__: cls for cls in _signal_types.values()}[signal["type"]]
+        return cls(_signal_values[cls], PricePoint.from_dict(signal["price_point"]))
+
 
 def generate_trading_signal(*args, **kwargs):
     if len(args) == 0 and len(kwargs) == 0:
@@ -59,3 +65,4 @@ class SignalHold(_TradingSignal):
 _signal_types = {-1: SignalBuy,
                  1: SignalSell,
                  0: SignalHold, }
+_signal_values = {cls: integer_value for integer_value, cls in _signal_types.items()}
@@ -0,0 +1,86 @@
+from typing import Iterator, List, Union
+
+import numpy as np
+
+from src.containers.data_point import PricePoint
+from src.containers.signal import SignalBuy, SignalSell, SignalHold, generate_trading_signal
+from src.containers.stock_data import StockData
+from src.containers.time import MilliSeconds
+
+BUY = -1
+SELL = 1
+HOLD = 0
+
+
+class SignalArray(object):
+    """Sequence of trading signals stored as columns: int8 signal codes (see signal._signal_types),
+    close times in epoch milliseconds and prices.
+
+    Indexing with an integer or iterating creates the SignalBuy/SignalSell/SignalHold objects, so this only
+    happens where single signals leave the array; slicing and masking stay columnar.
+    """
+
+    def __init__(self, signals: np.ndarray, close_time: np.ndarray, price: np.ndarray):
+        self._signals = np.asarray(signals, dtype=np.int8)
+        self._close_time = np.asarray(close_time, dtype=np.int64)
+        self._price = np.asarray(price, dtype=np.float64)
+
+    @staticmethod
+    def from_predictions(predictions: np.ndarray, stock_data: StockData):
+        """One signal per prediction, at the close of the candle in the same position."""
+        candles = stock_data.candles[:len(predictions)]
+        return SignalArray(np.asarray(predictions)[:len(candles)], candles.close_time, candles.close_price)
+
+    @staticmethod
+    def from_price_moves(stock_data: StockData):
+        """Buy at the close of every candle followed by a rise in price, sell at the close of all others but the
+        last one."""
+        close_prices = stock_data.candles.close_price
+        signals = np.where(close_prices[1:] > close_prices[:-1], BUY, SELL)
+        return SignalArray(signals, stock_data.candles.close_time[:-1], close_prices[:-1])
+
+    @property
+    def signals(self) -> np.ndarray:
+        return self._signals
+
+    @property
+    def close_time(self) -> np.ndarray:
+        return self._close_time
+
+    @property
+    def price(self) -> np.ndarray:
+        return self._price
+
+    def replace_repeats_with_holds(self):
+        """Replace every signal equal to the one before it with a hold."""
+        signals = self._signals.copy()
+        signals[1:][self._signals[1:] == self._signals[:-1]] = HOLD
+        return SignalArray(signals, self._close_time, self._price)
+
+    def trades(self):
+        """The buy and sell signals only."""
+        return self[self._signals != HOLD]
+
+    def to_list(self) -> List[Union[SignalBuy, SignalSell, SignalHold]]:
+        return list(self)
+
+    def _signal(self, index: int) -> Union[SignalBuy, SignalSell, SignalHold]:
+        return generate_trading_signal().from_integer_value(
+            integer_value=int(self._signals[index]),
+            price_point=PricePoint(value=self._price[index].item(),
+                                   date_time=MilliSeconds(int(self._close_time[index])).as_datetime()))
+
+    def __len__(self):
+        return len(self._signals)
+
+    def __iter__(self) -> Iterator[Union[SignalBuy, SignalSell, SignalHold]]:
+        for index in range(len(self)):
+            yield self._signal(index)
+
+    def __getitem__(self, item: Union[int, slice, np.ndarray]):
+        if isinstance(item, (int, np.integer)):
+            return self._signal(item)
+        return SignalArray(self._signals[item], self._close_time[item], self._price[item])
+
+    def __repr__(self):
+        return "SignalArray({} signals)".format(len(self))
@@ -1,18 +1,21 @@
-from typing import List
+from typing import List, Union
 
 import dill
 
 from src.containers.candle import Candle
+from src.containers.candle_array import CandleArray
 from src.containers.trading_pair import TradingPair
 
 
 class StockData(object):
-    def __init__(self, candles: List[Candle], trading_pair: TradingPair):
+    def __init__(self, candles: Union[List[Candle], CandleArray], trading_pair: TradingPair):
+        if not isinstance(candles, CandleArray):
+            candles = CandleArray.from_candles(candles)
         self._candles = candles
         self._trading_pair = trading_pair
 
     @property
-    def candles(self):
+    def candles(self) -> CandleArray:
         return self._candles
 
     def append_new_candle(self, candle: Candle):
@@ -25,6 +28,12 @@ class StockData(object):
     def __len__(self):
         return len(self._candles)
 
+    def __setstate__(self, state):
+        # stock data pickled before the columnar container was introduced holds a list of Candle objects
+        if not isinstance(state["_candles"], CandleArray):
+            state["_candles"] = CandleArray.from_candles(state["_candles"])
+        self.__dict__.update(state)
+
 
 def save_to_disk(data: StockData, path_to_file: str):
     with open(path_to_file, 'wb') as outfile:
@@ -15,6 +15,10 @@ class MilliSeconds(object):
         else:
             return datetime.datetime.fromtimestamp(self._time / 1000)
 
+    @staticmethod
+    def from_datetime(date_time: datetime.datetime):
+        return MilliSeconds(time=round(date_time.timestamp() * 1000))
+
     @staticmethod
     def from_cobinhood_timestamp(timestamp: Optional[str]):
         if timestamp is not None:
@@ -1,14 +1,16 @@
 from typing import List
 
+import numpy as np
+
 from src.containers.signal import generate_trading_signal
 from src.containers.candle import Candle
 from src.containers.data_point import PricePoint
+from src.containers.signal_array import SignalArray
 from src.containers.stock_data import StockData
 
 
-def generate_trading_signals_from_array(signals: List[int], stock_data: StockData):
-    return [generate_trading_signal_from_prediction(signal, candle)
-            for signal, candle in zip(signals, stock_data.candles)]
+def generate_trading_signals_from_array(signals: List[int], stock_data: StockData) -> SignalArray:
+    return SignalArray.from_predictions(np.asarray(signals), stock_data)
 
 
 def generate_trading_signal_from_prediction(prediction: int, candle: Candle):
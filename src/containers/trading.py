@@ -1,11 +1,14 @@
+import os
+
 import tenacity
 
 from src.connection.binance_helpers import load_binance_api_token
 from src.containers.order import Order, Price, Size, OrderID, OrderState
 from src.containers.order_book import OrderBook
+from src.containers.order_history_cache import OrderHistoryCache
 from src.containers.trading_pair import TradingPair
 from src.market_maker.mock_client import MockClient
-from src.type_aliases import BinanceClient
+from src.type_aliases import BinanceClient, Path
 from src.logger import logger
 
 from typing import List, Optional, Union
@@ -49,8 +52,11 @@ class Trading:
 
 
 class BinanceTrading(Trading):
-    def __init__(self, client: BinanceClient):
+    def __init__(self, client: BinanceClient, order_history_directory: Optional[Path] = None):
         super().__init__(client=client)
+        # order histories are cached per trading pair, on disk if a directory is given
+        self._order_history_directory = order_history_directory
+        self._order_histories = {}
 
     def place_order(self, order: Order) -> Order:
         response = self._client.trading.post_orders(data=order.to_cobinhood_dict())
@@ -112,19 +118,37 @@ class BinanceTrading(Trading):
             raise BinanceError("Could not fetch last n orders. "
                                  "Reason: {}".format(response["error"]["error_code"]))
 
-    @tenacity.retry(wait=tenacity.wait_fixed(1))
+    def get_last_filled_order(self, trading_pair: TradingPair) -> Order:
+        last_filled_order = self._sync_order_history(trading_pair).last_filled()
+        if last_filled_order is None:
+            raise BinanceError("There is no filled order in the order history.")
+        return last_filled_order
+
     def get_order_history(self, trading_pair: TradingPair) -> List[Order]:
+        """All orders of the trading pair, newest first; only the orders changed since the last call are
+        fetched (see OrderHistoryCache)."""
+        return self._sync_order_history(trading_pair).orders()
+
+    @tenacity.retry(wait=tenacity.wait_fixed(1))
+    def _sync_order_history(self, trading_pair: TradingPair) -> OrderHistoryCache:
+        order_history = self._get_order_history_cache(trading_pair)
+        order_history.sync(lambda page, limit: self._get_order_history_page(trading_pair, page, limit))
+        return order_history
+
+    def _get_order_history_cache(self, trading_pair: TradingPair) -> OrderHistoryCache:
+        trading_pair_id = trading_pair.as_string_for_cobinhood()
+        if trading_pair_id not in self._order_histories:
+            path_to_cache = None if self._order_history_directory is None else os.path.join(
+                self._order_history_directory, "order_history_{}.jsonl".format(trading_pair_id))
+            self._order_histories[trading_pair_id] = OrderHistoryCache(path_to_cache)
+        return self._order_histories[trading_pair_id]
+
+    def _get_order_history_page(self, trading_pair: TradingPair, page: int, limit: int) -> List[Order]:
         response = self._client.trading.get_order_history(trading_pair_id=trading_pair.as_string_for_cobinhood(),
-                                                          limit=10)
+                                                          limit=limit, page=page)
         if response["success"]:
-            pages = response["result"]["total_page"]
-            orders = []
-            for i in range(0, pages):
-                response = self._client.trading.get_order_history(
-                    trading_pair_id=trading_pair.as_string_for_cobinhood(),
-                    limit=100, page=i)
-                orders += response["result"]["orders"]
-            return [Order.from_cobinhood_response(order) for order in orders]
+            logger.debug("Fetched page {} of order history...".format(page))
+            return [Order.from_cobinhood_response(order) for order in response["result"]["orders"]]
         else:
             raise BinanceError("Could not fetch order history. "
                                  "Reason: {}".format(response["error"]["error_code"]))
@@ -0,0 +1,82 @@
+from queue import Full, Empty
+from typing import Optional
+
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed capacity FIFO window of samples backed by a preallocated numpy array.
+
+    Every sample is written twice, at position i and i + capacity of a buffer of twice the capacity,
+    so that the samples, oldest first, are always available as one contiguous slice (see `view`)
+    without copying. The put/get/full/empty/qsize methods mirror the non-blocking subset of
+    queue.Queue used by the sliding windows of the technical indicators.
+    """
+
+    def __init__(self, capacity: int, dtype=np.float64):
+        self._capacity = capacity
+        self._buffer = np.zeros(2 * capacity, dtype=dtype)
+        self._head = 0
+        self._size = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self._capacity
+
+    @property
+    def view(self) -> np.ndarray:
+        """Read-only view of the samples, oldest first, valid until the next append."""
+        view = self._buffer[self._head:self._head + self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def queue(self) -> np.ndarray:
+        return self.view
+
+    def append(self, sample) -> Optional[float]:
+        """Append a sample, evicting and returning the oldest one if the buffer is full."""
+        evicted = None
+        if self._size == self._capacity:
+            evicted = self._buffer[self._head].item()
+            position = self._head
+            self._head = (self._head + 1) % self._capacity
+        else:
+            position = (self._head + self._size) % self._capacity
+            self._size += 1
+        self._buffer[position] = sample
+        self._buffer[position + self._capacity] = sample
+        return evicted
+
+    def reset(self, samples: np.ndarray):
+        """Replace the contents with the last `capacity` samples, oldest first."""
+        samples = samples[len(samples) - min(len(samples), self._capacity):]
+        self._head = 0
+        self._size = len(samples)
+        self._buffer[:self._size] = samples
+        self._buffer[self._capacity:self._capacity + self._size] = samples
+
+    def put(self, sample, block: bool = False):
+        if self.full():
+            raise Full
+        self.append(sample)
+
+    def get(self, block: bool = False):
+        if self.empty():
+            raise Empty
+        oldest = self._buffer[self._head].item()
+        self._head = (self._head + 1) % self._capacity
+        self._size -= 1
+        return oldest
+
+    def full(self) -> bool:
+        return self._size == self._capacity
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def qsize(self) -> int:
+        return self._size
+
+    def __len__(self):
+        return self._size
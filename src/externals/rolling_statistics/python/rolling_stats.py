@@ -1,11 +1,12 @@
-from queue import Queue
 import numpy as np
 
+from src.externals.rolling_statistics.python.ring_buffer import RingBuffer
+
 
 class RollingMean:
     def __init__(self, window_size: int):
         self._window_size = float(window_size)
-        self._data = Queue(maxsize=window_size)
+        self._data = RingBuffer(window_size)
         self._new_sample = float
         self._old_sample = float
         self._mode = str
@@ -17,17 +18,46 @@ class RollingMean:
 
     def insert_new_sample(self, sample: float):
         self._new_sample = sample
-        if self._data.qsize() < self._data.maxsize:
+        evicted_sample = self._data.append(sample)
+        if evicted_sample is None:
             self._mode = 'cumulative'
-            self._data.put(sample, block=False)
         else:
             self._mode = 'rolling'
-            self._old_sample = self._data.get()
-            self._data.put(sample, block=False)
+            self._old_sample = evicted_sample
         self._update_state()
 
+    def compute_series(self, samples: np.ndarray, advance_state: bool = False) -> np.ndarray:
+        """Return the mean after each of the samples, exactly as insert_new_sample() would on a fresh instance.
+
+        If advance_state is True, the instance is left in the state it would be in after inserting the samples.
+        """
+        samples = np.ascontiguousarray(samples, dtype=np.float64)
+        number_of_samples = len(samples)
+        window_size = int(self._window_size)
+        means = np.empty(number_of_samples)
+        for i in range(min(number_of_samples, window_size)):
+            means[i] = np.mean(samples[:i + 1])
+        if number_of_samples > window_size:
+            # unroll the recurrence m + new / w - old / w into one sequential sum, keeping its order of operations
+            steps = np.empty(2 * (number_of_samples - window_size) + 1)
+            steps[0] = means[window_size - 1]
+            steps[1::2] = samples[window_size:] / self._window_size
+            steps[2::2] = -(samples[:number_of_samples - window_size] / self._window_size)
+            means[window_size:] = np.add.accumulate(steps)[2::2]
+        if advance_state and number_of_samples > 0:
+            self._data.reset(samples)
+            self._new_sample = samples[-1]
+            if number_of_samples > window_size:
+                self._mode = 'rolling'
+                self._old_sample = samples[number_of_samples - window_size - 1]
+            else:
+                self._mode = 'cumulative'
+            self._new_mean = means[-1]
+            self._old_mean = means[-1]
+        return means
+
     def _compute_mean(self):
-        self._new_mean = np.mean(list(self._data.queue))
+        self._new_mean = np.mean(self._data.view)
         self._old_mean = self._new_mean
 
     def _update_state(self):
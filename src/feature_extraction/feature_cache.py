@@ -0,0 +1,101 @@
+import hashlib
+import io
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import dill
+import numpy as np
+
+from src import definitions
+from src.containers.stock_data import StockData
+from src.feature_extraction.indicator_graph import IndicatorGraph
+from src.helpers import generate_hash
+from src.type_aliases import Hash
+
+FEATURE_FILE_EXTENSION = ".npz"
+_STATE_KEY = "__indicator_graph_state__"
+
+Features = Dict[str, np.ndarray]
+
+
+def hash_candles(stock_data: StockData) -> Hash:
+    candles_hash = hashlib.md5()
+    for name, column in stock_data.candles.columns.items():
+        candles_hash.update(name.encode("utf-8"))
+        candles_hash.update(np.ascontiguousarray(column).tobytes())
+    return candles_hash.hexdigest()
+
+
+def hash_indicator_state(indicator_graph: IndicatorGraph) -> Hash:
+    buffer = io.BytesIO()
+    pickler = dill.Pickler(buffer)
+    # without the memo, equal states pickle to the same bytes whichever of their objects happen to be shared
+    pickler.fast = True
+    pickler.dump(indicator_graph.state)
+    return hashlib.md5(buffer.getvalue()).hexdigest()
+
+
+class FeatureCache(object):
+    """Content addressed store of indicator columns, one compressed npz file per entry.
+
+    An entry is keyed by the candles (trading pair and the bytes of every column), the names of the
+    indicators and the state of the indicator graph before the computation, since indicators that have
+    already seen candles give different results than fresh ones. Each entry also keeps the state the
+    graph was left in, so that a cache hit leaves the graph exactly as computing the columns would have.
+    """
+
+    def __init__(self, cache_dir: str = os.path.join(definitions.DATA_DIR, "features")):
+        self._cache_dir = cache_dir
+
+    @property
+    def cache_dir(self) -> str:
+        return self._cache_dir
+
+    @staticmethod
+    def generate_key(stock_data: StockData, indicator_graph: IndicatorGraph) -> Hash:
+        return generate_hash(stock_data.trading_pair, len(stock_data.candles), hash_candles(stock_data),
+                             indicator_graph.technical_indicator_names,
+                             hash_indicator_state(indicator_graph))
+
+    def _path_to_entry(self, key: Hash) -> str:
+        return os.path.join(self._cache_dir, "features_{}{}".format(key, FEATURE_FILE_EXTENSION))
+
+    def _load_entry(self, key: Hash, indicator_graph: IndicatorGraph) -> Optional[Features]:
+        path_to_entry = self._path_to_entry(key)
+        if not os.path.isfile(path_to_entry):
+            return None
+        with np.load(path_to_entry) as arrays:
+            features = OrderedDict((name, arrays["column_{}".format(i)])
+                                   for i, name in enumerate(indicator_graph.technical_indicator_names))
+            indicator_graph.restore_state(dill.loads(arrays[_STATE_KEY].tobytes()))
+        return features
+
+    def _save_entry(self, key: Hash, features: Features, indicator_graph: IndicatorGraph):
+        os.makedirs(self._cache_dir, exist_ok=True)
+        state = np.frombuffer(dill.dumps(indicator_graph.state), dtype=np.uint8)
+        # indicator names are not necessarily valid file names inside the archive, so store the columns by position
+        columns = {"column_{}".format(i): column for i, column in enumerate(features.values())}
+        # processes computing the same entry at once each write their own temporary file, the last replace wins
+        file_descriptor, temporary_file = tempfile.mkstemp(dir=self._cache_dir, suffix=FEATURE_FILE_EXTENSION)
+        try:
+            with os.fdopen(file_descriptor, "wb") as outfile:
+                np.savez_compressed(outfile, **columns, **{_STATE_KEY: state})
+            os.replace(temporary_file, self._path_to_entry(key))
+        except BaseException:
+            os.remove(temporary_file)
+            raise
+
+    def load(self, stock_data: StockData, indicator_graph: IndicatorGraph,
+             compute: Callable[[], Dict]) -> Features:
+        """Return the indicator columns computed by compute() on the indicator graph, from the cache if possible.
+
+        Columns are float arrays, with nan wherever an indicator had no result yet."""
+        key = self.generate_key(stock_data, indicator_graph)
+        features = self._load_entry(key, indicator_graph)
+        if features is None:
+            features = OrderedDict((name, np.array(values, dtype=np.float64))
+                                   for name, values in compute().items())
+            self._save_entry(key, features, indicator_graph)
+        return features
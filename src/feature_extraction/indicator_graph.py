@@ -0,0 +1,109 @@
+import copy
+import warnings
+from collections import OrderedDict
+from typing import List, Union, Tuple, Hashable, Dict
+
+import numpy as np
+
+from src.containers.candle import Candle
+from src.feature_extraction.technical_indicator import TechnicalIndicator, CompoundTechnicalIndicator, Columns, \
+    NoUniqueNameforCompoundTechnicalIndicatorWarning
+
+
+class IndicatorGraph(object):
+    """A set of technical indicators compiled into a DAG with common subexpressions shared.
+
+    Leaf indicators are identified by (type, feature getter, lags) and compound indicators by
+    (operator, operand, operand). Each distinct node is evaluated once per candle, in topological order,
+    and its result is fanned out to every indicator using it. The indicators passed in are not modified:
+    the graph works on copies of the leaves, taken in their current state.
+    """
+
+    def __init__(self, list_of_technical_indicators: List[Union[TechnicalIndicator, CompoundTechnicalIndicator]]):
+        self._nodes = []  # leaf indicators, or (operator_callback, operand index, operand index) tuples
+        self._node_indices = {}
+        self._outputs = []
+        for indicator in list_of_technical_indicators:
+            if indicator.technical_indicator_name is None:
+                warnings.warn("You must explicitly specify a unique name for the technical indicator "
+                              "(property technical_indicator_name)", NoUniqueNameforCompoundTechnicalIndicatorWarning)
+            _, index = self._add_node(indicator)
+            self._outputs.append((str(indicator), index))
+        self._results = [None] * len(self._nodes)
+        self._lags = max([indicator.lags for indicator in list_of_technical_indicators])
+
+    def _add_node(self, indicator) -> Tuple[Hashable, int]:
+        if isinstance(indicator, CompoundTechnicalIndicator):
+            key_1, index_1 = self._add_node(indicator.technical_indicator_1)
+            key_2, index_2 = self._add_node(indicator.technical_indicator_2)
+            key = (indicator.operator_callback, key_1, key_2)
+            node = (indicator.operator_callback, index_1, index_2)
+        else:
+            key = (type(indicator), indicator.feature_getter_callback, indicator.lags)
+            node = indicator
+        if key not in self._node_indices:
+            self._node_indices[key] = len(self._nodes)
+            self._nodes.append(node if isinstance(node, tuple) else copy.deepcopy(node))
+        return key, self._node_indices[key]
+
+    @property
+    def lags(self) -> int:
+        return self._lags
+
+    @property
+    def number_of_nodes(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def technical_indicator_names(self) -> List[str]:
+        return [name for name, _ in self._outputs]
+
+    @property
+    def results(self) -> List:
+        return [self._results[index] for _, index in self._outputs]
+
+    @property
+    def state(self) -> Tuple[List, List]:
+        """Copy of everything update() depends on, see restore_state()."""
+        return copy.deepcopy((self._nodes, self._results))
+
+    def restore_state(self, state: Tuple[List, List]):
+        self._nodes, self._results = copy.deepcopy(state)
+
+    def write_results(self, out: np.ndarray):
+        """Write the result of every indicator into out, with nan for indicators that are not ready yet."""
+        for position, (_, index) in enumerate(self._outputs):
+            result = self._results[index]
+            out[position] = np.nan if result is None else result
+
+    def update(self, candle: Candle):
+        results = self._results
+        for index, node in enumerate(self._nodes):
+            if isinstance(node, tuple):
+                operator_callback, index_1, index_2 = node
+                if results[index_1] is None or results[index_2] is None:
+                    results[index] = None
+                else:
+                    results[index] = operator_callback(results[index_1], results[index_2])
+            else:
+                node.update(candle)
+                results[index] = node.result
+
+    def compute_series(self, columns: Columns, advance_state: bool = False) -> Dict[str, np.ndarray]:
+        """Vectorized counterpart of update(), see TechnicalIndicator.compute_series."""
+        series = []
+        for index, node in enumerate(self._nodes):
+            if isinstance(node, tuple):
+                operator_callback, index_1, index_2 = node
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    series.append(operator_callback(series[index_1], series[index_2]))
+                if advance_state and len(series[index]) > 0:
+                    if self._results[index_1] is None or self._results[index_2] is None:
+                        self._results[index] = None
+                    else:
+                        self._results[index] = operator_callback(self._results[index_1], self._results[index_2])
+            else:
+                series.append(node.compute_series(columns, advance_state=advance_state))
+                if advance_state and len(series[index]) > 0:
+                    self._results[index] = node.result
+        return OrderedDict((name, series[index]) for name, index in self._outputs)
@@ -1,17 +1,50 @@
+import math
 import operator
 import os
 from abc import ABC, abstractmethod
-from queue import Queue
-from typing import Callable
+from typing import Callable, Dict, Union
 
 import numpy as np
 
 from src import definitions
+from src.containers.candle_array import CandleArray
 from src.containers.stock_data import load_from_disk
 from src.containers.candle import Candle
+from src.externals.rolling_statistics.python.ring_buffer import RingBuffer
 from src.externals.rolling_statistics.python.rolling_stats import RollingMean
 
 
+# columns of a CandleArray holding the same values as the feature getters return for each candle
+FEATURE_COLUMNS = {
+    Candle.get_close_price: "close_price",
+    Candle.get_open_price: "open_price",
+    Candle.get_volume: "volume",
+    Candle.get_number_of_trades: "number_of_trades",
+}
+
+Columns = Union[CandleArray, Dict[str, np.ndarray]]
+
+
+def _get_feature_series(feature_getter_callback: Callable, columns: Columns) -> np.ndarray:
+    column_name = FEATURE_COLUMNS.get(feature_getter_callback)
+    if isinstance(columns, CandleArray):
+        if column_name is None:
+            return np.array([feature_getter_callback(candle) for candle in columns], dtype=np.float64)
+        return np.ascontiguousarray(columns.column(column_name), dtype=np.float64)
+    if column_name is None:
+        raise KeyError("No column for feature {}; pass a CandleArray instead".format(
+            feature_getter_callback.__name__))
+    return np.ascontiguousarray(columns[column_name], dtype=np.float64)
+
+
+def _convert_to_series_value(result) -> float:
+    return np.nan if result is None else result
+
+
+class NoUniqueNameforCompoundTechnicalIndicatorWarning(UserWarning):
+    pass
+
+
 class OperatorOverloadsMixin:
     def __sub__(self, other):
         return CompoundTechnicalIndicator(self, other, operator.sub)
@@ -27,7 +60,7 @@ class TechnicalIndicator(ABC, OperatorOverloadsMixin):
     @abstractmethod
     def __init__(self, feature_getter_callback: Callable, lags: int):
         self._lags = lags
-        self._candles = Queue(lags)
+        self._candles = RingBuffer(lags)
         self._compute_callback = Callable
         self._feature_getter_callback = feature_getter_callback
         self._result = float
@@ -47,6 +80,10 @@ class TechnicalIndicator(ABC, OperatorOverloadsMixin):
     def lags(self):
         return self._lags
 
+    @property
+    def feature_getter_callback(self) -> Callable:
+        return self._feature_getter_callback
+
     @property
     def result(self):
         return self._result
@@ -59,6 +96,25 @@ class TechnicalIndicator(ABC, OperatorOverloadsMixin):
     def _compute(self):
         raise NotImplementedError
 
+    def compute_series(self, columns: Columns, advance_state: bool = False) -> np.ndarray:
+        """Return the result after each candle, as update() would produce on a fresh indicator (nan for None).
+
+        If advance_state is True, the indicator is left in the state it would be in after updating on the candles.
+        Subclasses override this with a vectorized computation; this fallback streams the candles through a
+        fresh copy of the indicator.
+        """
+        if not isinstance(columns, CandleArray):
+            raise TypeError("Computing the series of {} requires a CandleArray".format(type(self).__name__))
+        indicator = type(self)(self._feature_getter_callback, self._lags)
+        series = np.empty(len(columns))
+        for i, candle in enumerate(columns):
+            indicator.update(candle)
+            series[i] = _convert_to_series_value(indicator.result)
+        if advance_state:
+            indicator.technical_indicator_name = self.technical_indicator_name
+            self.__dict__.update(indicator.__dict__)
+        return series
+
     def __str__(self):
         return self.technical_indicator_name
 
@@ -75,6 +131,18 @@ class CompoundTechnicalIndicator(OperatorOverloadsMixin):
                           self._technical_indicator_2.lags])
         self._technical_indicator_name = None
 
+    @property
+    def technical_indicator_1(self):
+        return self._technical_indicator_1
+
+    @property
+    def technical_indicator_2(self):
+        return self._technical_indicator_2
+
+    @property
+    def operator_callback(self) -> Callable:
+        return self._operator_callback
+
     @property
     def technical_indicator_name(self):
         return self._technical_indicator_name
@@ -101,6 +169,19 @@ class CompoundTechnicalIndicator(OperatorOverloadsMixin):
             self._result = self._operator_callback(self._technical_indicator_1.result,
                                                    self._technical_indicator_2.result)
 
+    def compute_series(self, columns: Columns, advance_state: bool = False) -> np.ndarray:
+        series_1 = self._technical_indicator_1.compute_series(columns, advance_state)
+        series_2 = self._technical_indicator_2.compute_series(columns, advance_state)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            series = self._operator_callback(series_1, series_2)
+        if advance_state and len(series) > 0:
+            if self._technical_indicator_1.result is None or self._technical_indicator_2.result is None:
+                self._result = None
+            else:
+                self._result = self._operator_callback(self._technical_indicator_1.result,
+                                                       self._technical_indicator_2.result)
+        return series
+
     def set_technical_indicator_name(self, technical_indicator_name: str):
         self._technical_indicator_name = technical_indicator_name
 
@@ -125,6 +206,12 @@ class MovingAverageTechnicalIndicator(TechnicalIndicator):
     def _compute(self):
         raise NotImplementedError
 
+    def compute_series(self, columns: Columns, advance_state: bool = False) -> np.ndarray:
+        samples = _get_feature_series(self._feature_getter_callback, columns)
+        if advance_state:
+            return self._compute_callback.compute_series(samples, advance_state=True)
+        return RollingMean(self._lags).compute_series(samples)
+
 
 def _normalized_autocorrelation(arr: np.ndarray) -> np.ndarray:
     autocorr = np.correlate(arr, arr, 'full')
@@ -136,25 +223,90 @@ def _area_of_normalized_autocorrelation(arr: np.ndarray) -> float:
     return np.sum(_normalized_autocorrelation(arr))
 
 
+def _area_of_normalized_autocorrelation_from_sums(window_sum: float, window_sum_of_squares: float) -> float:
+    # The autocorrelation summed over all lags (negative and positive) equals window_sum ** 2 and is symmetric
+    # around lag 0, where it equals window_sum_of_squares. Hence the area over the positive lags, normalized by
+    # the value at lag 0, is (window_sum ** 2 + window_sum_of_squares) / (2 * window_sum_of_squares).
+    if window_sum_of_squares == 0:
+        return np.nan
+    return (window_sum * window_sum + window_sum_of_squares) / (2 * window_sum_of_squares)
+
+
 class AutoCorrelationTechnicalIndicator(TechnicalIndicator):
     def __init__(self, feature_getter_callback: Callable, lags: int):
         super(AutoCorrelationTechnicalIndicator, self).__init__(feature_getter_callback, lags)
-        self._compute_callback = _area_of_normalized_autocorrelation
+        self._compute_callback = _area_of_normalized_autocorrelation_from_sums
         self._feature_getter_callback = feature_getter_callback
         self._result = None
+        self._window_sum = 0.0
+        self._window_sum_of_squares = 0.0
+        self._number_of_samples = 0
 
     @property
     def result(self):
         return self._result
 
     def update(self, candle: Candle):
-        self._candles.put(self._feature_getter_callback(candle), block=False)
+        sample = float(self._feature_getter_callback(candle))
+        oldest_sample = self._candles.append(sample)
+        if oldest_sample is not None:
+            self._window_sum -= oldest_sample
+            self._window_sum_of_squares -= oldest_sample * oldest_sample
+        self._window_sum += sample
+        self._window_sum_of_squares += sample * sample
+        self._number_of_samples += 1
+        if self._number_of_samples % self._lags == 0:
+            # re-anchor the running sums once per window, so that rounding errors do not accumulate
+            window = self._candles.view
+            self._window_sum = math.fsum(window)
+            self._window_sum_of_squares = math.fsum(window * window)
         if self._candles.full():
             self._compute()
-            self._candles.get(block=False)
 
     def _compute(self):
-        self._result = self._compute_callback(np.array(list(self._candles.queue)))
+        self._result = self._compute_callback(self._window_sum, self._window_sum_of_squares)
+
+    def compute_series(self, columns: Columns, advance_state: bool = False) -> np.ndarray:
+        samples = _get_feature_series(self._feature_getter_callback, columns)
+        number_of_samples = len(samples)
+        lags = self._lags
+        window_sums = np.full(number_of_samples, np.nan)
+        window_sums_of_squares = np.full(number_of_samples, np.nan)
+        number_of_windows = number_of_samples // lags
+        if number_of_windows > 0:
+            # the running sums are re-anchored with math.fsum whenever a whole number of windows has been seen ...
+            anchors = np.arange(1, number_of_windows + 1) * lags - 1
+            windows = samples[:number_of_windows * lags].reshape(number_of_windows, lags)
+            window_sums[anchors] = [math.fsum(window) for window in windows]
+            window_sums_of_squares[anchors] = [math.fsum(window * window) for window in windows]
+        if number_of_windows > 0 and lags > 1:
+            # ... and in between subtract the evicted sample and add the new one, in the same order as update()
+            indices = anchors[:, None] + np.arange(1, lags)[None, :]
+            is_valid = indices < number_of_samples
+            new_samples = samples[np.minimum(indices, number_of_samples - 1)]
+            old_samples = samples[np.minimum(indices, number_of_samples - 1) - lags]
+            for sums, new_terms, old_terms in [(window_sums, new_samples, old_samples),
+                                               (window_sums_of_squares, new_samples * new_samples,
+                                                old_samples * old_samples)]:
+                steps = np.empty((number_of_windows, 2 * lags - 1))
+                steps[:, 0] = sums[anchors]
+                steps[:, 1::2] = -old_terms
+                steps[:, 2::2] = new_terms
+                sums[indices[is_valid]] = np.add.accumulate(steps, axis=1)[:, 2::2][is_valid]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            series = np.where(window_sums_of_squares == 0, np.nan,
+                              (window_sums * window_sums + window_sums_of_squares) / (2 * window_sums_of_squares))
+        if advance_state and number_of_samples > 0:
+            self._candles.reset(samples)
+            self._number_of_samples = number_of_samples
+            if number_of_samples >= lags:
+                self._window_sum = float(window_sums[-1])
+                self._window_sum_of_squares = float(window_sums_of_squares[-1])
+                self._result = float(series[-1])
+            else:
+                self._window_sum = float(np.add.accumulate(samples)[-1])
+                self._window_sum_of_squares = float(np.add.accumulate(samples * samples)[-1])
+        return series
 
 
 class PriceTechnicalIndicator(TechnicalIndicator):
@@ -169,13 +321,22 @@ class PriceTechnicalIndicator(TechnicalIndicator):
         return self._result
 
     def update(self, candle: Candle):
-        self._candles.put(self._feature_getter_callback(candle), block=False)
+        self._candles.append(self._feature_getter_callback(candle))
         if self._candles.full():
             self._compute()
-            self._candles.get(block=False)
 
     def _compute(self):
-        self._result = self._compute_callback(np.array(list(self._candles.queue)))
+        self._result = self._compute_callback(self._candles.view)
+
+    def compute_series(self, columns: Columns, advance_state: bool = False) -> np.ndarray:
+        samples = _get_feature_series(self._feature_getter_callback, columns)
+        series = samples.copy()
+        series[:self._lags - 1] = np.nan
+        if advance_state and len(samples) > 0:
+            self._candles.reset(samples)
+            if len(samples) >= self._lags:
+                self._result = samples[-1]
+        return series
 
 
 def PPOTechnicalIndicator(feature_getter_callback: Callable, slow_ma_lag: int, fast_ma_lag: int):
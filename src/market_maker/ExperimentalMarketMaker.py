@@ -2,16 +2,19 @@ import logging as logger
 from typing import Union, Optional, List
 
 from src.containers.signal import SignalBuy, SignalSell, SignalHold
-from src.containers.order import Order, Side, OrderID
+from src.containers.order import Order, Side, OrderID, OrderState
 from src.containers.trading import BinanceTrading
 from src.market_maker.actions import _act_if_sell_signal_and_open_bid_order, _act_if_buy_signal_and_open_ask_order, \
     _act_if_buy_signal_and_filled_bid_order, _act_if_sell_signal_and_filled_ask_order, \
     _act_if_buy_signal_and_filled_ask_order, _act_if_sell_signal_and_filled_bid_order, \
     _noop_act_if_sell_signal_and_open_ask_order, _noop_act_if_buy_signal_and_open_bid_order, \
     _act_if_buy_signal_and_open_bid_order, _act_if_sell_signal_and_open_ask_order
+from src.market_maker.config import MAX_CLOSED_ORDERS
+from src.market_maker.exchange_snapshot import ExchangeSnapshot
 from src.market_maker.mock_trading import MockTrading
 from src.market_maker.mock_trading_helpers import print_context
-from src.market_maker.utils import MarketMakerError, _init_signal, get_last_filled_order
+from src.market_maker.order_store import OrderStore
+from src.market_maker.utils import MarketMakerError, _init_signal
 from src.type_aliases import BinanceClient
 from src.containers.trading_pair import TradingPair
 
@@ -20,17 +23,19 @@ class ExperimentalMarketMaker:
     def __init__(self,
                  trader: Union[BinanceTrading, MockTrading],
                  trading_pair: TradingPair,
-                 quantity: float
+                 quantity: float,
+                 max_closed_orders: Optional[int] = MAX_CLOSED_ORDERS,
                  ):
         self._trader = trader
         self._trading_pair = trading_pair
         self._quantity = quantity
         self._open_orders = []
-        self._filled_orders = []
+        self._filled_orders = OrderStore(max_closed_orders=max_closed_orders)
         self._current_signal = None
         self._previous_signal = _init_signal()
-        self._last_filled_order = get_last_filled_order(trading_pair=self._trading_pair, trader=self._trader)
-        self._last_placed_order = self._trader.get_last_n_orders(trading_pair=self._trading_pair, n=1)[0]
+        self._snapshot = ExchangeSnapshot(trader=self._trader, trading_pair=self._trading_pair)
+        self._last_filled_order = self._snapshot.last_filled_order
+        self._last_placed_order = self._snapshot.last_placed_order
 
     @property
     def trader(self) -> Union[BinanceTrading, MockTrading]:
@@ -38,7 +43,7 @@ class ExperimentalMarketMaker:
 
     @property
     def filled_orders(self) -> List[Order]:
-        return self._filled_orders
+        return self._filled_orders.orders(OrderState.filled)
 
     @print_context
     def insert_signal(self, signal: Union[SignalBuy, SignalSell, SignalHold]):
@@ -54,25 +59,24 @@ class ExperimentalMarketMaker:
 
     @print_context
     def _check_for_open_orders(self) -> Optional[Order]:
-        self._open_orders = self._trader.get_open_orders()
+        self._open_orders = self._snapshot.open_orders
         self._perform_order_limit_check()
         if len(self._open_orders) == 1:
             return self._open_orders[0]
 
     @print_context
     def _is_order_filled(self, order_id: OrderID) -> bool:
-        if self._trader.get_open_orders(order_id=order_id):
-            return False
-        else:
-            return True
+        return not self._snapshot.is_open(order_id)
 
     def _update_orders_status(self):
         self._open_order = self._check_for_open_orders()
-        self._last_filled_order = get_last_filled_order(self._trading_pair, self._trader)
-        self._last_placed_order = self._trader.get_last_n_orders(trading_pair=self._trading_pair, n=1)[0]
+        self._last_filled_order = self._snapshot.last_filled_order
+        self._last_placed_order = self._snapshot.last_placed_order
 
     @print_context
     def _update(self) -> Optional[Order]:
+        # the exchange is queried once per signal, and the decisions below all read the same snapshot
+        self._snapshot.invalidate()
         self._update_orders_status()
 
         logger.info("Previous signal was {}...".format(type(self._previous_signal).__name__))
@@ -99,10 +103,8 @@ class ExperimentalMarketMaker:
 
         else:
 
-            self._last_filled_order = get_last_filled_order(trading_pair=self._trading_pair, trader=self._trader)
-
-            if self._last_filled_order not in self._filled_orders:
-                self._filled_orders.append(self._last_filled_order)
+            if self._last_filled_order.id not in self._filled_orders:
+                self._filled_orders.add(self._last_filled_order)
 
             if isinstance(self._current_signal, SignalBuy):
                 if self._last_filled_order.side is Side.bid:
@@ -112,7 +114,8 @@ class ExperimentalMarketMaker:
                         order_id=self._last_placed_order.id):
                     last_placed_order = _act_if_buy_signal_and_filled_ask_order(trader=self._trader,
                                                                                 signal=self._current_signal,
-                                                                                order=self._last_filled_order)
+                                                                                order=self._last_filled_order,
+                                                                                open_orders=self._open_orders)
                     if last_placed_order:
                         self._last_placed_order = last_placed_order
             elif isinstance(self._current_signal, SignalSell):
@@ -120,14 +123,15 @@ class ExperimentalMarketMaker:
                         order_id=self._last_placed_order.id):
                     last_placed_order = _act_if_sell_signal_and_filled_bid_order(trader=self._trader,
                                                                                  signal=self._current_signal,
-                                                                                 order=self._last_filled_order)
+                                                                                 order=self._last_filled_order,
+                                                                                 open_orders=self._open_orders)
                     if last_placed_order:
                         self._last_placed_order = last_placed_order
                 elif self._last_filled_order.side is Side.ask:
                     _ = _act_if_sell_signal_and_filled_ask_order(trader=self._trader, signal=self._current_signal,
                                                                  order=self._last_filled_order)
-        for _ in range(0, 2):
-            self._update_orders_status()
+        # orders may have been placed, modified or cancelled
+        self._snapshot.invalidate()
 
         return self._last_filled_order
 
@@ -1,6 +1,6 @@
 import logging as logger
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from src.containers.order import Order, Price, OrderType, Side, Size
 from src.containers.order_book import Ask, Bid
@@ -22,7 +22,7 @@ def _act_if_buy_signal_and_open_bid_order(trader: BinanceTrading, signal: Signal
         else:
             success = trader.modify_order(order, price=signal.price_point.value, size=order.size)
         if success:
-            order = trader.get_open_orders(order_id="{}".format(order.id))  # TODO: return new order (using order id)
+            # modify_order updates the price and size of `order`, so it need not be fetched again
             return order
     except BinanceError as error:
         logger.debug(error)
@@ -79,9 +79,11 @@ def _act_if_sell_signal_and_filled_ask_order(trader: BinanceTrading, signal: Sig
 
 
 # @print_function_context
-def _act_if_buy_signal_and_filled_ask_order(trader: BinanceTrading, signal: SignalBuy, order: Order) -> Optional[
-    Order]:
-    if trader.get_open_orders():
+def _act_if_buy_signal_and_filled_ask_order(trader: BinanceTrading, signal: SignalBuy, order: Order,
+                                            open_orders: Optional[List[Order]] = None) -> Optional[Order]:
+    if open_orders is None:
+        open_orders = trader.get_open_orders()
+    if open_orders:
         return None
     logger.info("Current signal is SignalBuy and last filled order is OrderSell...Placing OrderBuy...")
     try:
@@ -100,9 +102,11 @@ def _act_if_buy_signal_and_filled_ask_order(trader: BinanceTrading, signal: Sign
 
 
 # @print_function_context
-def _act_if_sell_signal_and_filled_bid_order(trader: BinanceTrading, signal: SignalSell, order: Order) -> Optional[
-    Order]:
-    if trader.get_open_orders():
+def _act_if_sell_signal_and_filled_bid_order(trader: BinanceTrading, signal: SignalSell, order: Order,
+                                             open_orders: Optional[List[Order]] = None) -> Optional[Order]:
+    if open_orders is None:
+        open_orders = trader.get_open_orders()
+    if open_orders:
         return None
     logger.info("Current signal is SignalSell and last filled order is OrderBuy...Placing OrderSell...")
     try:
@@ -125,12 +129,10 @@ def _act_if_sell_signal_and_filled_bid_order(trader: BinanceTrading, signal: Sig
 def get_optimal_bid_price_from_orderbook(trader: BinanceTrading, signal: SignalBuy,
                                          previously_filled_ask_order: Order) -> Ask:
     orderbook = trader.get_orderbook(trading_pair=previously_filled_ask_order.trading_pair_id)
-    return min([ask for ask in orderbook.asks if ask.size >= previously_filled_ask_order.size],
-               key=lambda x: x.price)
+    return orderbook.first_level_with_size(Side.ask, previously_filled_ask_order.size)
 
 
 def get_optimal_ask_price_from_orderbook(trader: BinanceTrading, signal: SignalSell,
                                          previously_filled_bid_order: Order) -> Bid:
     orderbook = trader.get_orderbook(trading_pair=previously_filled_bid_order.trading_pair_id)
-    return max([bid for bid in orderbook.bids if bid.size >= previously_filled_bid_order.size],
-               key=lambda x: x.price)
+    return orderbook.first_level_with_size(Side.bid, previously_filled_bid_order.size)
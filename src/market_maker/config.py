@@ -1 +1,3 @@
-PRINT_TO_SDTOUT=False
\ No newline at end of file
+PRINT_TO_SDTOUT=False
+MAX_CLOSED_ORDERS = 1000  # filled or cancelled orders kept by MockTrading and ExperimentalMarketMaker
+NUMBER_OF_RECENT_ORDERS = 10  # orders fetched by the market maker on every tick
@@ -0,0 +1,80 @@
+from typing import List, Optional, Union
+
+from src.containers.order import Order, OrderID, OrderState
+from src.containers.trading import BinanceTrading
+from src.containers.trading_pair import TradingPair
+from src.market_maker.config import NUMBER_OF_RECENT_ORDERS
+from src.market_maker.mock_trading import MockTrading
+from src.market_maker.utils import get_last_filled_order
+
+
+class ExchangeSnapshot(object):
+    """Open orders and most recent orders of a trading pair, as last fetched from the exchange.
+
+    A snapshot takes two requests, one for the open orders and one for the last `number_of_recent_orders`
+    orders, from which the last placed and the last filled order are read; only if none of these is filled is
+    the order history paged through (see get_last_filled_order). It is fetched when first read after
+    `invalidate`, which should be called whenever orders are placed, modified or cancelled.
+    """
+
+    def __init__(self,
+                 trader: Union[BinanceTrading, MockTrading],
+                 trading_pair: TradingPair,
+                 number_of_recent_orders: int = NUMBER_OF_RECENT_ORDERS):
+        self._trader = trader
+        self._trading_pair = trading_pair
+        self._number_of_recent_orders = number_of_recent_orders
+        self._open_orders = None
+        self._recent_orders = None
+        self._last_filled_order = None
+        self._is_stale = True
+
+    @property
+    def is_stale(self) -> bool:
+        return self._is_stale
+
+    @property
+    def open_orders(self) -> List[Order]:
+        self._refresh_if_stale()
+        return self._open_orders
+
+    @property
+    def recent_orders(self) -> List[Order]:
+        """The last orders placed, newest first."""
+        self._refresh_if_stale()
+        return self._recent_orders
+
+    @property
+    def last_placed_order(self) -> Order:
+        return self.recent_orders[0]
+
+    @property
+    def last_filled_order(self) -> Order:
+        self._refresh_if_stale()
+        if self._last_filled_order is None:
+            self._last_filled_order = get_last_filled_order(self._trading_pair, self._trader)
+        return self._last_filled_order
+
+    def is_open(self, order_id: OrderID) -> bool:
+        return any(order.id == order_id for order in self.open_orders)
+
+    def invalidate(self):
+        self._is_stale = True
+
+    def refresh(self):
+        self._open_orders = self._trader.get_open_orders() or []
+        self._recent_orders = self._trader.get_last_n_orders(trading_pair=self._trading_pair,
+                                                             n=self._number_of_recent_orders)
+        self._last_filled_order = self._find_last_filled_order(self._recent_orders)
+        self._is_stale = False
+
+    def _refresh_if_stale(self):
+        if self._is_stale:
+            self.refresh()
+
+    @staticmethod
+    def _find_last_filled_order(orders: List[Order]) -> Optional[Order]:
+        for order in orders:
+            if order.state is OrderState.filled:
+                return order
+        return None
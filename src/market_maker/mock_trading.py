@@ -5,15 +5,15 @@ from typing import Optional, List
 
 import wrapt
 
-from src.containers.order import Order, OrderID, Price, Size
+from src.containers.order import Order, OrderID, OrderState, Price, Size
 from src.containers.time import MilliSeconds
 from src.containers.trading import Trading, Trade
 from src.containers.trading_pair import TradingPair
 from src.helpers import generate_hash
-from src.market_maker.config import PRINT_TO_SDTOUT
+from src.market_maker.config import PRINT_TO_SDTOUT, MAX_CLOSED_ORDERS
 from src.market_maker.mock_client import MockClient
-from src.market_maker.mock_trading_helpers import print_context, print_contents_of_order_lists, _find_order_by_id, \
-    _find_latest_order, _find_oldest_order
+from src.market_maker.mock_trading_helpers import print_context, print_contents_of_order_lists
+from src.market_maker.order_store import OrderStore
 
 starting_order = {
     "id": "8850805e-d783-46ec-9af5-30712035e760",
@@ -39,41 +39,44 @@ def randomly_fill_orders(wrapped_func, instance, args, kwargs):
 
 
 class MockTrading(Trading):
-    def __init__(self, client: MockClient):
+    def __init__(self, client: MockClient, max_closed_orders: Optional[int] = MAX_CLOSED_ORDERS):
         super().__init__(client=client)
-        self._filled_orders = []
+        self._order_store = OrderStore(max_closed_orders=max_closed_orders)
+        self._number_of_placed_orders = 0
         self._initialize_filled_orders()
-        self._open_orders = []
-        self._last_filled_order = None
 
     @property
-    def filled_orders(self):
-        return self._filled_orders
+    def filled_orders(self) -> List[Order]:
+        return self._order_store.orders(OrderState.filled)
+
+    @property
+    def open_orders(self) -> List[Order]:
+        return self._order_store.orders(OrderState.open)
 
     def _fill_orders(self):
-        if len(self._open_orders) > 0:
-            oldest_order = _find_oldest_order(self._open_orders)
-            if oldest_order in self._open_orders:
-                self._open_orders.remove(oldest_order)
-                now = round(datetime.now().timestamp() * 1000)
-                oldest_order.completed_at = MilliSeconds(now)
-                oldest_order.timestamp = MilliSeconds(now)
-                oldest_order.filled = oldest_order.size
-            self._filled_orders += [oldest_order]
+        oldest_order = self._order_store.oldest(OrderState.open)
+        if oldest_order is not None:
+            now = MilliSeconds(round(datetime.now().timestamp() * 1000))
+            oldest_order.completed_at = now
+            oldest_order.filled = oldest_order.size
+            self._order_store.update(oldest_order.id, state=OrderState.filled, timestamp=now)
 
     def _initialize_filled_orders(self):
         order = Order.from_cobinhood_response(starting_order)
         order.completed_at = MilliSeconds(round(datetime.now().timestamp() * 1000))
-        self._filled_orders = [order]
+        self._order_store.add(order)
 
     @print_contents_of_order_lists
     @randomly_fill_orders
     @print_context
     def place_order(self, order: Order, ) -> Order:
-        order.id = generate_hash(order.timestamp, order.size, order.price, order.side)
+        # orders placed in the same millisecond at the same price would get the same id without the counter
+        self._number_of_placed_orders += 1
+        order.id = generate_hash(order.timestamp, order.size, order.price, order.side, self._number_of_placed_orders)
         if PRINT_TO_SDTOUT:
             print("Place order {}".format(order))
-        self._open_orders += [order]
+        order.state = OrderState.open
+        self._order_store.add(order)
         return order
 
     @print_contents_of_order_lists
@@ -83,14 +86,14 @@ class MockTrading(Trading):
         if PRINT_TO_SDTOUT:
             print("new price: {}".format(price))
         order_id = order.id
-        order = _find_order_by_id(self._open_orders, order_id)
+        order = self._get_open_order(order_id)
         if order is not None and PRINT_TO_SDTOUT:
             print("old price: {}".format(order.price))
         original_order = copy(order)
         if original_order is not None:
             order.price = price
             order.size = size
-            order.timestamp = MilliSeconds(round(datetime.now().timestamp() * 1000))
+            self._order_store.update(order_id, timestamp=MilliSeconds(round(datetime.now().timestamp() * 1000)))
             if PRINT_TO_SDTOUT:
                 print("Modify order {} \n to \n {}".format(original_order, order))
         else:
@@ -101,9 +104,15 @@ class MockTrading(Trading):
     @print_contents_of_order_lists
     @randomly_fill_orders
     def get_open_orders(self, order_id: Optional[OrderID] = None) -> List[Optional[Order]]:
-        # print("Current open orders: \n")
-        # _print_list(self._open_orders)
-        return self._open_orders
+        if order_id is None:
+            return self.open_orders
+        order = self._get_open_order(order_id)
+        return [] if order is None else [order]
+
+    def _get_open_order(self, order_id: OrderID) -> Optional[Order]:
+        order = self._order_store.get(order_id)
+        if order is not None and order.state is OrderState.open:
+            return order
 
     @print_contents_of_order_lists
     @randomly_fill_orders
@@ -111,16 +120,14 @@ class MockTrading(Trading):
     def cancel_order(self, order_id: OrderID) -> bool:
         if PRINT_TO_SDTOUT:
             print("Cancelling order with order id {} \n".format(order_id))
-        order = _find_order_by_id(self._open_orders, order_id)
-        if order in self._open_orders:
-            self._open_orders.remove(order)
-
+        order = self._get_open_order(order_id)
         if order is not None:
+            self._order_store.update(order_id, state=OrderState.cancelled)
             if PRINT_TO_SDTOUT:
                 print("Cancel order {} \n".format(order.id))
         else:
-            order = _find_order_by_id(self._filled_orders, order_id)
-            if order is not None:
+            order = self._order_store.get(order_id)
+            if order is not None and order.state is OrderState.filled:
                 if PRINT_TO_SDTOUT:
                     print("Order {} was already filled, so could not cancel.".format(order.id))
         return True
@@ -128,16 +135,18 @@ class MockTrading(Trading):
     @print_contents_of_order_lists
     @randomly_fill_orders
     def get_last_filled_order(self, trading_pair: TradingPair) -> Order:
-        order = _find_latest_order(self._filled_orders)
-        # print("Last filled order: {} \n".format(order))
-        return order
+        return self._order_store.latest(OrderState.filled)
+
+    @print_contents_of_order_lists
+    @randomly_fill_orders
+    def get_last_n_orders(self, trading_pair: TradingPair, n: int) -> List[Order]:
+        """The last n orders placed, newest first."""
+        return self._order_store.last_n(n)
 
     @print_contents_of_order_lists
     @randomly_fill_orders
     def get_order_history(self, trading_pair: TradingPair) -> List[Order]:
-        # print("Order history: \n")
-        # _print_list(self._filled_orders)
-        return self._filled_orders
+        return self.filled_orders
 
     def get_orders_trades(self, order_id: OrderID):
         raise NotImplementedError
@@ -0,0 +1,122 @@
+import heapq
+from itertools import islice
+from typing import List, Optional
+
+from src.containers.order import CLOSED_ORDER_STATES, Order, OrderID, OrderState
+from src.containers.time import MilliSeconds
+
+
+class OrderStore(object):
+    """Orders indexed by id, by state and by timestamp.
+
+    Lookups by id are O(1), the orders in a state are kept in the order they entered it, and the oldest and
+    latest order of a state come from a min and a max heap of (timestamp, version) per state, O(log n).
+    Heap entries are not removed when an order changes state or timestamp; they are dropped when they
+    surface with an outdated version, or when the heap has grown to twice the number of orders in its state.
+    Beyond `max_closed_orders` filled, cancelled or rejected orders, the oldest of them (by timestamp) are
+    evicted.
+    """
+
+    def __init__(self, max_closed_orders: Optional[int] = None):
+        self._max_closed_orders = max_closed_orders
+        self._orders = {}  # in order of insertion
+        self._versions = {}
+        self._version = 0
+        self._states = {}
+        self._orders_by_state = {}
+        self._oldest = {}
+        self._latest = {}
+        self._number_of_closed_orders = 0
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, order_id: OrderID) -> bool:
+        return order_id in self._orders
+
+    def get(self, order_id: OrderID) -> Optional[Order]:
+        return self._orders.get(order_id)
+
+    def count(self, state: OrderState) -> int:
+        return len(self._orders_by_state.get(state, ()))
+
+    def orders(self, state: OrderState) -> List[Order]:
+        """Orders in `state`, in the order they entered it."""
+        return [self._orders[order_id] for order_id in self._orders_by_state.get(state, ())]
+
+    def last_n(self, n: int) -> List[Order]:
+        """The last n orders added, newest first."""
+        return [self._orders[order_id] for order_id in islice(reversed(self._orders), n)]
+
+    def oldest(self, state: OrderState) -> Optional[Order]:
+        return self._peek(self._oldest.get(state), state)
+
+    def latest(self, state: OrderState) -> Optional[Order]:
+        return self._peek(self._latest.get(state), state)
+
+    def add(self, order: Order):
+        if order.id in self._orders:
+            raise KeyError("Order {} is already in the store".format(order.id))
+        self._orders[order.id] = order
+        self._index(order)
+
+    def update(self, order_id: OrderID, state: Optional[OrderState] = None,
+               timestamp: Optional[MilliSeconds] = None) -> Order:
+        """Change the state and/or the timestamp of a stored order."""
+        order = self._orders[order_id]
+        self._unindex(order)
+        if state is not None:
+            order.state = state
+        if timestamp is not None:
+            order.timestamp = timestamp
+        self._index(order)
+        return order
+
+    def remove(self, order_id: OrderID) -> Order:
+        order = self._orders.pop(order_id)
+        self._unindex(order)
+        del self._versions[order_id]
+        return order
+
+    def _index(self, order: Order):
+        self._version += 1
+        self._versions[order.id] = self._version
+        self._states[order.id] = order.state
+        self._orders_by_state.setdefault(order.state, {})[order.id] = None
+        timestamp = order.timestamp.as_epoch_time()
+        heapq.heappush(self._oldest.setdefault(order.state, []), (timestamp, self._version, order.id))
+        heapq.heappush(self._latest.setdefault(order.state, []), (-timestamp, -self._version, order.id))
+        if order.state in CLOSED_ORDER_STATES:
+            self._number_of_closed_orders += 1
+            self._evict()
+        if max(len(self._oldest[order.state]), len(self._latest[order.state])) > 2 * self.count(order.state) + 16:
+            self._compact(order.state)
+
+    def _unindex(self, order: Order):
+        state = self._states.pop(order.id)
+        del self._orders_by_state[state][order.id]
+        if state in CLOSED_ORDER_STATES:
+            self._number_of_closed_orders -= 1
+
+    def _compact(self, state: OrderState):
+        # entries that never surface would otherwise pile up, e.g. those of the evicted orders in the max heap
+        for heap in (self._oldest[state], self._latest[state]):
+            heap[:] = [entry for entry in heap
+                       if self._versions.get(entry[2]) == abs(entry[1]) and self._states.get(entry[2]) is state]
+            heapq.heapify(heap)
+
+    def _peek(self, heap: Optional[List], state: OrderState) -> Optional[Order]:
+        while heap:
+            _, version, order_id = heap[0]
+            if self._versions.get(order_id) == abs(version) and self._states.get(order_id) is state:
+                return self._orders[order_id]
+            heapq.heappop(heap)
+        return None
+
+    def _evict(self):
+        if self._max_closed_orders is None:
+            return
+        while self._number_of_closed_orders > self._max_closed_orders:
+            oldest_orders = [order for order in (self.oldest(state) for state in CLOSED_ORDER_STATES)
+                             if order is not None]
+            self.remove(min(oldest_orders, key=lambda order: order.timestamp.as_epoch_time()).id)
@@ -25,9 +25,13 @@ def _init_signal() -> SignalBuy:
 
 @tenacity.retry(wait=tenacity.wait_fixed(1))
 def get_last_filled_order(trading_pair: TradingPair, trader: Union[BinanceTrading, MockTrading]):
-    last_order = trader.get_last_n_orders(trading_pair, 1)[0]
-    i = 1
-    while last_order.state is not OrderState.filled:
-        last_order = trader.get_last_n_orders(trading_pair, i)[-1]
-        i += 1
-    return last_order
\ No newline at end of file
+    # fetch twice as many orders every time, rather than one more, so that this takes O(log n) requests
+    n = 1
+    while True:
+        last_orders = trader.get_last_n_orders(trading_pair, n)
+        for order in last_orders:
+            if order.state is OrderState.filled:
+                return order
+        if len(last_orders) < n:
+            raise MarketMakerError("There is no filled order in the order history.")
+        n *= 2
\ No newline at end of file
@@ -2,7 +2,12 @@ import logging
 import os
 from typing import Tuple
 
+from src.backtesting.backtest_engine import BacktestEngine
+from src.classification.trading_classifier import TradingClassifier
+from src.containers.portfolio import Portfolio
+from src.containers.stock_data import load_from_disk
 from src.definitions import DATA_DIR
+from src.helpers import get_capital_from_account
 from src.resource_manager import runner
 from src.type_aliases import Path
 from src.containers.trading_pair import TradingPair
@@ -34,6 +39,18 @@ def run_backtest(trading_pair: TradingPair, trade_amount: float, path_to_stock_d
     return path_to_portfolio, path_to_log
 
 
+def run_fast_backtest(trading_pair: TradingPair, trade_amount: float, path_to_stock_data: Path,
+                      path_to_portfolio: Path = os.path.join(DATA_DIR, "backtest_portfolio.dill"),
+                      path_to_classifier: Path = os.path.join(DATA_DIR, "classifier.dill")) -> Path:
+    "Same as run_backtest(), without the live loop and its logging."
+    portfolio = Portfolio(initial_capital=get_capital_from_account(trading_pair=trading_pair),
+                          trade_amount=trade_amount)
+    engine = BacktestEngine(TradingClassifier.load_from_disk(path_to_classifier), portfolio)
+    engine.run(load_from_disk(path_to_stock_data))
+    portfolio.save_to_disk(path_to_portfolio)
+    return path_to_portfolio
+
+
 if __name__ == '__main__':
     path_to_portfolio, path_to_log = run_backtest(TradingPair("NEO", "BTC"),
                                                   100,
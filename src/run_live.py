@@ -32,7 +32,7 @@ def run_live(trading_pair: TradingPair, trade_amount: float,
     logger.addFilter(LoggingFilter(logging.INFO))
 
     client = BinanceClient(api_key, api_secret)
-    trader = BinanceTrading(client)
+    trader = BinanceTrading(client, order_history_directory=DATA_DIR)
     market_maker = NoopMarketMaker(trader, trading_pair, trade_amount)
 
     with runner(trading_pair=trading_pair,
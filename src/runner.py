@@ -1,5 +1,4 @@
 import os
-import time
 from datetime import datetime, timedelta
 from typing import Union, Optional
 import simplejson as json
@@ -12,9 +11,11 @@ from src.containers.order import Order
 from src.containers.signal import SignalHold, SignalBuy, SignalSell
 from src.classification.trading_classifier import TradingClassifier
 from src.connection.load_stock_data import load_stock_data
-from src.connection.download_live_data import download_live_data
+from src.connection.download_live_data import download_last_closed_candle
+from src.connection.kline_stream import KlineStream
 from src.containers.candle import instantiate_1970_candle, Candle
 from src.containers.portfolio import Portfolio
+from src.containers.portfolio_journal import PortfolioJournal
 from src.containers.stock_data import StockData, load_from_disk
 from src.containers.time_windows import TimeWindow
 from src.containers.trade_helper import generate_trading_signal_from_prediction
@@ -24,7 +25,7 @@ from src.helpers import is_time_difference_larger_than_threshold, get_capital_fr
 from src.market_maker import ExperimentalMarketMaker
 from src.market_maker.market_maker import TestMarketMaker, MarketMaker, NoopMarketMaker
 from src.live_logic.parameters import LiveParameters
-from src.mixins.save_load_mixin import DillSaveLoadMixin
+from src.mixins.save_load_mixin import DillSaveLoadMixin, verify_if_extension
 from src.type_aliases import Path, BinanceClient
 from src.containers.trading_pair import TradingPair
 from src.logger import logger
@@ -111,6 +112,7 @@ class Runner(DillSaveLoadMixin):
             self._market_maker = market_maker
 
         self._websocket_client = websocket_client
+        self._kline_stream = None
 
     @property
     def portfolio(self):
@@ -123,12 +125,28 @@ class Runner(DillSaveLoadMixin):
         self._run_metadata.start_time = self._start_time
         if self._run_type == "live":
             self._run_metadata.save_to_disk(self._run_metadata, "run_metadata.dill")
+            if self._path_to_portfolio is not None:
+                self._start_portfolio_journal()
+
+    def _start_portfolio_journal(self):
+        # resume from the journal of an interrupted run, if there is one; a finished run starts over
+        journal = PortfolioJournal(verify_if_extension(self._path_to_portfolio, ".jsonl"))
+        if journal.exists() and not journal.is_finished():
+            self._portfolio = Portfolio.from_journal(journal)
+            logger.info("Restored portfolio from journal {}".format(journal.path_to_journal))
+        else:
+            self._portfolio.start_journal(journal)
 
     def shutdown(self):
         """Should be called by the resource manager class"""
         self._stop_time = datetime.now()
         self._run_metadata.stop_time = self._stop_time
         self._run_metadata.stop_candle = self._current_candle
+        if self._kline_stream is not None:
+            self._kline_stream.stop()
+            self._kline_stream = None
+        if self._portfolio.journal is not None:
+            self._portfolio.journal.finish()
         if self._run_type == "live":
             self._run_metadata.save_to_disk(self, "run_metadata.dill")
 
@@ -137,7 +155,10 @@ class Runner(DillSaveLoadMixin):
 
     def _download_candle(self) -> Candle:
         if self._run_type == "live":
-            return download_live_data(self._client, self._trading_pair, self._sampling_period, 30)
+            # wait for the first candle, then return at least every sleep_time so the market maker keeps polling
+            candle = self._kline_stream.next_candle(
+                timeout=None if self._current_candle is None else self._parameters.sleep_time)
+            return self._current_candle if candle is None else candle
         elif self._run_type == "mock":
             return self._mock_download_candle_for_current_iteration()
 
@@ -168,6 +189,11 @@ class Runner(DillSaveLoadMixin):
         logger.debug("Waiting threshold between decisions is {}".format(self._waiting_threshold))
         if self._run_type == "mock":
             self._mock_download_stock_data_for_all_iterations()
+        elif self._run_type == "live":
+            self._kline_stream = KlineStream(self._trading_pair, self._sampling_period,
+                rest_fallback=lambda: download_last_closed_candle(self._client, self._trading_pair,
+                    self._sampling_period))
+            self._kline_stream.start()
 
         while self._is_check_condition():
             try:
@@ -189,7 +215,8 @@ class Runner(DillSaveLoadMixin):
                 except ValueError:
                     prediction = None
 
-                logger.debug("Prediction is: {} on iteration {}".format(prediction, self._iteration_number))
+                logger.debug("Prediction is: {} on iteration {} (took {} s)".format(
+                    prediction, self._iteration_number, self._classifier.prediction_latency))
                 if prediction:
                     self._current_signal = generate_trading_signal_from_prediction(prediction[0],
                         self._current_candle)
@@ -206,21 +233,19 @@ class Runner(DillSaveLoadMixin):
                         except Exception as e:
                             logger.info("Websocket error: {}".format(e))
 
-                    if last_filled_order and last_filled_order not in self._portfolio.orders:
+                    if last_filled_order and not self._portfolio.has_order(last_filled_order):
                         self._portfolio.update(last_filled_order)
                         logger.info("Updated portfolio with new order: {}".format(last_filled_order))
 
-                    # self._portfolio.save_to_disk(self._path_to_portfolio)
                     self._previous_signal = self._current_signal
+                self._portfolio.mark_to_market(self._current_candle.get_close_price())
+                logger.debug("Portfolio performance: {}".format(self._portfolio.performance_snapshot()))
                 self._previous_candle = self._current_candle
 
             if self._run_type == "live":
-                logger.debug("Going to sleep for {} seconds.".format(self._parameters.sleep_time))
-                time.sleep(self._parameters.sleep_time)
-
                 last_filled_order = _pass_signal_to_market_maker(current_signal=self._current_signal,
                     market_maker=self._market_maker)
-                if last_filled_order and last_filled_order not in self._portfolio.orders:
+                if last_filled_order and not self._portfolio.has_order(last_filled_order):
                     self._portfolio.update(last_filled_order)
                     logger.info("Updated portfolio with new order: {}".format(last_filled_order))
 
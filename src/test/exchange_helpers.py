@@ -0,0 +1,47 @@
+from collections import Counter
+
+from src.backtesting.clock import SimulatedClock
+from src.backtesting.simulated_exchange import SimulatedExchange
+from src.containers.order import Order, OrderState, OrderType, Side
+from src.containers.stock_data import StockData
+
+
+class CountingExchange(SimulatedExchange):
+    """SimulatedExchange counting the requests made to it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = Counter()
+
+    def place_order(self, order):
+        self.requests["place_order"] += 1
+        return super().place_order(order)
+
+    def modify_order(self, order, price, size):
+        self.requests["modify_order"] += 1
+        return super().modify_order(order, price, size)
+
+    def cancel_order(self, order_id):
+        self.requests["cancel_order"] += 1
+        return super().cancel_order(order_id)
+
+    def get_open_orders(self, order_id=None):
+        self.requests["get_open_orders"] += 1
+        return super().get_open_orders(order_id)
+
+    def get_last_n_orders(self, trading_pair, n):
+        self.requests["get_last_n_orders"] += 1
+        return super().get_last_n_orders(trading_pair, n)
+
+
+def create_exchange(stock_data: StockData) -> CountingExchange:
+    """An exchange at the close of the first candle, whose history starts with one filled ask order, "0"."""
+    first_candle = stock_data.candles[0]
+    initial_order = Order(trading_pair_id=stock_data.trading_pair, price=first_candle.get_close_price(),
+                          type=OrderType.limit, side=Side.ask, size=100.0, filled=100.0,
+                          equivalent_price=first_candle.get_close_price(), state=OrderState.filled, id="0",
+                          timestamp=first_candle.get_time().close_time,
+                          completed_at=first_candle.get_time().close_time)
+    return CountingExchange(stock_data.trading_pair,
+                            SimulatedClock(first_candle.get_time().close_time.as_epoch_time()),
+                            initial_orders=[initial_order])
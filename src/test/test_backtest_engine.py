@@ -0,0 +1,62 @@
+import copy
+import os
+from datetime import timedelta
+
+import numpy as np
+
+from src.backtesting.backtest_engine import BacktestEngine, find_registered_candles
+from src.classification.train_classifier import fit_classifier
+from src.containers.candle import Candle
+from src.containers.portfolio import Portfolio
+from src.containers.stock_data import StockData, load_from_disk, save_to_disk
+from src.definitions import TEST_DATA_DIR
+from src.feature_extraction.technical_indicator import AutoCorrelationTechnicalIndicator, PPOTechnicalIndicator
+from src.runner import Runner
+
+
+class NoopClient(object):
+    pass
+
+
+def load_stock_data() -> StockData:
+    return load_from_disk(os.path.join(TEST_DATA_DIR, "test_data_long.dill"))
+
+
+def generate_testing_set(stock_data: StockData) -> StockData:
+    # repeated candles have to be skipped, as the runner does when no new candle has closed yet
+    indices = np.concatenate([np.arange(700, 900), [899, 899], np.arange(900, 1000)])
+    return StockData(stock_data.candles[indices], stock_data.trading_pair)
+
+
+def test_find_registered_candles():
+    close_times = np.array([60000, 90000, 120000, 150000, 180000, 240000])
+    assert list(find_registered_candles(close_times, timedelta(seconds=45), 0)) == [0, 2, 4, 5]
+    assert list(find_registered_candles(close_times[[0, 2, 4]], timedelta(seconds=45), 0)) == [0, 1, 2]
+
+
+def test_backtest_engine_matches_mock_runner(tmpdir):
+    stock_data = load_stock_data()
+    classifier = fit_classifier(stock_data.trading_pair, StockData(stock_data.candles[:700], stock_data.trading_pair),
+                                None, [AutoCorrelationTechnicalIndicator(Candle.get_close_price, 2),
+                                       PPOTechnicalIndicator(Candle.get_close_price, 5, 1),
+                                       PPOTechnicalIndicator(Candle.get_close_price, 20, 10)],
+                                n_jobs=1, n_estimators=50)
+    path_to_classifier = str(tmpdir.join("classifier.dill"))
+    classifier.save_to_disk(path_to_classifier)
+    testing_set = generate_testing_set(stock_data)
+    path_to_stock_data = str(tmpdir.join("stock_data.dill"))
+    save_to_disk(testing_set, path_to_stock_data)
+
+    runner = Runner(stock_data.trading_pair, 100, "mock", None, None, path_to_stock_data, None,
+                    path_to_classifier, NoopClient(), None, None)
+    runner.initialize()
+    runner.run()
+
+    engine = BacktestEngine(copy.deepcopy(classifier), Portfolio(initial_capital=5.0, trade_amount=100))
+    engine.run(testing_set)
+
+    assert len(engine.portfolio.signals) == len(testing_set) - 2
+    assert engine.portfolio.signals == runner.portfolio.signals
+    assert engine.clock.now == testing_set.candles.close_time[-1]
+    assert engine.portfolio.performance_snapshot() == runner.portfolio.performance_snapshot()
+    assert np.array_equal(engine.portfolio.ledger.column("equity"), runner.portfolio.ledger.column("equity"))
@@ -0,0 +1,97 @@
+import json
+import os
+import pickle
+from typing import List
+
+import numpy as np
+import pytest
+
+from src import definitions
+from src.connection.helpers import finetune_time_window
+from src.containers.candle import Candle
+from src.containers.candle_array import CandleArray
+from src.containers.stock_data import StockData, load_from_disk
+from src.containers.time_windows import TimeWindow
+from src.containers.trading_pair import TradingPair
+from src.helpers import is_equal
+from src.type_aliases import Exchange
+
+
+def load_candle_data() -> List[Candle]:
+    stock_data = load_from_disk(os.path.join(definitions.TEST_DATA_DIR, "test_data.dill"))
+    return stock_data.candles.to_candles()
+
+
+def test_candle_view_matches_candle():
+    candles = load_candle_data()
+    candle_array = CandleArray.from_candles(candles)
+    assert len(candle_array) == len(candles)
+    for candle, view in zip(candles, candle_array):
+        assert view.get_close_price() == candle.get_close_price()
+        assert view.get_open_price() == candle.get_open_price()
+        assert view.get_volume() == candle.get_volume()
+        assert view.get_number_of_trades() == candle.get_number_of_trades()
+        assert view.get_close_time_as_datetime() == candle.get_close_time_as_datetime()
+        assert Candle.get_close_price(view) == candle.get_close_price()
+        assert repr(view) == repr(candle)
+
+
+def test_candle_array_columns_and_slicing():
+    candles = load_candle_data()
+    candle_array = CandleArray.from_candles(candles)
+    assert is_equal(list(candle_array.close_price), [candle.get_close_price() for candle in candles])
+    assert is_equal([view.get_close_price() for view in candle_array[1:3]],
+                    [candle.get_close_price() for candle in candles[1:3]])
+    assert candle_array[-1].get_close_time_as_datetime() == candles[-1].get_close_time_as_datetime()
+    with pytest.raises(IndexError):
+        _ = candle_array[len(candles)]
+
+
+def test_append_grows_candle_array():
+    candles = load_candle_data()
+    stock_data = StockData(candles=[], trading_pair=TradingPair("XRP", "BTC"))
+    for candle in candles * 10:
+        stock_data.append_new_candle(candle)
+    assert len(stock_data) == 10 * len(candles)
+    assert stock_data.candles[-1].get_close_price() == candles[-1].get_close_price()
+
+
+def test_pickling_round_trip():
+    candle_array = CandleArray.from_candles(load_candle_data())
+    restored = pickle.loads(pickle.dumps(candle_array))
+    assert np.array_equal(restored.close_time, candle_array.close_time)
+    candle = pickle.loads(pickle.dumps(candle_array[0]))
+    assert type(candle) is Candle
+    assert candle.get_close_price() == candle_array[0].get_close_price()
+
+
+def test_finetune_time_window_on_candle_array():
+    candles = load_candle_data()
+    time_window = TimeWindow(start_time=candles[1].get_close_time_as_datetime(),
+                             end_time=candles[3].get_close_time_as_datetime())
+    expected = finetune_time_window(candles, time_window)
+    result = finetune_time_window(CandleArray.from_candles(candles), time_window)
+    assert is_equal([candle.get_close_time_as_datetime() for candle in result],
+                    [candle.get_close_time_as_datetime() for candle in expected])
+
+
+def generate_binance_klines() -> List[List]:
+    candles = load_from_disk(os.path.join(definitions.TEST_DATA_DIR, "test_data_long.dill")).candles
+    return [[int(candle.get_time().open_time.as_epoch_time()), "{:.8f}".format(candle.get_open_price()),
+             "{:.8f}".format(candle.get_price().high_price), "{:.8f}".format(candle.get_price().low_price),
+             "{:.8f}".format(candle.get_close_price()), "{:.8f}".format(candle.get_volume()),
+             int(candle.get_time().close_time.as_epoch_time()), "{:.8f}".format(candle._volume.quote_asset_volume),
+             candle.get_number_of_trades(), "{:.8f}".format(candle._volume.taker_buy_base_asset_volume),
+             "{:.8f}".format(candle._volume.taker_buy_quote_asset_volume), "0"] for candle in candles]
+
+
+def test_bulk_binance_kline_parser():
+    klines = generate_binance_klines()
+    expected = CandleArray.from_candles(Candle.from_list_of_klines(klines, Exchange.BINANCE))
+    for result in [CandleArray.from_list_of_klines(klines, Exchange.BINANCE),
+                   CandleArray.from_binance_json(json.dumps(klines).encode())]:
+        assert len(result) == len(expected)
+        for name in expected.columns:
+            assert np.array_equal(result.column(name), expected.column(name))
+            assert result.column(name).dtype == expected.column(name).dtype
+    assert len(CandleArray.from_binance_json(b"[]")) == 0
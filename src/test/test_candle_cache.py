@@ -0,0 +1,89 @@
+import os
+from datetime import datetime, timedelta
+from typing import List
+
+import numpy as np
+import pytest
+
+from src import definitions
+from src.connection.candle_cache import CandleCache, CandleCacheMissError, find_gaps, merge_segments
+from src.connection.helpers import finetune_time_window
+from src.containers.candle_array import CandleArray
+from src.containers.stock_data import StockData, load_from_disk
+from src.containers.time_windows import TimeWindow
+
+
+def load_stock_data() -> StockData:
+    return load_from_disk(os.path.join(definitions.TEST_DATA_DIR, "test_data_long.dill"))
+
+
+class MockDownloader(object):
+    def __init__(self, stock_data: StockData):
+        self._stock_data = stock_data
+        self._requested_time_windows = []
+
+    @property
+    def requested_time_windows(self) -> List[TimeWindow]:
+        return self._requested_time_windows
+
+    def __call__(self, time_window: TimeWindow) -> CandleArray:
+        self._requested_time_windows.append(time_window)
+        return finetune_time_window(self._stock_data.candles, time_window)
+
+
+def test_find_gaps():
+    assert merge_segments([(5, 10), (0, 3), (3, 4), (9, 12)]) == [(0, 4), (5, 12)]
+    assert find_gaps([], 0, 10) == [(0, 10)]
+    assert find_gaps([(0, 4), (5, 12)], 2, 20) == [(4, 5), (12, 20)]
+    assert find_gaps([(0, 20)], 2, 10) == []
+
+
+def test_candle_cache_downloads_only_missing_gaps(tmpdir):
+    stock_data = load_stock_data()
+    close_times = [candle.get_close_time_as_datetime() for candle in stock_data.candles]
+    downloader = MockDownloader(stock_data)
+    cache = CandleCache(stock_data.trading_pair, timedelta(minutes=1), cache_dir=str(tmpdir))
+
+    first_window = TimeWindow(start_time=close_times[100], end_time=close_times[500])
+    second_window = TimeWindow(start_time=close_times[300], end_time=close_times[900])
+    outer_window = TimeWindow(start_time=close_times[0], end_time=close_times[1000])
+
+    for time_window in [first_window, second_window, outer_window]:
+        result = cache.load(time_window, downloader)
+        expected = finetune_time_window(stock_data.candles, time_window)
+        assert np.array_equal(result.candles.close_time, expected.close_time)
+        assert np.array_equal(result.candles.close_price, expected.close_price)
+
+    assert [(time_window.start_datetime, time_window.end_datetime) for time_window in
+            downloader.requested_time_windows] == [(close_times[100], close_times[500]),
+                                                   (close_times[500], close_times[900]),
+                                                   (close_times[0], close_times[100]),
+                                                   (close_times[900], close_times[1000])]
+
+    cache.load(TimeWindow(start_time=close_times[200], end_time=close_times[800]), downloader)
+    assert len(downloader.requested_time_windows) == 4
+    assert cache.missing_time_windows(outer_window) == []
+
+
+def test_candle_cache_load_cached(tmpdir):
+    stock_data = load_stock_data()
+    close_times = [candle.get_close_time_as_datetime() for candle in stock_data.candles]
+    cache = CandleCache(stock_data.trading_pair, timedelta(minutes=1), cache_dir=str(tmpdir))
+    cache.load(TimeWindow(start_time=close_times[100], end_time=close_times[500]), MockDownloader(stock_data))
+
+    time_window = TimeWindow(start_time=close_times[200], end_time=close_times[400])
+    result = cache.load_cached(time_window)
+    assert np.array_equal(result.candles.close_time,
+                          finetune_time_window(stock_data.candles, time_window).close_time)
+    with pytest.raises(CandleCacheMissError):
+        cache.load_cached(TimeWindow(start_time=close_times[400], end_time=close_times[600]))
+
+
+def test_candle_cache_does_not_cover_the_future(tmpdir):
+    stock_data = load_stock_data()
+    cache = CandleCache(stock_data.trading_pair, timedelta(minutes=1), cache_dir=str(tmpdir))
+    time_window = TimeWindow(start_time=datetime.now() + timedelta(days=1), end_time=datetime.now() + timedelta(days=2))
+    downloader = MockDownloader(stock_data)
+    assert len(cache.load(time_window, downloader)) == 0
+    assert all(start < end for start, end in cache.segments)
+    assert cache.missing_time_windows(time_window) != []
@@ -0,0 +1,44 @@
+import os
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from src import definitions
+from src.containers.candle_file import save_to_candle_file, load_from_candle_file, read_candle_file_header, \
+    CandleFileError
+from src.containers.stock_data import StockData, load_from_disk
+
+
+def load_stock_data(file_name: str) -> StockData:
+    return load_from_disk(os.path.join(definitions.TEST_DATA_DIR, file_name))
+
+
+@pytest.mark.parametrize("file_name", ["test_data_long.dill", "test_data_3.dill"])
+def test_candle_file_round_trip(tmpdir, file_name):
+    stock_data = load_stock_data(file_name)
+    path_to_file = str(tmpdir.join("stock_data.candles"))
+    save_to_candle_file(stock_data, timedelta(minutes=1), path_to_file)
+
+    header = read_candle_file_header(path_to_file)
+    assert header.number_of_rows == len(stock_data)
+    assert header.sampling_period == timedelta(minutes=1)
+    assert str(header.trading_pair) == str(stock_data.trading_pair)
+
+    loaded = load_from_candle_file(path_to_file)
+    assert str(loaded.trading_pair) == str(stock_data.trading_pair)
+    for name, column in stock_data.candles.columns.items():
+        assert isinstance(loaded.candles.column(name), np.memmap)
+        assert np.array_equal(loaded.candles.column(name), column, equal_nan=True)
+    assert repr(loaded.candles[-1]) == repr(stock_data.candles[-1])
+
+    loaded.append_new_candle(stock_data.candles[0])
+    assert len(loaded) == len(stock_data) + 1
+
+
+def test_candle_file_rejects_foreign_files(tmpdir):
+    path_to_file = str(tmpdir.join("stock_data.candles"))
+    with open(path_to_file, "wb") as outfile:
+        outfile.write(b"\x00" * 128)
+    with pytest.raises(CandleFileError):
+        load_from_candle_file(path_to_file)
@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+from datetime import timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+import pytest
+import simplejson as json
+
+from src import definitions
+from src.connection.chunked_download import ChunkedDownloader, split_into_chunks
+from src.connection.helpers import DownloadingError, finetune_time_window
+from src.containers.stock_data import StockData, load_from_disk
+from src.containers.time_windows import TimeWindow
+
+
+def load_stock_data() -> StockData:
+    return load_from_disk(os.path.join(definitions.TEST_DATA_DIR, "test_data_long.dill"))
+
+
+def select_klines(candles, start_time: int, end_time: int, limit: int) -> list:
+    mask = (candles.open_time >= start_time) & (candles.open_time <= end_time)
+    return [[int(candles.open_time[i]), "{:.8f}".format(candles.open_price[i]),
+             "{:.8f}".format(candles.high_price[i]), "{:.8f}".format(candles.low_price[i]),
+             "{:.8f}".format(candles.close_price[i]), "{:.8f}".format(candles.volume[i]),
+             int(candles.close_time[i]), "{:.8f}".format(candles.quote_asset_volume[i]),
+             int(candles.number_of_trades[i]), "{:.8f}".format(candles.taker_buy_base_asset_volume[i]),
+             "{:.8f}".format(candles.taker_buy_quote_asset_volume[i]), "0"]
+            for i in np.flatnonzero(mask)[:limit]]
+
+
+class FakeKlineClient(object):
+    def __init__(self, stock_data: StockData):
+        self.candles = stock_data.candles
+        self.requests = []
+
+    def get_klines(self, symbol: str, interval: str, startTime: int, endTime: int, limit: int) -> list:
+        self.requests.append(startTime)
+        return select_klines(self.candles, startTime, endTime, limit)
+
+
+class StubKlineServer(ThreadingHTTPServer):
+    def __init__(self, stock_data: StockData):
+        super().__init__(("127.0.0.1", 0), StubKlineRequestHandler)
+        self.candles = stock_data.candles
+        self.requests = []
+        self.failing_start_times = set()
+
+    @property
+    def url(self) -> str:
+        return "http://127.0.0.1:{}".format(self.server_address[1])
+
+
+class StubKlineRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        query = {key: value[0] for key, value in parse_qs(urlparse(self.path).query).items()}
+        start_time, end_time, limit = int(query["startTime"]), int(query["endTime"]), int(query["limit"])
+        self.server.requests.append(start_time)
+        if start_time in self.server.failing_start_times:
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = json.dumps(select_klines(self.server.candles, start_time, end_time, limit)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def kline_server():
+    server = StubKlineServer(load_stock_data())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_split_into_chunks():
+    assert split_into_chunks(0, 299999, timedelta(minutes=1), limit=2) == [(0, 119999), (120000, 239999),
+                                                                          (240000, 299999)]
+
+
+def test_chunked_download_matches_stock_data(tmpdir, kline_server):
+    stock_data = load_stock_data()
+    close_times = [candle.get_close_time_as_datetime() for candle in stock_data.candles]
+    time_window = TimeWindow(start_time=close_times[10], end_time=close_times[1010])
+    downloader = ChunkedDownloader(base_url=kline_server.url, max_workers=4, requests_per_second=1000,
+                                   chunk_directory=str(tmpdir), limit=100)
+
+    candles = downloader.download(time_window, stock_data.trading_pair, timedelta(minutes=1))
+
+    expected = finetune_time_window(stock_data.candles, time_window)
+    assert len(candles) == 1000
+    assert len(kline_server.requests) == 10
+    for name in expected.columns:
+        assert np.array_equal(candles.column(name), expected.column(name))
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_chunked_download_resumes_after_failure(tmpdir, kline_server):
+    stock_data = load_stock_data()
+    close_times = [candle.get_close_time_as_datetime() for candle in stock_data.candles]
+    time_window = TimeWindow(start_time=close_times[10], end_time=close_times[510])
+    downloader = ChunkedDownloader(base_url=kline_server.url, max_workers=2, requests_per_second=1000,
+                                   chunk_directory=str(tmpdir), limit=100)
+    chunk_start_times = [int(stock_data.candles.open_time[i]) for i in range(10, 510, 100)]
+
+    kline_server.failing_start_times.add(chunk_start_times[2])
+    with pytest.raises(DownloadingError):
+        downloader.download(time_window, stock_data.trading_pair, timedelta(minutes=1))
+    assert sorted(kline_server.requests) == chunk_start_times
+
+    kline_server.failing_start_times.clear()
+    candles = downloader.download(time_window, stock_data.trading_pair, timedelta(minutes=1))
+    assert kline_server.requests[len(chunk_start_times):] == [chunk_start_times[2]]
+    assert np.array_equal(candles.close_time, finetune_time_window(stock_data.candles, time_window).close_time)
+
+
+def test_chunked_download_fetches_through_the_client(tmpdir):
+    stock_data = load_stock_data()
+    client = FakeKlineClient(stock_data)
+    close_times = [candle.get_close_time_as_datetime() for candle in stock_data.candles]
+    time_window = TimeWindow(start_time=close_times[10], end_time=close_times[510])
+    downloader = ChunkedDownloader(base_url="http://127.0.0.1:1", max_workers=2, requests_per_second=1000,
+                                   chunk_directory=str(tmpdir), limit=100, client=client)
+
+    candles = downloader.download(time_window, stock_data.trading_pair, timedelta(minutes=1))
+
+    expected = finetune_time_window(stock_data.candles, time_window)
+    assert len(client.requests) == 5
+    for name in expected.columns:
+        assert np.array_equal(candles.column(name), expected.column(name))
+
+
+def test_chunked_download_removes_stale_chunks(tmpdir, kline_server):
+    stock_data = load_stock_data()
+    close_times = [candle.get_close_time_as_datetime() for candle in stock_data.candles]
+    downloader = ChunkedDownloader(base_url=kline_server.url, max_workers=2, requests_per_second=1000,
+                                   chunk_directory=str(tmpdir), limit=100, stale_chunk_age=timedelta(hours=1))
+    chunk_start_times = [int(stock_data.candles.open_time[i]) for i in range(10, 510, 100)]
+    kline_server.failing_start_times.add(chunk_start_times[2])
+    with pytest.raises(DownloadingError):
+        downloader.download(TimeWindow(start_time=close_times[10], end_time=close_times[510]),
+                            stock_data.trading_pair, timedelta(minutes=1))
+    abandoned_chunks = os.listdir(str(tmpdir))
+    assert len(abandoned_chunks) == 4
+    two_hours_ago = time.time() - 2 * 3600
+    for file_name in abandoned_chunks[:2]:
+        os.utime(os.path.join(str(tmpdir), file_name), (two_hours_ago, two_hours_ago))
+
+    downloader.download(TimeWindow(start_time=close_times[600], end_time=close_times[700]),
+                        stock_data.trading_pair, timedelta(minutes=1))
+
+    assert sorted(os.listdir(str(tmpdir))) == sorted(abandoned_chunks[2:])
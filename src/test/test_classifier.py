@@ -1,12 +1,16 @@
+import copy
 import os
 
 import numpy as np
 import pytest
 
-from src.classification.trading_classifier import TradingClassifier
+from src.classification.helpers import extract_indicator_from_candle, convert_to_pandas
+from src.classification.trading_classifier import TradingClassifier, fudge_factor
+from src.containers.candle import Candle
 from src.containers.stock_data import StockData, load_from_disk
 from src.definitions import TEST_DATA_DIR
 from src.helpers import is_equal
+from src.test.training_helpers import generate_technical_indicators, train_classifier
 
 
 def load_classifier() -> TradingClassifier:
@@ -33,3 +37,30 @@ def test_repeatability_of_classifier_predictions():
 
     assert 9 == sum([is_equal(previous_answer, next_answer) for previous_answer, next_answer in
                          zip(predicted_values[0:], predicted_values[1:])])
+
+
+def predict_one_with_pandas(classifier: TradingClassifier, candle: Candle):
+    testing_data = extract_indicator_from_candle(candle, classifier.indicator_graph)
+    predictors, _ = convert_to_pandas(predictors=testing_data, labels=None)
+    predictors *= fudge_factor
+    return classifier.sklearn_classifier.predict(predictors.values)
+
+
+def test_predict_one_matches_pandas_path():
+    stock_data = load_from_disk(os.path.join(TEST_DATA_DIR, "test_data_long.dill"))
+    classifier = train_classifier(StockData(stock_data.candles[:1000], stock_data.trading_pair), n_estimators=10)
+    reference_classifier = copy.deepcopy(classifier)
+    for candle in stock_data.candles[1000:]:
+        assert np.array_equal(classifier.predict_one(candle), predict_one_with_pandas(reference_classifier, candle))
+        assert classifier.prediction_latency > 0
+
+
+def test_predict_one_raises_until_indicators_are_ready():
+    stock_data = load_from_disk(os.path.join(TEST_DATA_DIR, "test_data_long.dill"))
+    classifier = train_classifier(StockData(stock_data.candles[:1000], stock_data.trading_pair), n_estimators=10)
+    classifier._indicator_graph = None
+    classifier._list_of_technical_indicators = generate_technical_indicators()
+    for candle in stock_data.candles[:3]:
+        with pytest.raises(ValueError):
+            classifier.predict_one(candle)
+    assert classifier.predict_one(stock_data.candles[3]) is not None
@@ -0,0 +1,44 @@
+import os
+from collections import Counter
+
+from src.containers.order import Order, OrderType, Side
+from src.containers.signal_array import SignalArray
+from src.containers.stock_data import StockData, load_from_disk
+from src.definitions import TEST_DATA_DIR
+from src.market_maker.ExperimentalMarketMaker import ExperimentalMarketMaker
+from src.market_maker.exchange_snapshot import ExchangeSnapshot
+from src.test.exchange_helpers import create_exchange
+
+MUTATING_REQUESTS = ("place_order", "modify_order", "cancel_order")
+
+
+def test_snapshot_is_fetched_once_until_invalidated():
+    stock_data = load_from_disk(os.path.join(TEST_DATA_DIR, "test_data_long.dill"))
+    exchange = create_exchange(stock_data)
+    snapshot = ExchangeSnapshot(exchange, stock_data.trading_pair)
+    assert snapshot.last_filled_order.id == "0" and snapshot.last_placed_order.id == "0"
+    assert snapshot.open_orders == [] and not snapshot.is_open("0")
+    assert exchange.requests == Counter(get_open_orders=1, get_last_n_orders=1)
+
+    order = Order(trading_pair_id=stock_data.trading_pair, price=1.0, type=OrderType.limit, side=Side.bid,
+                  size=1.0)
+    exchange.place_order(order)
+    assert snapshot.open_orders == []
+    snapshot.invalidate()
+    assert snapshot.is_open(order.id) and snapshot.last_placed_order is order
+    assert snapshot.last_filled_order.id == "0"
+    assert exchange.requests["get_open_orders"] == 2 and exchange.requests["get_last_n_orders"] == 2
+
+
+def test_market_maker_requests_per_signal():
+    stock_data = load_from_disk(os.path.join(TEST_DATA_DIR, "test_data_long.dill"))
+    stock_data = StockData(stock_data.candles[:500], stock_data.trading_pair)
+    exchange = create_exchange(stock_data)
+    market_maker = ExperimentalMarketMaker(exchange, stock_data.trading_pair, 100.0)
+    for candle, signal in zip(stock_data.candles[1:], SignalArray.from_price_moves(stock_data)):
+        exchange.requests.clear()
+        market_maker.insert_signal(signal)
+        exchange.replay_candle(candle)
+        number_of_mutations = sum(exchange.requests[request] for request in MUTATING_REQUESTS)
+        assert number_of_mutations <= 1
+        assert sum(exchange.requests.values()) - number_of_mutations == 2
@@ -0,0 +1,91 @@
+import copy
+import multiprocessing
+import os
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.classification.trading_classifier import TradingClassifier
+from src.containers.candle import Candle
+from src.containers.stock_data import StockData, load_from_disk
+from src.definitions import TEST_DATA_DIR
+from src.feature_extraction.feature_cache import FeatureCache
+from src.feature_extraction.indicator_graph import IndicatorGraph
+from src.feature_extraction.technical_indicator import AutoCorrelationTechnicalIndicator, PPOTechnicalIndicator
+
+
+def generate_technical_indicators():
+    return [AutoCorrelationTechnicalIndicator(Candle.get_close_price, 2),
+            PPOTechnicalIndicator(Candle.get_close_price, 5, 1),
+            PPOTechnicalIndicator(Candle.get_close_price, 20, 10)]
+
+
+def generate_classifier(stock_data: StockData) -> TradingClassifier:
+    return TradingClassifier(stock_data.trading_pair, generate_technical_indicators(),
+                             RandomForestClassifier(n_estimators=20, max_depth=5, random_state=1234), None, 0.5)
+
+
+def load_stock_data() -> StockData:
+    return load_from_disk(os.path.join(TEST_DATA_DIR, "test_data_long.dill"))
+
+
+def compute_features_into_cache(cache_dir: str):
+    stock_data = load_stock_data()
+    training_set = StockData(stock_data.candles[:300], stock_data.trading_pair)
+    indicator_graph = IndicatorGraph(generate_technical_indicators())
+    key = FeatureCache.generate_key(training_set, indicator_graph)
+    features = {name: np.arange(300, dtype=np.float64) for name in indicator_graph.technical_indicator_names}
+    for _ in range(20):
+        FeatureCache(cache_dir)._save_entry(key, features, indicator_graph)
+
+
+def test_feature_cache_key():
+    stock_data = load_stock_data()
+    training_set = StockData(stock_data.candles[:500], stock_data.trading_pair)
+    indicator_graph = IndicatorGraph(generate_technical_indicators())
+    key = FeatureCache.generate_key(training_set, indicator_graph)
+    assert key == FeatureCache.generate_key(copy.deepcopy(training_set),
+                                            IndicatorGraph(generate_technical_indicators()))
+    assert key != FeatureCache.generate_key(StockData(stock_data.candles[1:501], stock_data.trading_pair),
+                                            indicator_graph)
+    assert key != FeatureCache.generate_key(training_set, IndicatorGraph(generate_technical_indicators()[:2]))
+    indicator_graph.update(stock_data.candles[0])
+    assert key != FeatureCache.generate_key(training_set, indicator_graph)
+
+
+def test_cached_features_give_identical_classifiers(tmpdir):
+    stock_data = load_stock_data()
+    training_set = StockData(stock_data.candles[:1000], stock_data.trading_pair)
+    testing_set = StockData(stock_data.candles[1000:1200], stock_data.trading_pair)
+    feature_cache = FeatureCache(str(tmpdir))
+
+    classifiers = []
+    for _ in range(2):
+        classifier = generate_classifier(stock_data)
+        classifier.train(training_set, feature_cache)
+        classifiers.append(classifier)
+    assert len(os.listdir(str(tmpdir))) == 1
+    assert classifiers[0]._predictors.equals(classifiers[1]._predictors)
+
+    reference_classifier = generate_classifier(stock_data)
+    reference_classifier.train(training_set)
+    assert reference_classifier._predictors.equals(classifiers[1]._predictors)
+
+    predictions = [classifier.predict(copy.deepcopy(testing_set), feature_cache) for classifier in classifiers]
+    assert len(os.listdir(str(tmpdir))) == 2
+    assert np.array_equal(predictions[0], predictions[1])
+    assert np.array_equal(predictions[1], reference_classifier.predict(testing_set))
+
+    # a cache hit leaves the indicators in the same state as computing the features does
+    for candle in stock_data.candles[1200:1300]:
+        assert np.array_equal(classifiers[1].predict_one(candle), reference_classifier.predict_one(candle))
+
+
+def test_processes_writing_the_same_entry(tmpdir):
+    processes = [multiprocessing.Process(target=compute_features_into_cache, args=(str(tmpdir),)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert [process.exitcode for process in processes] == [0, 0, 0, 0]
+    assert len(os.listdir(str(tmpdir))) == 1
@@ -0,0 +1,59 @@
+import copy
+import os
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.classification.flat_forest import FlatForest
+from src.containers.stock_data import StockData, load_from_disk
+from src.definitions import TEST_DATA_DIR
+from src.test.training_helpers import train_classifier
+
+
+def test_flat_forest_matches_sklearn_forest():
+    random_state = np.random.RandomState(1234)
+    X = random_state.normal(size=(2000, 6))
+    y = np.where(X[:, 0] + X[:, 1] * X[:, 2] + random_state.normal(scale=0.5, size=2000) > 0, 1.0, -1.0)
+    sklearn_forest = RandomForestClassifier(n_estimators=100, max_depth=5, class_weight="balanced",
+                                            random_state=1234).fit(X, y)
+    flat_forest = FlatForest.from_sklearn(sklearn_forest)
+    X_test = random_state.normal(size=(3000, 6))
+    assert np.array_equal(flat_forest.predict_proba(X_test), sklearn_forest.predict_proba(X_test))
+    assert np.array_equal(flat_forest.predict(X_test), sklearn_forest.predict(X_test))
+    assert np.array_equal(flat_forest.feature_importances_, sklearn_forest.feature_importances_)
+
+
+def test_flat_forest_save_and_load(tmpdir):
+    stock_data = load_from_disk(os.path.join(TEST_DATA_DIR, "test_data_long.dill"))
+    classifier = train_classifier(StockData(stock_data.candles[:1000], stock_data.trading_pair), n_estimators=200)
+    flat_forest = FlatForest.from_sklearn(classifier.sklearn_classifier)
+    path_to_file = str(tmpdir.join("flat_forest.npz"))
+    flat_forest.save_to_disk(path_to_file)
+    loaded_flat_forest = FlatForest.load_from_disk(path_to_file)
+    X = classifier._predictors.values * 1000
+    assert np.array_equal(loaded_flat_forest.predict_proba(X), classifier.sklearn_classifier.predict_proba(X))
+
+
+def test_compiled_classifier_predictions():
+    stock_data = load_from_disk(os.path.join(TEST_DATA_DIR, "test_data_long.dill"))
+    classifier = train_classifier(StockData(stock_data.candles[:1000], stock_data.trading_pair), n_estimators=200)
+    compiled_classifier = copy.deepcopy(classifier)
+    compiled_classifier.compile_forest(keep_sklearn_classifier=False)
+    assert compiled_classifier.sklearn_classifier is None
+    testing_set = StockData(stock_data.candles[1000:], stock_data.trading_pair)
+    assert np.array_equal(copy.deepcopy(compiled_classifier).predict(testing_set),
+                          copy.deepcopy(classifier).predict(testing_set))
+    for candle in testing_set.candles:
+        assert np.array_equal(compiled_classifier.predict_one(candle), classifier.predict_one(candle))
+
+
+def test_flat_forest_with_missing_values():
+    random_state = np.random.RandomState(1234)
+    X = random_state.normal(size=(2000, 4))
+    X[random_state.rand(*X.shape) < 0.1] = np.nan
+    y = np.where(np.nan_to_num(X[:, 0]) + random_state.normal(scale=0.5, size=2000) > 0, 1.0, -1.0)
+    sklearn_forest = RandomForestClassifier(n_estimators=50, max_depth=6, random_state=1234).fit(X, y)
+    X_test = random_state.normal(size=(1000, 4))
+    X_test[random_state.rand(*X_test.shape) < 0.1] = np.nan
+    assert np.array_equal(FlatForest.from_sklearn(sklearn_forest).predict_proba(X_test),
+                          sklearn_forest.predict_proba(X_test))
@@ -0,0 +1,56 @@
+import os
+from typing import List
+
+import numpy as np
+
+from src import definitions
+from src.classification.helpers import extract_indicators_from_stock_data
+from src.containers.candle import Candle
+from src.containers.stock_data import StockData, load_from_disk
+from src.feature_extraction.indicator_graph import IndicatorGraph
+from src.feature_extraction.technical_indicator import AutoCorrelationTechnicalIndicator, PPOTechnicalIndicator
+
+
+def load_stock_data() -> StockData:
+    return load_from_disk(os.path.join(definitions.TEST_DATA_DIR, "test_data_long.dill"))
+
+
+def generate_technical_indicators() -> List:
+    return [
+        AutoCorrelationTechnicalIndicator(Candle.get_close_price, 1),
+        AutoCorrelationTechnicalIndicator(Candle.get_close_price, 2),
+        AutoCorrelationTechnicalIndicator(Candle.get_close_price, 3),
+        AutoCorrelationTechnicalIndicator(Candle.get_close_price, 4),
+        PPOTechnicalIndicator(Candle.get_close_price, 5, 1),
+        PPOTechnicalIndicator(Candle.get_close_price, 10, 4),
+        PPOTechnicalIndicator(Candle.get_close_price, 20, 1),
+        PPOTechnicalIndicator(Candle.get_close_price, 30, 10),
+        PPOTechnicalIndicator(Candle.get_close_price, 40, 20),
+        PPOTechnicalIndicator(Candle.get_close_price, 50, 30),
+        PPOTechnicalIndicator(Candle.get_close_price, 60, 40),
+    ]
+
+
+def test_indicator_graph_shares_common_subexpressions():
+    graph = IndicatorGraph(generate_technical_indicators() + [PPOTechnicalIndicator(Candle.get_close_price, 60, 40)])
+    # 4 autocorrelations, 9 distinct moving averages and 7 distinct PPOs of 2 compound nodes each
+    assert graph.number_of_nodes == 4 + 9 + 7 * 2
+    assert graph.lags == 60
+
+
+def test_indicator_graph_matches_independent_indicators():
+    stock_data = load_stock_data()
+    technical_indicators = generate_technical_indicators()
+    graph = IndicatorGraph(technical_indicators)
+    expected = extract_indicators_from_stock_data(stock_data, generate_technical_indicators())
+    result = extract_indicators_from_stock_data(stock_data, graph)
+    assert list(result.keys()) == list(expected.keys())
+    for name in expected:
+        assert np.array_equal(np.array(result[name], dtype=float), np.array(expected[name], dtype=float),
+                              equal_nan=True)
+    # the indicators the graph was compiled from are left untouched
+    assert all(indicator.result is None for indicator in technical_indicators[0:4])
+
+    series = IndicatorGraph(generate_technical_indicators()).compute_series(stock_data.candles)
+    for name in expected:
+        assert np.array_equal(series[name], np.array(expected[name], dtype=float), equal_nan=True)
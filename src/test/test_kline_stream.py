@@ -0,0 +1,88 @@
+import os
+import socket
+import threading
+from datetime import timedelta
+
+import pytest
+import simplejson as json
+from websockets.sync.server import serve
+
+from src import definitions
+from src.connection.kline_stream import KlineStream
+from src.containers.candle import Candle
+from src.containers.stock_data import StockData, load_from_disk
+
+
+def load_stock_data() -> StockData:
+    stock_data = load_from_disk(os.path.join(definitions.TEST_DATA_DIR, "test_data_long.dill"))
+    return StockData(stock_data.candles[:10], stock_data.trading_pair)
+
+
+def convert_to_stream_message(candle: Candle, is_closed: bool) -> str:
+    price, volume, time = candle.get_price(), candle._volume, candle.get_time()
+    return json.dumps({"e": "kline", "E": time.close_time.as_epoch_time(), "s": "XRPBTC",
+                       "k": {"t": time.open_time.as_epoch_time(), "T": time.close_time.as_epoch_time(),
+                             "s": "XRPBTC", "i": "1m",
+                             "o": str(price.open_price), "h": str(price.high_price), "l": str(price.low_price),
+                             "c": str(price.close_price), "v": str(volume.volume),
+                             "n": volume.number_of_trades, "x": is_closed,
+                             "q": str(volume.quote_asset_volume), "V": str(volume.taker_buy_base_asset_volume),
+                             "Q": str(volume.taker_buy_quote_asset_volume), "B": "0"}})
+
+
+@pytest.fixture
+def replay_server():
+    candles = load_stock_data().candles
+
+    def replay(connection, *args):
+        for i, candle in enumerate(candles):
+            connection.send(convert_to_stream_message(candle, is_closed=False))
+            connection.send(convert_to_stream_message(candle, is_closed=True))
+            if i > 0:
+                connection.send(convert_to_stream_message(candles[i - 1], is_closed=True))
+
+    with serve(replay, "127.0.0.1", 0, close_timeout=0.1) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield "ws://127.0.0.1:{}".format(server.socket.getsockname()[1])
+        server.shutdown()
+
+
+def find_unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_kline_stream_delivers_each_closed_candle_once(replay_server):
+    stock_data = load_stock_data()
+    stream = KlineStream(stock_data.trading_pair, timedelta(minutes=1), rest_fallback=lambda: None,
+                         url=replay_server, stale_after=timedelta(seconds=10), reconnect_delay=0.05)
+    stream.start()
+    try:
+        candles = [stream.next_candle(timeout=5) for _ in range(len(stock_data))]
+        assert stream.next_candle(timeout=0.5) is None
+    finally:
+        stream.stop()
+    for candle, expected in zip(candles, stock_data.candles):
+        assert repr(candle) == repr(expected)
+
+
+def test_kline_stream_falls_back_to_rest_when_stale():
+    stock_data = load_stock_data()
+    polls = []
+
+    def rest_fallback():
+        polls.append(1)
+        return stock_data.candles[min(len(polls), 2) - 1]
+
+    stream = KlineStream(stock_data.trading_pair, timedelta(minutes=1), rest_fallback=rest_fallback,
+                         url="ws://127.0.0.1:{}".format(find_unused_port()), stale_after=timedelta(seconds=0.1),
+                         reconnect_delay=0.05)
+    stream.start()
+    try:
+        assert repr(stream.next_candle(timeout=2)) == repr(stock_data.candles[0])
+        assert repr(stream.next_candle(timeout=2)) == repr(stock_data.candles[1])
+        assert stream.next_candle(timeout=0.5) is None
+    finally:
+        stream.stop()
@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.containers.ledger import Ledger
+from src.containers.order import Order
+from src.containers.portfolio import Portfolio
+from src.containers.signal_array import SignalArray
+from src.containers.stock_data import StockData, load_from_disk
+from src.definitions import TEST_DATA_DIR
+
+
+def load_stock_data() -> StockData:
+    stock_data = load_from_disk(os.path.join(TEST_DATA_DIR, "test_data_long.dill"))
+    return StockData(stock_data.candles[:2000], stock_data.trading_pair)
+
+
+def create_portfolio(stock_data: StockData) -> Portfolio:
+    portfolio = Portfolio(initial_capital=5, trade_amount=1000)
+    for signal in SignalArray.from_price_moves(stock_data).replace_repeats_with_holds().trades():
+        portfolio.update(Order.from_signal(signal))
+    return portfolio
+
+
+def test_compute_performance_matches_pandas_recompute():
+    portfolio = create_portfolio(load_stock_data())
+    portfolio.compute_performance()
+    positions_df = portfolio.positions_df
+    order_expenditure = positions_df["amount_traded"].multiply(positions_df["actual_price"])
+    assert list(positions_df.index) == [order.completed_at for order in portfolio.orders]
+    assert np.array_equal(portfolio.portfolio_df["order_expenditure"].values, order_expenditure.values)
+    assert np.array_equal(portfolio.portfolio_df["cumulative_order_expenditure"].values,
+                          order_expenditure.cumsum().values)
+    assert np.array_equal(portfolio.portfolio_df["remaining_capital"].values,
+                          (5 - order_expenditure.cumsum()).values)
+
+    snapshot = portfolio.performance_snapshot()
+    assert snapshot["remaining_capital"] == portfolio.portfolio_df["remaining_capital"].iloc[-1]
+    assert snapshot["number_of_fills"] == len(portfolio.orders)
+    assert snapshot["position"] == pytest.approx(np.sum(positions_df["amount_traded"].values))
+
+
+def test_ledger_accounting():
+    ledger = Ledger(initial_capital=100.0, fees=0.01)
+    ledger.record_fill(trade_time=1, amount=2.0, price=10.0)
+    ledger.record_fill(trade_time=2, amount=2.0, price=20.0)
+    assert ledger.average_price == 15.0
+    assert ledger.unrealized_pnl == 20.0
+
+    ledger.record_fill(trade_time=3, amount=-3.0, price=30.0)
+    assert ledger.realized_pnl == 45.0
+    assert ledger.position == 1.0
+    assert ledger.fees == pytest.approx(0.01 * (20.0 + 40.0 + 90.0))
+
+    # sells through the position, the remaining short is opened at this price
+    ledger.record_fill(trade_time=4, amount=-2.0, price=10.0)
+    assert ledger.realized_pnl == 40.0
+    assert ledger.position == -1.0
+    assert ledger.average_price == 10.0
+    assert ledger.drawdown == pytest.approx(20.0 + 0.2)
+    assert ledger.max_drawdown == ledger.drawdown
+
+    ledger.mark(5.0)
+    assert ledger.unrealized_pnl == 5.0
+    assert ledger.equity == pytest.approx(100.0 + ledger.realized_pnl + ledger.unrealized_pnl - ledger.fees)
+    assert len(ledger) == 4
+
+    history = ledger.to_dataframe()
+    assert list(history.index) == [1, 2, 3, 4]
+    assert np.array_equal(history["position"].values, [2.0, 4.0, 1.0, -1.0])
+    assert np.allclose(history["equity"].values,
+                       100.0 + history["realized_pnl"] + history["unrealized_pnl"] - history["fees"])
+
+
+def test_portfolio_has_order_and_survives_pickling(tmpdir):
+    stock_data = load_stock_data()
+    portfolio = create_portfolio(stock_data)
+    assert all(portfolio.has_order(order) for order in portfolio.orders)
+    assert not portfolio.has_order(Order.from_signal(SignalArray.from_price_moves(stock_data).trades()[0]))
+
+    path_to_portfolio = os.path.join(str(tmpdir), "portfolio.dill")
+    portfolio.save_to_disk(path_to_portfolio)
+    loaded_portfolio = Portfolio.load_from_disk(path_to_portfolio)
+    assert loaded_portfolio.performance_snapshot() == portfolio.performance_snapshot()
+    assert np.array_equal(loaded_portfolio.ledger.column("equity"), portfolio.ledger.column("equity"))
+    assert all(loaded_portfolio.has_order(order) for order in loaded_portfolio.orders)
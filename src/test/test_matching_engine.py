@@ -0,0 +1,100 @@
+import os
+
+import numpy as np
+
+from src.backtesting.matching_engine import MatchingEngine
+from src.backtesting.simulated_exchange import SimulatedExchange
+from src.containers.order import Order, OrderState, OrderType, Side
+from src.containers.order_book import OrderBook, Bid, Ask
+from src.containers.signal_array import SignalArray
+from src.containers.stock_data import StockData, load_from_disk
+from src.containers.trading_pair import TradingPair
+from src.definitions import TEST_DATA_DIR
+from src.market_maker.ExperimentalMarketMaker import ExperimentalMarketMaker
+from src.test.exchange_helpers import create_exchange
+
+
+def create_order(order_id: str, side: Side, price: float, size: float) -> Order:
+    return Order(trading_pair_id=TradingPair("NEO", "BTC"), price=price, type=OrderType.limit, side=side, size=size,
+                 id=order_id)
+
+
+def test_price_time_priority_and_partial_fills():
+    engine = MatchingEngine()
+    for order_id, price in (("a", 10.0), ("b", 11.0), ("c", 11.0), ("d", 9.0)):
+        assert engine.submit(create_order(order_id, Side.bid, price, 1.0), timestamp=0) == []
+    assert engine.best_bid() == 11.0
+
+    ask = create_order("e", Side.ask, 10.0, 2.5)
+    fills = engine.submit(ask, timestamp=1)
+    assert [(fill.order.id, fill.price, fill.size) for fill in fills] == \
+           [("e", 11.0, 1.0), ("b", 11.0, 1.0), ("e", 11.0, 1.0), ("c", 11.0, 1.0), ("e", 10.0, 0.5),
+            ("a", 10.0, 0.5)]
+    assert ask.state is OrderState.filled and ask.equivalent_price == (11.0 + 11.0 + 0.5 * 10.0) / 2.5
+    assert ask.completed_at.as_epoch_time() == 1
+    assert fills[-1].order.state is OrderState.partially_filled
+    assert engine.remaining("a") == 0.5
+
+    assert engine.cancel("a").state is OrderState.cancelled
+    assert engine.best_bid() == 9.0
+    assert engine.cancel("a") is None
+    assert [order.id for order in engine.open_orders] == ["d"]
+
+
+def test_modified_order_loses_time_priority():
+    engine = MatchingEngine()
+    engine.submit(create_order("a", Side.ask, 10.0, 1.0), timestamp=0)
+    engine.submit(create_order("b", Side.ask, 10.0, 1.0), timestamp=0)
+    assert engine.modify("a", price=10.0, size=2.0, timestamp=1) == (True, [])
+    fills = engine.match_candle(low_price=9.0, high_price=10.0, volume=1.5, timestamp=2)
+    assert [(fill.order.id, fill.size) for fill in fills] == [("b", 1.0), ("a", 0.5)]
+    assert engine.modify("b", price=10.0, size=2.0, timestamp=3) == (False, [])
+
+
+def test_match_order_book_snapshot():
+    engine = MatchingEngine()
+    engine.submit(create_order("a", Side.bid, 10.0, 3.0), timestamp=0)
+    engine.submit(create_order("b", Side.ask, 12.0, 1.0), timestamp=0)
+    order_book = OrderBook(TradingPair("NEO", "BTC"), bids=[Bid(11.0, 1, 5.0)],
+                           asks=[Ask(9.5, 1, 1.0), Ask(10.0, 2, 1.5), Ask(10.5, 1, 5.0)])
+    fills = engine.match_order_book(order_book, timestamp=1)
+    assert [(fill.order.id, fill.size) for fill in fills] == [("a", 1.0), ("a", 1.5)]
+    assert engine.remaining("a") == 0.5
+    assert engine.remaining("b") == 1.0
+
+
+def test_book_is_never_crossed_after_matching():
+    random_state = np.random.RandomState(1234)
+    engine = MatchingEngine()
+    size = 0.0
+    for i in range(5000):
+        side = Side.bid if random_state.rand() > 0.5 else Side.ask
+        fills = engine.submit(create_order(str(i), side, round(100.0 + random_state.randn(), 1), 1.0), timestamp=i)
+        size += sum(fill.size for fill in fills if fill.order.id == str(i))
+        if engine.best_bid() is not None and engine.best_ask() is not None:
+            assert engine.best_bid() < engine.best_ask()
+        if random_state.rand() > 0.9 and len(engine) > 0:
+            engine.cancel(engine.open_orders[0].id)
+    assert size > 0.0
+
+
+def run_market_maker(stock_data: StockData) -> SimulatedExchange:
+    exchange = create_exchange(stock_data)
+    market_maker = ExperimentalMarketMaker(exchange, stock_data.trading_pair, 100.0)
+    for candle, signal in zip(stock_data.candles[1:], SignalArray.from_price_moves(stock_data)):
+        market_maker.insert_signal(signal)
+        exchange.replay_candle(candle)
+    return exchange
+
+
+def test_market_maker_on_simulated_exchange_is_deterministic():
+    stock_data = load_from_disk(os.path.join(TEST_DATA_DIR, "test_data_long.dill"))
+    stock_data = StockData(stock_data.candles[:500], stock_data.trading_pair)
+    history = [order.as_dict() for order in run_market_maker(stock_data).get_order_history(stock_data.trading_pair)]
+    assert len(history) > 50
+    assert any(order["state"] == OrderState.filled.value for order in history[:-1])
+    exchange = run_market_maker(stock_data)
+    assert exchange.get_trades() == exchange.fills and len(exchange.get_trades()) > 0
+    assert exchange.get_orders_trades("1") == [fill for fill in exchange.get_trades() if fill.order.id == "1"]
+    assert history == [order.as_dict()
+                       for order in run_market_maker(stock_data).get_order_history(stock_data.trading_pair)]
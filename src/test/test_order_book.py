@@ -0,0 +1,83 @@
+from typing import Dict, Optional
+
+import numpy as np
+import pytest
+
+from src.containers.order import Side
+from src.containers.order_book import OrderBook
+from src.containers.trading_pair import TradingPair
+
+
+def generate_response(random_state: np.random.RandomState, number_of_levels: int) -> dict:
+    bid_prices = np.round(100.0 - random_state.choice(np.arange(1, 500), number_of_levels, replace=False) * 0.01, 2)
+    ask_prices = np.round(100.0 + random_state.choice(np.arange(1, 500), number_of_levels, replace=False) * 0.01, 2)
+    return {"bids": [[str(price), str(random_state.randint(1, 5)), str(random_state.randint(1, 100) / 10.0)]
+                     for price in bid_prices],
+            "asks": [[str(price), str(random_state.randint(1, 5)), str(random_state.randint(1, 100) / 10.0)]
+                     for price in ask_prices]}
+
+
+def brute_force_vwap(levels: Dict[float, float], size: float, is_bid: bool) -> Optional[float]:
+    remaining, notional = size, 0.0
+    for price in sorted(levels, reverse=is_bid):
+        taken = min(remaining, levels[price])
+        notional += taken * price
+        remaining -= taken
+        if remaining <= 0.0:
+            return notional / size
+    return None
+
+
+def test_order_book_from_response():
+    response = {"bids": [["0.5", "1", "2.0"], ["0.6", "3", "1.0"]],
+                "asks": [["0.8", "2", "4.0"], ["0.7", "1", "1.5"]]}
+    order_book = OrderBook.from_response(TradingPair("NEO", "BTC"), response)
+    assert [(bid.price, bid.count, bid.size) for bid in order_book.bids] == [(0.6, 3, 1.0), (0.5, 1, 2.0)]
+    assert [(ask.price, ask.count, ask.size) for ask in order_book.asks] == [(0.7, 1, 1.5), (0.8, 2, 4.0)]
+    assert order_book.best_bid().price == 0.6 and order_book.best_ask().price == 0.7
+    assert order_book.depth(Side.ask, 0.75) == 1.5
+    assert order_book.depth(Side.bid, 0.5) == 3.0
+    assert order_book.depth(Side.bid, 0.65) == 0.0
+    assert order_book.price_to_fill(Side.ask, 2.0) == 0.8
+    assert order_book.vwap(Side.ask, 2.0) == pytest.approx((1.5 * 0.7 + 0.5 * 0.8) / 2.0)
+    assert order_book.vwap(Side.ask, 10.0) is None
+    assert order_book.first_level_with_size(Side.ask, 2.0).price == 0.8
+    assert order_book.first_level_with_size(Side.bid, 5.0) is None
+
+
+def test_order_book_diffs_match_brute_force():
+    random_state = np.random.RandomState(1234)
+    response = generate_response(random_state, 200)
+    order_book = OrderBook.from_response(TradingPair("NEO", "BTC"), response)
+    levels = {side: {float(price): float(size) for price, _, size in response[name]}
+              for side, name in ((Side.bid, "bids"), (Side.ask, "asks"))}
+
+    for _ in range(2000):
+        side = Side.bid if random_state.rand() > 0.5 else Side.ask
+        price = round(100.0 + (-1 if side is Side.bid else 1) * random_state.randint(1, 500) * 0.01, 2)
+        size = 0.0 if random_state.rand() > 0.7 else random_state.randint(1, 100) / 10.0
+        order_book.apply_diff(side, price, 1, size)
+        if size > 0.0:
+            levels[side][price] = size
+        else:
+            levels[side].pop(price, None)
+
+        if random_state.rand() > 0.9:
+            for query_side, is_bid in ((Side.bid, True), (Side.ask, False)):
+                book_side = levels[query_side]
+                best_price = max(book_side) if is_bid else min(book_side)
+                best = order_book.best_bid() if is_bid else order_book.best_ask()
+                assert best.price == best_price and best.size == book_side[best_price]
+                query_price = round(100.0 + (-1 if is_bid else 1) * random_state.randint(1, 500) * 0.01, 2)
+                assert order_book.depth(query_side, query_price) == pytest.approx(
+                    sum(size for price, size in book_side.items()
+                        if (price >= query_price if is_bid else price <= query_price)))
+                query_size = random_state.rand() * 300.0
+                expected_vwap = brute_force_vwap(book_side, query_size, is_bid)
+                if expected_vwap is None:
+                    assert order_book.vwap(query_side, query_size) is None
+                else:
+                    assert order_book.vwap(query_side, query_size) == pytest.approx(expected_vwap)
+
+    assert [bid.price for bid in order_book.bids] == sorted(levels[Side.bid], reverse=True)
+    assert [ask.size for ask in order_book.asks] == [levels[Side.ask][price] for price in sorted(levels[Side.ask])]
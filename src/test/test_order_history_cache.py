@@ -0,0 +1,91 @@
+from typing import List
+
+from src.containers.order import OrderState
+from src.containers.order_history_cache import OrderHistoryCache
+from src.containers.trading import BinanceTrading
+from src.containers.trading_pair import TradingPair
+
+
+class FakeTradingApi:
+    def __init__(self, orders: List[dict]):
+        self.orders = orders  # newest first
+        self.number_of_requests = 0
+
+    def get_order_history(self, trading_pair_id: str, limit: int, page: int = 0) -> dict:
+        self.number_of_requests += 1
+        return {"success": True,
+                "result": {"orders": self.orders[page * limit:(page + 1) * limit],
+                           "total_page": (len(self.orders) + limit - 1) // limit}}
+
+
+class FakeClient:
+    def __init__(self, orders: List[dict]):
+        self.trading = FakeTradingApi(orders)
+
+
+def create_order(i: int, state: OrderState = OrderState.filled) -> dict:
+    return {"completed_at": None, "eq_price": "0.1", "filled": "1.0", "id": "order-{}".format(i),
+            "price": "0.1", "side": "bid" if i % 2 else "ask", "size": "1.0", "source": "exchange",
+            "state": state.value, "timestamp": str(1000 * i), "trading_pair_id": "NEO-BTC", "type": "limit"}
+
+
+def create_history(number_of_orders: int) -> List[dict]:
+    return [create_order(i) for i in reversed(range(number_of_orders))]
+
+
+def history_ids(trader: BinanceTrading) -> List[str]:
+    return [order.id for order in trader.get_order_history(TradingPair("NEO", "BTC"))]
+
+
+def test_order_history_is_fetched_incrementally():
+    client = FakeClient(create_history(1050))
+    client.trading.orders[750] = create_order(299, OrderState.open)
+    trader = BinanceTrading(client)
+    assert history_ids(trader) == [order["id"] for order in client.trading.orders]
+    assert client.trading.number_of_requests == 11
+
+    # fetched down to the open order, until it is closed
+    client.trading.orders[0:0] = [create_order(i) for i in reversed(range(1050, 1053))]
+    client.trading.number_of_requests = 0
+    assert history_ids(trader)[:4] == ["order-1052", "order-1051", "order-1050", "order-1049"]
+    assert client.trading.number_of_requests == 8
+    client.trading.orders[753] = create_order(299, OrderState.cancelled)
+    client.trading.number_of_requests = 0
+    orders = trader.get_order_history(TradingPair("NEO", "BTC"))
+    assert orders[753].id == "order-299" and orders[753].state is OrderState.cancelled
+    client.trading.number_of_requests = 0
+    assert len(history_ids(trader)) == 1053
+    assert client.trading.number_of_requests == 1
+    assert trader.get_last_filled_order(TradingPair("NEO", "BTC")).id == "order-1052"
+
+
+def test_order_history_cache_is_persisted(tmpdir):
+    client = FakeClient(create_history(250))
+    trader = BinanceTrading(client, order_history_directory=str(tmpdir))
+    assert len(history_ids(trader)) == 250
+
+    client.trading.orders.insert(0, create_order(250, OrderState.open))
+    client.trading.number_of_requests = 0
+    trader = BinanceTrading(client, order_history_directory=str(tmpdir))
+    assert history_ids(trader) == [order["id"] for order in client.trading.orders]
+    assert client.trading.number_of_requests == 1
+
+    # syncs that change nothing do not grow the file
+    path_to_cache = tmpdir.join("order_history_NEO-BTC.jsonl")
+    number_of_lines = len(path_to_cache.readlines())
+    for _ in range(10):
+        history_ids(trader)
+    assert len(path_to_cache.readlines()) == number_of_lines
+
+    # the file is rewritten with one line per order on start
+    client.trading.orders[0] = create_order(250, OrderState.filled)
+    history_ids(trader)
+    path_to_cache.write('{"order": {"trading_pa', mode="a")
+    order_history = OrderHistoryCache(str(path_to_cache))
+    assert len(order_history) == 251 and order_history.high_water_mark == 250 * 1000
+    assert order_history.orders()[0].state is OrderState.filled
+    assert list(order_history.newest_first()) == order_history.orders()
+    assert order_history.last_filled() is order_history.orders()[0]
+    assert [order.id for order in order_history.orders()] == [order["id"] for order in client.trading.orders]
+    assert len(path_to_cache.readlines()) == 252
+    assert path_to_cache.read().endswith("}\n")
@@ -0,0 +1,109 @@
+import os
+import random
+from typing import List
+
+import pytest
+
+from src.containers.order import Order, OrderState, OrderType, Side
+from src.containers.signal_array import SignalArray
+from src.containers.stock_data import StockData, load_from_disk
+from src.containers.time import MilliSeconds
+from src.containers.trading_pair import TradingPair
+from src.definitions import TEST_DATA_DIR
+from src.market_maker.ExperimentalMarketMaker import ExperimentalMarketMaker
+from src.market_maker.mock_client import MockClient
+from src.market_maker.mock_trading import MockTrading
+from src.market_maker.order_store import OrderStore
+from src.market_maker.utils import get_last_filled_order
+from src.test.exchange_helpers import create_exchange
+
+
+def create_orders(number_of_orders: int) -> List[Order]:
+    return [Order(trading_pair_id=TradingPair("NEO", "BTC"), price=1.0 + i, type=OrderType.limit,
+                  side=Side.bid if i % 2 else Side.ask, size=1.0, id=str(i), state=OrderState.open,
+                  timestamp=MilliSeconds(1000 * i)) for i in range(number_of_orders)]
+
+
+def test_order_store_indices():
+    store = OrderStore()
+    orders = create_orders(10)
+    for order in reversed(orders):
+        store.add(order)
+    assert store.get("3") is orders[3]
+    assert store.oldest(OrderState.open) is orders[0]
+    assert store.latest(OrderState.open) is orders[9]
+    assert [order.id for order in store.last_n(3)] == ["0", "1", "2"]
+    with pytest.raises(KeyError):
+        store.add(orders[0])
+
+    store.update("0", state=OrderState.filled)
+    store.update("9", timestamp=MilliSeconds(500))
+    assert store.oldest(OrderState.open) is orders[9]
+    assert store.latest(OrderState.open) is orders[8]
+    assert store.latest(OrderState.filled) is orders[0] and orders[0].state is OrderState.filled
+    assert store.count(OrderState.open) == 9
+
+    store.remove("9")
+    assert "9" not in store
+    assert store.oldest(OrderState.open) is orders[1]
+    assert [order.id for order in store.orders(OrderState.open)] == ["8", "7", "6", "5", "4", "3", "2", "1"]
+
+
+def test_order_store_evicts_oldest_closed_orders():
+    store = OrderStore(max_closed_orders=100)
+    for order in create_orders(1000):
+        store.add(order)
+        store.update(order.id, state=OrderState.filled if int(order.id) % 3 else OrderState.cancelled)
+        assert len(store) == min(int(order.id) + 1, 100)
+    assert all(str(i) in store for i in range(900, 1000)) and "899" not in store
+    assert store.count(OrderState.filled) + store.count(OrderState.cancelled) == 100
+    assert store.oldest(OrderState.filled).id == "901"
+    assert store.latest(OrderState.filled).id == "998"
+    assert store.oldest(OrderState.cancelled).id == "900"
+    assert store.latest(OrderState.cancelled).id == "999"
+
+    # after compactions of the heaps, the oldest and latest orders are still found as orders change state
+    for i in range(900, 1000, 3):
+        store.update(str(i), state=OrderState.filled)
+        assert store.oldest(OrderState.filled).id == "900"
+        assert store.latest(OrderState.filled).id == (str(i) if i > 998 else "998")
+        assert store.count(OrderState.cancelled) == len([j for j in range(i + 3, 1000, 3)])
+    assert store.oldest(OrderState.cancelled) is None and store.latest(OrderState.cancelled) is None
+
+
+def test_mock_trading_with_order_store():
+    random.seed(1234)
+    trader = MockTrading(MockClient(), max_closed_orders=50)
+    trading_pair = TradingPair("COB", "ETH")
+    for i, order in enumerate(create_orders(200)):
+        trader.place_order(order)
+        if i % 4 == 0 and trader.get_open_orders(order_id=order.id):
+            assert trader.cancel_order(order.id)
+            assert trader.get_open_orders(order_id=order.id) == []
+        trader._fill_orders()
+        assert len(trader.open_orders) <= 200
+
+    assert len(trader.filled_orders) <= 50
+    last_filled_order = trader.get_last_filled_order(trading_pair)
+    assert last_filled_order.state is OrderState.filled
+    assert get_last_filled_order(trading_pair, trader) is max(trader.get_last_n_orders(trading_pair, 1000),
+                                                              key=lambda order: (order.state is OrderState.filled,
+                                                                                 order.timestamp.as_epoch_time()))
+    last_orders = trader.get_last_n_orders(trading_pair, 5)
+    assert all(first.timestamp.as_epoch_time() >= second.timestamp.as_epoch_time()
+               for first, second in zip(last_orders, last_orders[1:]))
+
+
+def test_market_maker_keeps_a_bounded_number_of_filled_orders():
+    stock_data = load_from_disk(os.path.join(TEST_DATA_DIR, "test_data_long.dill"))
+    stock_data = StockData(stock_data.candles[:1000], stock_data.trading_pair)
+    exchange = create_exchange(stock_data)
+    market_maker = ExperimentalMarketMaker(exchange, stock_data.trading_pair, 100.0, max_closed_orders=5)
+    for candle, signal in zip(stock_data.candles[1:], SignalArray.from_price_moves(stock_data)):
+        market_maker.insert_signal(signal)
+        exchange.replay_candle(candle)
+    filled_orders = [order for order in exchange.get_order_history(stock_data.trading_pair)
+                     if order.state is OrderState.filled]
+    assert len(filled_orders) > 5
+    assert [order.id for order in market_maker.filled_orders] == \
+           [order.id for order in reversed(filled_orders)][-5:]
@@ -0,0 +1,158 @@
+import os
+
+import numpy as np
+
+from src.containers.order import Order, OrderBuy, OrderState, OrderType, Side
+from src.containers.portfolio import Portfolio
+from src.containers.portfolio_journal import PortfolioJournal
+from src.containers.signal_array import SignalArray
+from src.containers.stock_data import StockData, load_from_disk
+from src.containers.time import MilliSeconds
+from src.containers.trading_pair import TradingPair
+from src.definitions import TEST_DATA_DIR
+
+
+def load_stock_data() -> StockData:
+    stock_data = load_from_disk(os.path.join(TEST_DATA_DIR, "test_data_long.dill"))
+    return StockData(stock_data.candles[:500], stock_data.trading_pair)
+
+
+def update_portfolio(portfolio: Portfolio, signals: SignalArray):
+    for signal in signals:
+        portfolio.update(signal)
+        portfolio.update(Order.from_signal(signal))
+
+
+def test_order_as_dict_round_trip():
+    order = Order(trading_pair_id=TradingPair("NEO", "BTC"), price=0.0021, type=OrderType.limit, side=Side.bid,
+                  size=12.5, source="exchange", equivalent_price=0.00209, completed_at=MilliSeconds(1621479659999),
+                  timestamp=MilliSeconds(1621479600000), state=OrderState.partially_filled, id="1234",
+                  filled=3.0)
+    copied_order = Order.from_dict(order.as_dict())
+    assert isinstance(copied_order, OrderBuy)
+    assert copied_order.as_dict() == order.as_dict()
+    assert str(copied_order.trading_pair_id) == "NEOBTC"
+
+
+def test_rebuild_portfolio_from_journal(tmpdir):
+    signals = SignalArray.from_price_moves(load_stock_data()).replace_repeats_with_holds()
+    journal = PortfolioJournal(os.path.join(str(tmpdir), "portfolio.jsonl"))
+    portfolio = Portfolio(initial_capital=5, trade_amount=1000)
+    update_portfolio(portfolio, signals[:100])
+    number_of_signals, number_of_orders = len(portfolio.signals), len(portfolio.orders)
+    portfolio.start_journal(journal)
+    update_portfolio(portfolio, signals[100:])
+    journal.close()
+
+    restored_portfolio = Portfolio.from_journal(PortfolioJournal(journal.path_to_journal))
+    # the journal starts from the ledger, without the signals and orders before it
+    assert restored_portfolio.signals == portfolio.signals[number_of_signals:]
+    assert [order.as_dict() for order in restored_portfolio.orders] == \
+           [order.as_dict() for order in portfolio.orders[number_of_orders:]]
+    assert restored_portfolio.performance_snapshot() == portfolio.performance_snapshot()
+    assert [trade_time.as_epoch_time() for trade_time in restored_portfolio.ledger.trade_times] == \
+           [trade_time.as_epoch_time() for trade_time in portfolio.ledger.trade_times]
+    assert np.array_equal(restored_portfolio.ledger.column("equity"), portfolio.ledger.column("equity"))
+
+    # the restored portfolio keeps appending to the journal
+    restored_portfolio.update(Order.from_signal(signals.trades()[0]))
+    restored_portfolio.journal.close()
+    assert len(Portfolio.from_journal(PortfolioJournal(journal.path_to_journal)).orders) == \
+           len(portfolio.orders) - number_of_orders + 1
+
+
+def test_portfolio_keeps_only_recent_events(tmpdir):
+    signals = SignalArray.from_price_moves(load_stock_data()).trades()[:30]
+    orders = [Order.from_signal(signal) for signal in signals]
+    for i, order in enumerate(orders):
+        order.id = str(i)
+    portfolio = Portfolio(initial_capital=5, trade_amount=1000, max_recent_events=10)
+    unbounded_portfolio = Portfolio(initial_capital=5, trade_amount=1000, max_recent_events=None)
+    for signal, order in zip(signals, orders):
+        for data in (signal, order):
+            portfolio.update(data)
+            unbounded_portfolio.update(data)
+
+    assert portfolio.signals == list(signals[20:])
+    assert portfolio.orders == orders[20:]
+    assert [portfolio.has_order(order) for order in orders] == [False] * 20 + [True] * 10
+    assert len(unbounded_portfolio.orders) == 30
+    assert portfolio.performance_snapshot() == unbounded_portfolio.performance_snapshot()
+
+    # the ids of the recent orders are journaled with the ledger
+    journal = PortfolioJournal(os.path.join(str(tmpdir), "portfolio.jsonl"))
+    portfolio.start_journal(journal)
+    journal.close()
+    restored_portfolio = Portfolio.from_journal(PortfolioJournal(journal.path_to_journal))
+    assert [restored_portfolio.has_order(order) for order in orders] == [False] * 20 + [True] * 10
+    assert restored_portfolio.performance_snapshot() == portfolio.performance_snapshot()
+
+
+def test_incomplete_last_event_is_dropped(tmpdir):
+    signals = SignalArray.from_price_moves(load_stock_data()).trades()[:10]
+    journal = PortfolioJournal(os.path.join(str(tmpdir), "portfolio.jsonl"))
+    portfolio = Portfolio(initial_capital=5, trade_amount=1000)
+    portfolio.start_journal(journal)
+    update_portfolio(portfolio, signals)
+    journal.close()
+    with open(journal.path_to_journal, "a") as outfile:
+        outfile.write('{"event": "order", "order": {"trading_pair_id"')
+
+    restored_portfolio = Portfolio.from_journal(PortfolioJournal(journal.path_to_journal))
+    assert len(restored_portfolio.orders) == len(signals)
+    assert restored_portfolio.performance_snapshot() == portfolio.performance_snapshot()
+
+    # appending after the resume does not run into the incomplete event
+    for signal in SignalArray.from_price_moves(load_stock_data()).trades()[10:12]:
+        restored_portfolio.update(Order.from_signal(signal))
+    restored_portfolio.journal.close()
+    assert len(Portfolio.from_journal(PortfolioJournal(journal.path_to_journal)).orders) == len(signals) + 2
+
+
+def test_last_event_without_end_of_line(tmpdir):
+    signals = SignalArray.from_price_moves(load_stock_data()).trades()[:10]
+    journal = PortfolioJournal(os.path.join(str(tmpdir), "portfolio.jsonl"))
+    Portfolio(initial_capital=5, trade_amount=1000).start_journal(journal)
+    journal.append(Order.from_signal(signals[0]))
+    journal.close()
+    with open(journal.path_to_journal, "r+") as outfile:
+        outfile.truncate(os.path.getsize(journal.path_to_journal) - 1)
+
+    restored_portfolio = Portfolio.from_journal(PortfolioJournal(journal.path_to_journal))
+    restored_portfolio.update(Order.from_signal(signals[1]))
+    restored_portfolio.journal.close()
+    assert len(Portfolio.from_journal(PortfolioJournal(journal.path_to_journal)).orders) == 2
+
+
+def test_mark_to_market_is_journaled(tmpdir):
+    signals = SignalArray.from_price_moves(load_stock_data()).trades()[:10]
+    journal = PortfolioJournal(os.path.join(str(tmpdir), "portfolio.jsonl"))
+    portfolio = Portfolio(initial_capital=5, trade_amount=1000)
+    portfolio.start_journal(journal)
+    update_portfolio(portfolio, signals)
+    portfolio.mark_to_market(portfolio.ledger.last_price * 1.5)
+    portfolio.mark_to_market(portfolio.ledger.last_price * 0.5)
+    journal.close()
+
+    restored_portfolio = Portfolio.from_journal(PortfolioJournal(journal.path_to_journal))
+    assert restored_portfolio.performance_snapshot() == portfolio.performance_snapshot()
+
+
+def test_finished_journal(tmpdir):
+    signals = SignalArray.from_price_moves(load_stock_data()).trades()[:10]
+    journal = PortfolioJournal(os.path.join(str(tmpdir), "portfolio.jsonl"))
+    assert not journal.is_finished()
+    portfolio = Portfolio(initial_capital=5, trade_amount=1000)
+    portfolio.start_journal(journal)
+    update_portfolio(portfolio, signals)
+    assert not journal.is_finished()
+
+    journal.finish()
+    assert journal.is_finished()
+    restored_portfolio = Portfolio.from_journal(PortfolioJournal(journal.path_to_journal))
+    assert restored_portfolio.performance_snapshot() == portfolio.performance_snapshot()
+
+    # appending after the end of a run makes it an interrupted run again
+    restored_portfolio.update(Order.from_signal(signals[0]))
+    restored_portfolio.journal.close()
+    assert not PortfolioJournal(journal.path_to_journal).is_finished()
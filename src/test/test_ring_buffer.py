@@ -0,0 +1,33 @@
+from queue import Full, Empty
+
+import numpy as np
+import pytest
+
+from src.externals.rolling_statistics.python.ring_buffer import RingBuffer
+
+
+def test_ring_buffer_view_is_ordered_window():
+    ring_buffer = RingBuffer(3)
+    evicted_samples = []
+    for i, sample in enumerate(range(10)):
+        evicted_samples.append(ring_buffer.append(float(sample)))
+        assert np.array_equal(ring_buffer.view, np.arange(max(0, i - 2), i + 1))
+    assert evicted_samples == [None, None, None] + [float(sample) for sample in range(7)]
+    assert ring_buffer.full()
+    with pytest.raises(ValueError):
+        ring_buffer.view[0] = 1.0
+
+
+def test_ring_buffer_queue_interface():
+    ring_buffer = RingBuffer(2)
+    assert ring_buffer.empty()
+    with pytest.raises(Empty):
+        ring_buffer.get(block=False)
+    ring_buffer.put(1.0, block=False)
+    ring_buffer.put(2.0, block=False)
+    with pytest.raises(Full):
+        ring_buffer.put(3.0, block=False)
+    assert ring_buffer.qsize() == 2
+    assert ring_buffer.get(block=False) == 1.0
+    ring_buffer.put(3.0, block=False)
+    assert list(ring_buffer.view) == [2.0, 3.0]
@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+
+from src.classification.classifier_helpers import replace_repeating_signals_with_holds
+from src.containers.data_point import PricePoint
+from src.containers.signal import SignalBuy, SignalSell, SignalHold
+from src.containers.signal_array import SignalArray
+from src.containers.stock_data import StockData, load_from_disk
+from src.containers.trade_helper import generate_trading_signal_from_prediction
+from src.definitions import TEST_DATA_DIR
+
+
+def load_stock_data() -> StockData:
+    stock_data = load_from_disk(os.path.join(TEST_DATA_DIR, "test_data_long.dill"))
+    return StockData(stock_data.candles[:300], stock_data.trading_pair)
+
+
+def generate_training_labels_one_by_one(stock_data: StockData):
+    training_labels = []
+    for candle, next_candle in zip(stock_data.candles[:-1], stock_data.candles[1:]):
+        price_point = PricePoint(value=candle.get_close_price(), date_time=candle.get_close_time_as_datetime())
+        if next_candle.get_close_price() > candle.get_close_price():
+            training_labels.append(SignalBuy(-1, price_point))
+        else:
+            training_labels.append(SignalSell(1, price_point))
+    return training_labels
+
+
+def test_signal_array_from_price_moves():
+    stock_data = load_stock_data()
+    labels = SignalArray.from_price_moves(stock_data)
+    assert labels.signals.dtype == np.int8
+    assert labels.to_list() == generate_training_labels_one_by_one(stock_data)
+
+
+def test_signal_array_from_predictions():
+    stock_data = load_stock_data()
+    predictions = np.where(np.random.RandomState(1234).rand(250) > 0.5, 1.0, -1.0)
+    signals = SignalArray.from_predictions(predictions, stock_data)
+    assert len(signals) == len(predictions)
+    assert signals.to_list() == [generate_trading_signal_from_prediction(prediction, candle)
+                                 for prediction, candle in zip(predictions, stock_data.candles)]
+
+    cleaned_up_signals = signals.replace_repeats_with_holds()
+    assert cleaned_up_signals.to_list() == replace_repeating_signals_with_holds(signals.to_list())
+    trades = cleaned_up_signals.trades()
+    assert not any(isinstance(signal, SignalHold) for signal in trades)
+    assert len(trades) == np.count_nonzero(cleaned_up_signals.signals)
+    assert cleaned_up_signals[-1] == cleaned_up_signals.to_list()[-1]
+    assert cleaned_up_signals[10:20].to_list() == cleaned_up_signals.to_list()[10:20]
@@ -1,12 +1,15 @@
 import os
 from typing import List, Callable
 
+import numpy as np
 import pytest
 
 from src import definitions
 from src.containers.stock_data import load_from_disk
 from src.containers.candle import Candle
-from src.feature_extraction.technical_indicator import TechnicalIndicator, AutoCorrelationTechnicalIndicator
+from src.feature_extraction.technical_indicator import TechnicalIndicator, AutoCorrelationTechnicalIndicator, \
+    _area_of_normalized_autocorrelation, MovingAverageTechnicalIndicator, PriceTechnicalIndicator, \
+    PPOTechnicalIndicator
 from src.helpers import is_equal
 
 
@@ -63,7 +66,62 @@ def test_autocorrelation_technical_indicator():
         results.append(ati.result)
     print("\nTest result is {}".format(results))
     print("Expected result is {}".format(expected_results))
-    assert is_equal(results, expected_results)
+    # the running sums differ from the np.correlate implementation that gave these values by a few ulp
+    assert [result is None for result in results] == [result is None for result in expected_results]
+    assert [result for result in results if result is not None] == \
+           pytest.approx([result for result in expected_results if result is not None], rel=1e-12)
+
+
+@pytest.mark.parametrize("lags", [1, 2, 3, 4, 10, 50])
+def test_incremental_autocorrelation_matches_full_autocorrelation(lags):
+    candles = load_from_disk(os.path.join(definitions.TEST_DATA_DIR, "test_data_long.dill")).candles
+    close_prices = candles.close_price
+    ati = AutoCorrelationTechnicalIndicator(Candle.get_close_price, lags=lags)
+    for i, candle in enumerate(candles):
+        ati.update(candle)
+        if i < lags - 1:
+            assert ati.result is None
+        else:
+            expected_result = _area_of_normalized_autocorrelation(close_prices[i - lags + 1:i + 1])
+            assert np.isclose(ati.result, expected_result, rtol=1e-12, atol=0)
+
+
+def generate_technical_indicators() -> List:
+    return [MovingAverageTechnicalIndicator(Candle.get_close_price, 1),
+            MovingAverageTechnicalIndicator(Candle.get_close_price, 60),
+            MovingAverageTechnicalIndicator(Candle.get_number_of_trades, 5),
+            AutoCorrelationTechnicalIndicator(Candle.get_close_price, 1),
+            AutoCorrelationTechnicalIndicator(Candle.get_close_price, 4),
+            AutoCorrelationTechnicalIndicator(Candle.get_volume, 7),
+            PriceTechnicalIndicator(Candle.get_close_price, 3),
+            PPOTechnicalIndicator(Candle.get_close_price, 60, 40),
+            MockTechnicalIndicator(Candle.get_close_price, 3)]
+
+
+def stream_technical_indicator(technical_indicator, candles) -> np.ndarray:
+    results = []
+    for candle in candles:
+        technical_indicator.update(candle)
+        results.append(np.nan if technical_indicator.result is None else technical_indicator.result)
+    return np.array(results, dtype=np.float64)
+
+
+@pytest.mark.parametrize("index", range(len(generate_technical_indicators())))
+def test_compute_series_matches_streaming_results(index):
+    candles = load_from_disk(os.path.join(definitions.TEST_DATA_DIR, "test_data_long.dill")).candles
+    series = generate_technical_indicators()[index].compute_series(candles)
+    results = stream_technical_indicator(generate_technical_indicators()[index], candles)
+    assert np.array_equal(series, results, equal_nan=True)
+
+
+@pytest.mark.parametrize("index", range(len(generate_technical_indicators())))
+def test_compute_series_advances_state(index):
+    candles = load_from_disk(os.path.join(definitions.TEST_DATA_DIR, "test_data_long.dill")).candles
+    technical_indicator = generate_technical_indicators()[index]
+    technical_indicator.compute_series(candles[:777], advance_state=True)
+    results = stream_technical_indicator(technical_indicator, candles[777:])
+    expected_results = stream_technical_indicator(generate_technical_indicators()[index], candles)[777:]
+    assert np.array_equal(results, expected_results, equal_nan=True)
 
 
 if __name__ == '__main__':
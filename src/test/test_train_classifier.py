@@ -0,0 +1,115 @@
+import os
+from datetime import timedelta
+
+import numpy as np
+
+from src.classification.trading_classifier import TradingClassifier
+from src.classification.train_classifier import fit_classifier, fit_and_save_classifier, \
+    train_classifiers_in_parallel, run_trained_classifier, run_trained_classifier_in_parallel, \
+    run_saved_classifiers_in_parallel
+from src.connection.candle_cache import CandleCache
+from src.connection.helpers import finetune_time_window
+from src.containers.candle import Candle
+from src.containers.portfolio import Portfolio
+from src.containers.stock_data import StockData, load_from_disk
+from src.containers.time_windows import TimeWindow
+from src.definitions import TEST_DATA_DIR
+from src.feature_extraction.technical_indicator import AutoCorrelationTechnicalIndicator, PPOTechnicalIndicator
+
+
+def generate_technical_indicators():
+    return [AutoCorrelationTechnicalIndicator(Candle.get_close_price, 2),
+            PPOTechnicalIndicator(Candle.get_close_price, 5, 1),
+            PPOTechnicalIndicator(Candle.get_close_price, 20, 10)]
+
+
+def load_training_sets():
+    stock_data = load_from_disk(os.path.join(TEST_DATA_DIR, "test_data_long.dill"))
+    return [StockData(stock_data.candles[:700], stock_data.trading_pair),
+            StockData(stock_data.candles[700:1400], stock_data.trading_pair)], stock_data
+
+
+def test_fit_classifier_does_not_depend_on_number_of_jobs():
+    training_sets, stock_data = load_training_sets()
+    predictions = []
+    for n_jobs in [1, 2]:
+        classifier = fit_classifier(stock_data.trading_pair, training_sets[0], None, generate_technical_indicators(),
+                                    n_jobs=n_jobs, seed=42, n_estimators=50)
+        predictions.append(classifier.sklearn_classifier.predict_proba(classifier._predictors.values))
+    assert np.array_equal(predictions[0], predictions[1])
+
+
+def test_train_classifiers_in_parallel(tmpdir):
+    training_sets, stock_data = load_training_sets()
+    training_jobs = [(training_set, None, str(tmpdir.join("classifier_{}.dill".format(i))), 1234 + i)
+                     for i, training_set in enumerate(training_sets)]
+    train_classifiers_in_parallel(stock_data.trading_pair, training_jobs, generate_technical_indicators(),
+                                  max_workers=2, n_estimators=50)
+    testing_set = StockData(stock_data.candles[1400:], stock_data.trading_pair)
+    for training_set, _, path_to_classifier, seed in training_jobs:
+        path_to_reference_classifier = path_to_classifier.replace("classifier_", "reference_classifier_")
+        fit_and_save_classifier(stock_data.trading_pair, training_set, None, generate_technical_indicators(),
+                                path_to_reference_classifier, n_jobs=1, seed=seed, n_estimators=50)
+        classifier = TradingClassifier.load_from_disk(path_to_classifier)
+        reference_classifier = TradingClassifier.load_from_disk(path_to_reference_classifier)
+        assert np.array_equal(classifier.predict(testing_set), reference_classifier.predict(testing_set))
+
+
+def test_run_trained_classifier_in_parallel(tmpdir):
+    training_sets, stock_data = load_training_sets()
+    classifier = fit_classifier(stock_data.trading_pair, training_sets[0], None, generate_technical_indicators(),
+                                n_jobs=1, n_estimators=50)
+    cache = CandleCache(stock_data.trading_pair, timedelta(minutes=1), cache_dir=str(tmpdir))
+    close_times = [candle.get_close_time_as_datetime() for candle in stock_data.candles]
+    cache.load(TimeWindow(start_time=close_times[0], end_time=close_times[-1]),
+               lambda time_window: finetune_time_window(stock_data.candles, time_window))
+    testing_time_windows = [TimeWindow(start_time=close_times[start], end_time=close_times[start + 200])
+                            for start in range(700, 1300, 200)]
+    testing_jobs = [(testing_time_window, str(tmpdir.join("portfolio_{}.dill".format(i))))
+                    for i, testing_time_window in enumerate(testing_time_windows)]
+
+    paths_to_portfolios = run_trained_classifier_in_parallel(stock_data.trading_pair, 10, classifier, testing_jobs,
+                                                             max_workers=2, cache_dir=str(tmpdir))
+    assert sorted(paths_to_portfolios) == sorted(path_to_portfolio for _, path_to_portfolio in testing_jobs)
+
+    for testing_time_window, path_to_portfolio in testing_jobs:
+        path_to_reference_portfolio = path_to_portfolio.replace("portfolio_", "reference_portfolio_")
+        run_trained_classifier(stock_data.trading_pair, None, 10, cache.load_cached(testing_time_window),
+                               classifier.copy_for_prediction(), path_to_reference_portfolio)
+        portfolio = Portfolio.load_from_disk(path_to_portfolio)
+        reference_portfolio = Portfolio.load_from_disk(path_to_reference_portfolio)
+        assert len(portfolio.signals) > 0
+        assert [str(signal) for signal in portfolio.signals] == \
+               [str(signal) for signal in reference_portfolio.signals]
+
+
+def test_run_saved_classifiers_in_parallel(tmpdir):
+    training_sets, stock_data = load_training_sets()
+    paths_to_classifiers = [str(tmpdir.join("classifier_{}.dill".format(i))) for i in range(len(training_sets))]
+    for i, training_set in enumerate(training_sets):
+        fit_and_save_classifier(stock_data.trading_pair, training_set, None, generate_technical_indicators(),
+                                paths_to_classifiers[i], n_jobs=1, seed=1234 + i, n_estimators=50)
+    cache = CandleCache(stock_data.trading_pair, timedelta(minutes=1), cache_dir=str(tmpdir))
+    close_times = [candle.get_close_time_as_datetime() for candle in stock_data.candles]
+    cache.load(TimeWindow(start_time=close_times[0], end_time=close_times[-1]),
+               lambda time_window: finetune_time_window(stock_data.candles, time_window))
+    testing_time_windows = [TimeWindow(start_time=close_times[start], end_time=close_times[start + 200])
+                            for start in range(700, 1300, 300)]
+    testing_jobs = [(path_to_classifier, testing_time_window,
+                     str(tmpdir.join("portfolio_{}_{}.dill".format(i, j))))
+                    for i, path_to_classifier in enumerate(paths_to_classifiers)
+                    for j, testing_time_window in enumerate(testing_time_windows)]
+
+    paths_to_portfolios = run_saved_classifiers_in_parallel(stock_data.trading_pair, 10, testing_jobs,
+                                                            max_workers=2, cache_dir=str(tmpdir))
+    assert sorted(paths_to_portfolios) == sorted(path_to_portfolio for _, _, path_to_portfolio in testing_jobs)
+
+    for path_to_classifier, testing_time_window, path_to_portfolio in testing_jobs:
+        path_to_reference_portfolio = path_to_portfolio.replace("portfolio_", "reference_portfolio_")
+        run_trained_classifier(stock_data.trading_pair, None, 10, cache.load_cached(testing_time_window),
+                               TradingClassifier.load_from_disk(path_to_classifier), path_to_reference_portfolio)
+        portfolio = Portfolio.load_from_disk(path_to_portfolio)
+        reference_portfolio = Portfolio.load_from_disk(path_to_reference_portfolio)
+        assert len(portfolio.signals) > 0
+        assert [str(signal) for signal in portfolio.signals] == \
+               [str(signal) for signal in reference_portfolio.signals]
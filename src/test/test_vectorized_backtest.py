@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+
+from src.backtesting.backtest_engine import BacktestEngine
+from src.backtesting.vectorized_backtest import run_vectorized_backtest, compare_with_event_driven_backtest
+from src.classification.classifier_helpers import replace_repeating_signals_with_holds
+from src.containers.order import Order
+from src.containers.portfolio import Portfolio
+from src.containers.signal import SignalHold
+from src.containers.stock_data import StockData, load_from_disk
+from src.definitions import TEST_DATA_DIR
+from src.test.training_helpers import train_classifier
+
+
+def load_stock_data() -> StockData:
+    return load_from_disk(os.path.join(TEST_DATA_DIR, "test_data_long.dill"))
+
+
+def train_compiled_classifier(stock_data: StockData):
+    classifier = train_classifier(StockData(stock_data.candles[:700], stock_data.trading_pair))
+    classifier.compile_forest()
+    return classifier
+
+
+def test_vectorized_backtest_matches_event_driven_backtest():
+    stock_data = load_stock_data()
+    classifier = train_compiled_classifier(stock_data)
+    testing_set = StockData(stock_data.candles[700:], stock_data.trading_pair)
+
+    result = run_vectorized_backtest(classifier, testing_set, initial_capital=5.0, fees=0)
+
+    event_driven_classifier = classifier.copy_for_prediction()
+    event_driven_classifier.reset_indicators()
+    signals = BacktestEngine(event_driven_classifier, Portfolio(5.0, 100)).run(testing_set).signals
+    cleaned_up_signals = replace_repeating_signals_with_holds(signals)
+    trades = [signal for signal in cleaned_up_signals if not isinstance(signal, SignalHold)]
+    assert len(trades) > 10
+    assert result.trades.to_list() == trades
+
+    portfolio = Portfolio(5.0, 100)
+    for signal in cleaned_up_signals:
+        portfolio.update(Order.from_signal(signal))
+    portfolio.compute_performance()
+    is_filled = result.fills != 0
+    assert np.array_equal(result.cash[is_filled], portfolio.portfolio_df["remaining_capital"].values)
+    assert np.array_equal(result.positions[is_filled], np.cumsum(portfolio.positions_df["amount_traded"].values))
+    assert np.array_equal(result.equity, result.cash + result.positions * testing_set.candles.close_price)
+
+
+def test_vectorized_backtest_fees():
+    stock_data = load_stock_data()
+    classifier = train_compiled_classifier(stock_data)
+    testing_set = StockData(stock_data.candles[700:], stock_data.trading_pair)
+    result = run_vectorized_backtest(classifier, testing_set, initial_capital=5.0, fees=0.001)
+    result_without_fees = run_vectorized_backtest(classifier, testing_set, initial_capital=5.0, fees=0)
+    assert np.allclose(result.fees, 0.001 * np.abs(result.fills) * testing_set.candles.close_price)
+    assert np.allclose(result_without_fees.cash - result.cash, np.cumsum(result.fees))
+
+    report = compare_with_event_driven_backtest(classifier, testing_set, initial_capital=5.0, trade_amount=100)
+    assert sorted(report) == ["event_driven_time", "speedup", "vectorized_time"]
+    assert all(isinstance(value, float) and value > 0 for value in report.values())
@@ -0,0 +1,21 @@
+from typing import List
+
+from src.classification.train_classifier import fit_classifier
+from src.classification.trading_classifier import TradingClassifier
+from src.containers.candle import Candle
+from src.containers.stock_data import StockData
+from src.feature_extraction.technical_indicator import AutoCorrelationTechnicalIndicator, PPOTechnicalIndicator, \
+    TechnicalIndicator
+
+
+def generate_technical_indicators() -> List[TechnicalIndicator]:
+    return [AutoCorrelationTechnicalIndicator(Candle.get_close_price, 2),
+            AutoCorrelationTechnicalIndicator(Candle.get_close_price, 4),
+            PPOTechnicalIndicator(Candle.get_close_price, 5, 1),
+            PPOTechnicalIndicator(Candle.get_close_price, 20, 10)]
+
+
+def train_classifier(training_set: StockData, n_estimators: int = 50) -> TradingClassifier:
+    """A small forest over autocorrelation and PPO indicators, trained on one core."""
+    return fit_classifier(training_set.trading_pair, training_set, None, generate_technical_indicators(),
+                          n_jobs=1, n_estimators=n_estimators)